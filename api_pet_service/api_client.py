@@ -1,19 +1,26 @@
+import json
 import logging
+from typing import Dict, Iterator, List, Optional
 
-import requests
-from requests import Session, Response
+from pydantic import BaseModel
+from requests import Response
 
+from core.api.cassette import cassette_session
 from core.api.data_models import User
+from core.api.session_cache import SESSIONS
 from core.config import Config
 
 logger = logging.getLogger(__name__)
 
+# login calls go through the cassette too (HTTP_CASSETTE_MODE), replay runs never touch the network
+_LOGIN = cassette_session()
+
 
 def auth(user: User):
     # data = {"username": user.username, "password": user.password}
     if user is None:
         return None
-    request = requests.post(f"{Config.BASE_URL}/auth/login", user.model_dump_json())
+    request = _LOGIN.post(f"{Config.BASE_URL}/auth/login", user.model_dump_json())
     return request.json()["access_token"]
 
 
@@ -21,16 +28,53 @@ class FastApiClient:
 
     def __init__(self, user: User = None):
         self.base_url = Config.BASE_URL
-        self.api = Session()
-        token = auth(user)
-        self.api.headers.update({"Content-Type": "application/json", "Authorization": f"Bearer {token}"})
-        logger.info(f"{self.base_url}")
+        # shared per user: one login and one connection pool for all FastApiClient instances
+        self.api = SESSIONS.session(f"{Config.BASE_URL}/auth/login", user, auth)
+        logger.debug("%s", self.base_url)
 
-    def get_pets(self):
-        response = self.api.get(url=f"{self.base_url}/pets")
+    def get_pets(self, status: Optional[str] = None, limit: Optional[int] = None, cursor: Optional[int] = None):
+        params = {"status": status, "limit": limit, "cursor": cursor}
+        response = self.api.get(url=f"{self.base_url}/pets", params=params)
         log_request(response)
         return response
 
+    def iter_export_pets(self, status: Optional[str] = None, since_id: Optional[int] = None) -> Iterator[dict]:
+        """Stream GET /pets/export and yield pets one NDJSON line at a time"""
+        params = {"status": status, "since_id": since_id}
+        with self.api.get(url=f"{self.base_url}/pets/export", params=params, stream=True) as response:
+            log_request(response)
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if line:
+                    yield json.loads(line)
+
+    def batch_create_pets(self, pets: List[BaseModel | dict], idempotency_keys: Optional[List[Optional[str]]] = None):
+        keys = idempotency_keys or [None] * len(pets)
+        items = [{"pet": _dump(pet), "idempotency_key": key} for pet, key in zip(pets, keys)]
+        response = self.api.post(url=f"{self.base_url}/pets:batchCreate", json={"items": items})
+        log_request(response)
+        return response
+
+    def batch_update_pets(self, patches: Dict[int, BaseModel | dict], if_match: Optional[Dict[int, str]] = None):
+        if_match = if_match or {}
+        items = [{"id": pet_id, "patch": _dump(patch), "if_match": if_match.get(pet_id)}
+                 for pet_id, patch in patches.items()]
+        response = self.api.post(url=f"{self.base_url}/pets:batchUpdate", json={"items": items})
+        log_request(response)
+        return response
+
+    def batch_delete_pets(self, pet_ids: List[int]):
+        response = self.api.post(url=f"{self.base_url}/pets:batchDelete", json={"ids": pet_ids})
+        log_request(response)
+        return response
+
+
+def _dump(model: BaseModel | dict) -> dict:
+    if isinstance(model, BaseModel):
+        return model.model_dump(mode="json", exclude_unset=True)
+    return model
+
 
 def log_request(response: Response):
-    logger.info(f"{response.request.method} {response.request.url} - {response.status_code}")
+    # timings and sizes are recorded by core.api.instrumentation, this is only a debug trail
+    logger.debug("%s %s - %s", response.request.method, response.request.url, response.status_code)
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import count
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional
+
+import httpx
+
+from api_pet_service import main as service
+from core.config import Config
+
+"""
+Benchmarks for the pet service hot paths.
+
+Requests go through httpx.ASGITransport straight into `main:app` (no sockets,
+no uvicorn), stores are seeded directly: fresh ones per size, the sqlite backend
+in a temporary file, never the service's PET_STORE_PATH. Results are saved as JSON baselines
+and `compare` fails (exit code 1) when a benchmark's median regresses past a
+threshold.
+
+python -m api_pet_service.benchmarks run --output .benchmarks/baseline.json
+python -m api_pet_service.benchmarks run --sizes 1000,100000 --output .benchmarks/current.json
+python -m api_pet_service.benchmarks compare .benchmarks/baseline.json .benchmarks/current.json --threshold 0.2
+"""
+
+STATUSES = list(service.PetStatus)
+DEFAULT_SIZES = "1000,100000,1000000"
+
+
+@contextmanager
+def seeded(size: int, workdir: str) -> Iterator[None]:
+    """
+    Fresh stores (Config.PET_STORE_BACKEND, sqlite files in workdir) with `size` pets,
+    statuses round-robin, for the block; closed afterwards and the previous stores put back
+    """
+    stores = service.PETS, service.IDEMP_STORE
+    store, idempotency = service._create_stores(os.path.join(workdir, f"pets-{size}.sqlite3"))
+    service.PETS, service.IDEMP_STORE = store, idempotency
+    now = datetime.utcnow()
+
+    def pets():
+        for i in range(size):
+            pet_id = store.next_id()
+            yield service.Pet.model_construct(id=pet_id, name=f"pet_{pet_id}", status=STATUSES[i % 3],
+                                              category=None, photoUrls=[], tags=None, created_at=now, version=1)
+
+    try:
+        # one bulk write (a single transaction for sqlite)
+        store.put_many(pets())
+        yield
+    finally:
+        store.close()
+        service.PETS, service.IDEMP_STORE = stores
+
+
+async def measure(op: Callable[[], Awaitable[httpx.Response]], iterations: int, warmup: int) -> Dict[str, float]:
+    for _ in range(warmup):
+        await op()
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter_ns()
+        response = await op()
+        timings.append((time.perf_counter_ns() - started) / 1000)
+        if response.status_code >= 400:
+            raise RuntimeError(f"{response.request.method} {response.request.url} - {response.status_code}")
+    timings.sort()
+    return {
+        "iterations": iterations,
+        "min_us": round(timings[0], 1),
+        "median_us": round(statistics.median(timings), 1),
+        "mean_us": round(statistics.fmean(timings), 1),
+        "p95_us": round(timings[int(len(timings) * 0.95) - 1], 1),
+        "ops_per_s": round(1_000_000 / statistics.fmean(timings), 1),
+    }
+
+
+async def run_benchmarks(sizes: List[int], iterations: int, warmup: int) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory(prefix="pet-benchmarks-") as workdir:
+        await _run(results, sizes, iterations, warmup, workdir)
+    return results
+
+
+async def _run(results: Dict[str, Dict[str, float]], sizes: List[int], iterations: int, warmup: int,
+               workdir: str) -> None:
+    transport = httpx.ASGITransport(app=service.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        token = (await client.post("/auth/login", json=service.TEST_USER)).json()["access_token"]
+        client.headers["Authorization"] = f"Bearer {token}"
+
+        async def bench(name: str, op: Callable[[], Awaitable[httpx.Response]]) -> None:
+            results[name] = await measure(op, iterations, warmup)
+            print(f"{name:<45} median {results[name]['median_us']:>10} us", file=sys.stderr)
+
+        with seeded(1000, workdir):
+            keys = count()
+            body = {"name": "kitty", "status": "available"}
+            await bench("create_pet", lambda: client.post("/pets", json=body))
+            await bench("create_pet[idempotency_key]",
+                        lambda: client.post("/pets", json=body, headers={"Idempotency-Key": f"key-{next(keys)}"}))
+            await bench("create_pet[idempotency_replay]",
+                        lambda: client.post("/pets", json=body, headers={"Idempotency-Key": "key-0"}))
+            await bench("get_pet", lambda: client.get("/pets/500"))
+            await bench("get_pet[if_none_match]",
+                        lambda: client.get("/pets/500", headers={"If-None-Match": 'W/"1"'}))
+
+            versions = count(1)
+            await bench("update_pet[if_match]",
+                        lambda: client.patch("/pets/1", json={"name": "kitty"},
+                                             headers={"If-Match": f'W/"{next(versions)}"'}))
+
+        for size in sizes:
+            with seeded(size, workdir):
+                for status in (None, "available", "sold"):
+                    for cursor_name, cursor in (("start", None), ("middle", size // 2)):
+                        params = {"limit": 100, **({"status": status} if status else {}),
+                                  **({"cursor": cursor} if cursor else {})}
+                        await bench(f"list_pets[{size},{status or 'any'},{cursor_name}]",
+                                    lambda params=params: client.get("/pets", params=params))
+
+
+def run(args: argparse.Namespace) -> int:
+    sizes = [int(size) for size in args.sizes.split(",")]
+    results = asyncio.run(run_benchmarks(sizes, args.iterations, args.warmup))
+    report = {
+        "meta": {"python": platform.python_version(), "machine": platform.machine(),
+                 "backend": Config.PET_STORE_BACKEND, "created_at": datetime.utcnow().isoformat()},
+        "benchmarks": results,
+    }
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    return 0
+
+
+def compare(args: argparse.Namespace) -> int:
+    with open(args.baseline) as f:
+        baseline = json.load(f)["benchmarks"]
+    with open(args.current) as f:
+        current = json.load(f)["benchmarks"]
+
+    regressions = []
+    for name in sorted(baseline.keys() & current.keys()):
+        ratio = current[name]["median_us"] / baseline[name]["median_us"]
+        marker = "REGRESSION" if ratio > 1 + args.threshold else ""
+        print(f"{name:<45} {baseline[name]['median_us']:>10} -> {current[name]['median_us']:>10} us "
+              f"({ratio:.2f}x) {marker}")
+        if marker:
+            regressions.append(name)
+    for name in sorted(baseline.keys() - current.keys()):
+        print(f"{name:<45} missing from current run")
+
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed more than {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+def main_cli(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Pet service benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run benchmarks and save results")
+    run_parser.add_argument("--sizes", default=DEFAULT_SIZES, help="store sizes for list_pets")
+    run_parser.add_argument("--iterations", type=int, default=200)
+    run_parser.add_argument("--warmup", type=int, default=20)
+    run_parser.add_argument("--output", default=".benchmarks/current.json")
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="compare results against a baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.2, help="allowed median slowdown, 0.2 = 20%%")
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
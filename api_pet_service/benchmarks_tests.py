@@ -0,0 +1,60 @@
+import argparse
+import asyncio
+import json
+import sqlite3
+
+import pytest
+
+from api_pet_service import benchmarks
+from api_pet_service import main as service
+from core.config import Config
+
+
+def write_results(path, medians):
+    path.write_text(json.dumps({"meta": {}, "benchmarks": {name: {"median_us": median}
+                                                           for name, median in medians.items()}}))
+    return str(path)
+
+
+def compare(tmp_path, baseline, current, threshold=0.2):
+    args = argparse.Namespace(
+        baseline=write_results(tmp_path / "baseline.json", baseline),
+        current=write_results(tmp_path / "current.json", current),
+        threshold=threshold)
+    return benchmarks.compare(args)
+
+
+def test_compare_fails_only_past_the_threshold(tmp_path, capsys):
+    baseline = {"get_pet": 100.0, "list_pets": 200.0, "create_pet": 50.0}
+
+    assert compare(tmp_path, baseline, {"get_pet": 119.0, "list_pets": 150.0, "create_pet": 50.0}) == 0
+    assert compare(tmp_path, baseline, {"get_pet": 121.0, "list_pets": 200.0}) == 1
+
+    out = capsys.readouterr().out
+    assert "get_pet" in out and "REGRESSION" in out
+    assert "create_pet" in out and "missing from current run" in out
+
+
+def test_sqlite_runs_never_touch_the_service_store(tmp_path, monkeypatch):
+    store_path = tmp_path / "service.sqlite3"
+    monkeypatch.setattr(Config, "PET_STORE_BACKEND", "sqlite")
+    monkeypatch.setattr(Config, "PET_STORE_PATH", str(store_path))
+    stores = service.PETS, service.IDEMP_STORE
+
+    results = asyncio.run(benchmarks.run_benchmarks([10, 50], iterations=2, warmup=0))
+
+    assert "list_pets[50,any,middle]" in results
+    assert not store_path.exists()
+    assert (service.PETS, service.IDEMP_STORE) == stores
+
+
+def test_seeded_stores_are_closed_and_replaced_back(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "PET_STORE_BACKEND", "sqlite")
+    stores = service.PETS, service.IDEMP_STORE
+
+    with benchmarks.seeded(10, str(tmp_path)):
+        seeded = service.PETS
+        assert len(seeded) == 10
+    with pytest.raises(sqlite3.ProgrammingError):
+        len(seeded)
+    assert (service.PETS, service.IDEMP_STORE) == stores
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from dataclasses import asdict, dataclass
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+"""
+Idempotency-Key store for create_pet.
+
+Entries keep a sha256 of the canonical request body (not the body itself) and
+the created pet id. The default implementation is a bounded LRU with TTL, so a
+long soak run doesn't grow the service memory forever.
+"""
+
+
+def body_hash(canonical_body: str) -> str:
+    return hashlib.sha256(canonical_body.encode()).hexdigest()
+
+
+@dataclass
+class IdempotencyEntry:
+    body_hash: str
+    pet_id: int
+    expires_at: float
+
+
+@dataclass
+class IdempotencyStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+class IdempotencyCache(ABC):
+    """Interface for idempotency stores (in-memory, persistent, ...)"""
+
+    stats: IdempotencyStats
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[IdempotencyEntry]:
+        ...
+
+    @abstractmethod
+    def put(self, key: str, body_hash: str, pet_id: int) -> None:
+        ...
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+
+class LRUIdempotencyCache(IdempotencyCache):
+
+    def __init__(self, max_size: int = 10_000, ttl: float = 3600.0, clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.stats = IdempotencyStats()
+        self._clock = clock
+        self._entries: OrderedDict[str, IdempotencyEntry] = OrderedDict()
+        # (expires_at, key) in put order, which is expiry order: every entry gets the same ttl
+        self._expiry: Deque[Tuple[float, str]] = deque()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[IdempotencyEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= self._clock():
+                del self._entries[key]
+                self.stats.expirations += 1
+                entry = None
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return entry
+
+    def put(self, key: str, body_hash: str, pet_id: int) -> None:
+        with self._lock:
+            now = self._clock()
+            self._entries[key] = IdempotencyEntry(body_hash=body_hash, pet_id=pet_id, expires_at=now + self.ttl)
+            self._entries.move_to_end(key)
+            self._expiry.append((now + self.ttl, key))
+            self._drop_expired(now)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+            if len(self._expiry) > 2 * self.max_size:
+                # evicted and re-put keys leave stale items behind
+                self._expiry = deque(sorted((entry.expires_at, key) for key, entry in self._entries.items()))
+
+    def _drop_expired(self, now: float) -> None:
+        # by expiry, not by LRU position: a recently read entry can be older than the ones behind it
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, key = self._expiry.popleft()
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at == expires_at:
+                del self._entries[key]
+                self.stats.expirations += 1
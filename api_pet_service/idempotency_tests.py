@@ -0,0 +1,75 @@
+import pytest
+
+from api_pet_service.idempotency import IdempotencyCache, LRUIdempotencyCache, body_hash
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entry_keeps_body_hash_only():
+    cache = LRUIdempotencyCache()
+    cache.put("key", body_hash('{"name":"kitty"}'), pet_id=1)
+    entry = cache.get("key")
+    assert entry.pet_id == 1
+    assert entry.body_hash == body_hash('{"name":"kitty"}')
+    assert cache.stats.hits == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LRUIdempotencyCache(max_size=2)
+    cache.put("a", "h", 1)
+    cache.put("b", "h", 2)
+    cache.get("a")
+    cache.put("c", "h", 3)
+    assert cache.get("b") is None
+    assert cache.get("a").pet_id == 1
+    assert cache.stats.evictions == 1
+    assert cache.stats.misses == 1
+
+
+def test_entry_expires_after_ttl():
+    clock = FakeClock()
+    cache = LRUIdempotencyCache(ttl=10, clock=clock)
+    cache.put("a", "h", 1)
+    clock.now = 10
+    assert cache.get("a") is None
+    assert len(cache) == 0
+    assert cache.stats.expirations == 1
+
+
+def test_expired_entries_behind_a_recently_read_one_are_dropped():
+    clock = FakeClock()
+    cache = LRUIdempotencyCache(ttl=10, clock=clock)
+    cache.put("a", "h", 1)
+    clock.now = 5
+    cache.put("b", "h", 2)
+    clock.now = 6
+    cache.get("a")  # LRU order is now b, a; a still expires first
+    clock.now = 12
+    cache.put("c", "h", 3)
+    assert len(cache) == 2
+    assert cache.stats.expirations == 1
+    assert cache.get("b").pet_id == 2
+
+
+def test_expiry_queue_stays_bounded_under_eviction():
+    cache = LRUIdempotencyCache(max_size=3, ttl=3600)
+    for i in range(100):
+        cache.put(f"key-{i}", "h", i)
+    assert len(cache) == 3
+    assert len(cache._expiry) <= 6
+
+
+def test_incomplete_backend_fails_on_instantiation():
+    class GetOnly(IdempotencyCache):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError, match="put"):
+        GetOnly()
@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+import httpx
+
+from api_pet_service.api_client import FastApiClient
+from core.api.users import Users
+from core.latency import LatencyHistogram
+
+"""
+Load generator for api_pet_service.
+
+Replays a weighted mix of create / get / list (with cursor) / patch (with If-Match) /
+delete at a target RPS with async workers and reports per-endpoint latency
+percentiles and error rates as JSON. get / patch / delete pick a pet created or
+seeded by the run; with none left the operation is skipped and counted as
+"no_target", not sent.
+
+Run locally (from the repo root):
+uvicorn api_pet_service.main:app --port 8001
+python -m api_pet_service.load_runner --rps 200 --duration 30 --mix create=2,get=5,list=2,patch=1,delete=1
+"""
+
+STATUSES = ["available", "pending", "sold"]
+DEFAULT_MIX = "create=2,get=5,list=2,patch=1,delete=1"
+NO_TARGET = "no_target"
+
+
+class EndpointStats:
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.statuses: Counter[str] = Counter()
+        self.errors = 0
+        self.skipped = 0
+
+    def record(self, seconds: float, status: str, error: bool) -> None:
+        self.latency.record(seconds)
+        self.statuses[status] += 1
+        self.errors += error
+
+    def record_skip(self) -> None:
+        self.statuses[NO_TARGET] += 1
+        self.skipped += 1
+
+    def as_dict(self) -> dict:
+        count = self.latency.total
+        return {
+            "count": count,
+            "errors": self.errors,
+            "skipped": self.skipped,
+            "error_rate": round(self.errors / count, 4) if count else 0.0,
+            "p50_ms": self.latency.percentile(50),
+            "p95_ms": self.latency.percentile(95),
+            "p99_ms": self.latency.percentile(99),
+            "max_ms": self.latency.max_us / 1000,
+            "mean_ms": round(self.latency.sum_us / count / 1000, 3) if count else 0.0,
+            "statuses": dict(self.statuses),
+        }
+
+
+class PetPool:
+    """Ids (and last seen versions) of pets created by the run, O(1) random pick and removal"""
+
+    def __init__(self):
+        self.ids: List[int] = []
+        self.versions: Dict[int, int] = {}
+        self._positions: Dict[int, int] = {}
+
+    def add(self, pet_id: int, version: int = 1) -> None:
+        if pet_id not in self._positions:
+            self._positions[pet_id] = len(self.ids)
+            self.ids.append(pet_id)
+        self.versions[pet_id] = version
+
+    def remove(self, pet_id: int) -> None:
+        position = self._positions.pop(pet_id, None)
+        if position is None:
+            return
+        last = self.ids.pop()
+        if last != pet_id:
+            self.ids[position] = last
+            self._positions[last] = position
+        self.versions.pop(pet_id, None)
+
+    def pick(self) -> Optional[int]:
+        return random.choice(self.ids) if self.ids else None
+
+
+class LoadRunner:
+
+    def __init__(self, client: FastApiClient, mix: Dict[str, float], rps: float, duration: float,
+                 workers: int = 50, timeout: float = 10.0):
+        self.client = client
+        self.mix = mix
+        self.rps = rps
+        self.duration = duration
+        self.workers = workers
+        self.timeout = timeout
+        self.pets = PetPool()
+        self.stats: Dict[str, EndpointStats] = {name: EndpointStats() for name in mix}
+        self.lag = LatencyHistogram()
+        self.http: Optional[httpx.AsyncClient] = None
+        self._operations = {"create": self._create, "get": self._get, "list": self._list,
+                            "patch": self._patch, "delete": self._delete}
+
+    async def run(self) -> dict:
+        # token and headers come from FastApiClient, traffic goes through one async keep-alive pool
+        limits = httpx.Limits(max_connections=self.workers, max_keepalive_connections=self.workers)
+        async with httpx.AsyncClient(base_url=self.client.base_url, headers=dict(self.client.api.headers),
+                                     limits=limits, timeout=self.timeout) as http:
+            self.http = http
+            queue: asyncio.Queue[Optional[float]] = asyncio.Queue()
+            workers = [asyncio.create_task(self._worker(queue)) for _ in range(self.workers)]
+            started = time.perf_counter()
+            await self._schedule(queue, started)
+            for _ in workers:
+                queue.put_nowait(None)
+            await asyncio.gather(*workers)
+            elapsed = time.perf_counter() - started
+        return self.report(elapsed)
+
+    def report(self, elapsed: float) -> dict:
+        total = sum(s.latency.total for s in self.stats.values())
+        return {
+            "target_rps": self.rps,
+            "achieved_rps": round(total / elapsed, 2) if elapsed else 0.0,
+            "duration_s": round(elapsed, 3),
+            "requests": total,
+            "errors": sum(s.errors for s in self.stats.values()),
+            "schedule_lag_p99_ms": self.lag.percentile(99),
+            "endpoints": {name: s.as_dict() for name, s in self.stats.items()},
+        }
+
+    async def _schedule(self, queue: asyncio.Queue, started: float) -> None:
+        # open loop: request i is due at started + i / rps, regardless of how slow responses are
+        interval = 1 / self.rps
+        for i in range(int(self.rps * self.duration)):
+            due = started + i * interval
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            queue.put_nowait(due)
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        names, weights = list(self.mix), list(self.mix.values())
+        while (due := await queue.get()) is not None:
+            name = random.choices(names, weights)[0]
+            # latency is measured from the scheduled time, so queueing behind slow responses
+            # is not hidden (coordinated omission)
+            self.lag.record(max(0.0, time.perf_counter() - due))
+            try:
+                response = await self._operations[name]()
+                if response is None:
+                    self.stats[name].record_skip()
+                    continue
+                status, error = str(response.status_code), response.status_code >= 400
+            except httpx.HTTPError as e:
+                status, error = type(e).__name__, True
+            self.stats[name].record(time.perf_counter() - due, status, error)
+
+    async def _create(self) -> httpx.Response:
+        body = {"name": f"load_{random.getrandbits(32):08x}", "status": random.choice(STATUSES)}
+        response = await self.http.post("/pets", json=body,
+                                        headers={"Idempotency-Key": f"{random.getrandbits(64):016x}"})
+        if response.status_code in (200, 201):
+            self.pets.add(response.json()["id"])
+        return response
+
+    async def _get(self) -> Optional[httpx.Response]:
+        pet_id = self.pets.pick()
+        if pet_id is None:
+            return None
+        return await self.http.get(f"/pets/{pet_id}")
+
+    async def _list(self) -> httpx.Response:
+        params = {"limit": 100}
+        if random.random() < 0.5:
+            params["status"] = random.choice(STATUSES)
+        cursor = self.pets.pick()
+        if cursor is not None and random.random() < 0.8:
+            params["cursor"] = cursor
+        return await self.http.get("/pets", params=params)
+
+    async def _patch(self) -> Optional[httpx.Response]:
+        pet_id = self.pets.pick()
+        if pet_id is None:
+            return None
+        version = self.pets.versions.get(pet_id, 1)
+        response = await self.http.patch(f"/pets/{pet_id}", json={"status": random.choice(STATUSES)},
+                                         headers={"If-Match": f'W/"{version}"'})
+        if response.status_code == 200 and pet_id in self.pets.versions:
+            self.pets.versions[pet_id] = response.json()["version"]
+        return response
+
+    async def _delete(self) -> Optional[httpx.Response]:
+        pet_id = self.pets.pick()
+        if pet_id is None:
+            return None
+        self.pets.remove(pet_id)
+        return await self.http.delete(f"/pets/{pet_id}")
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ("create", "get", "list", "patch", "delete"):
+            raise ValueError(f"Unknown operation in mix: {name}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def seed(client: FastApiClient, runner: LoadRunner, count: int, batch_size: int = 1000) -> None:
+    for start in range(0, count, batch_size):
+        pets = [{"name": f"seed_{i}", "status": random.choice(STATUSES)}
+                for i in range(start, min(count, start + batch_size))]
+        response = client.batch_create_pets(pets)
+        response.raise_for_status()
+        for result in response.json()["results"]:
+            if result["status"] == 201:
+                runner.pets.add(result["id"])
+
+
+def main(argv: Optional[List[str]] = None) -> dict:
+    parser = argparse.ArgumentParser(description="Load runner for api_pet_service")
+    parser.add_argument("--rps", type=float, default=100)
+    parser.add_argument("--duration", type=float, default=30, help="seconds")
+    parser.add_argument("--workers", type=int, default=50)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="weighted operations, e.g. " + DEFAULT_MIX)
+    parser.add_argument("--seed-pets", type=int, default=1000, help="pets created (in batches) before the run")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    client = FastApiClient(user=Users.FASTAPI_USER)
+    runner = LoadRunner(client, parse_mix(args.mix), rps=args.rps, duration=args.duration, workers=args.workers)
+    seed(client, runner, args.seed_pets)
+    report = asyncio.run(runner.run())
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    print(text)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from api_pet_service.load_runner import NO_TARGET, LatencyHistogram, LoadRunner, PetPool, parse_mix
+
+
+def test_histogram_percentiles_are_within_bucket_error():
+    histogram = LatencyHistogram()
+    for ms in range(1, 1001):
+        histogram.record(ms / 1000)
+
+    assert histogram.percentile(50) == pytest.approx(500, rel=0.02)
+    assert histogram.percentile(99) == pytest.approx(990, rel=0.02)
+    assert histogram.percentile(100) == 1000
+
+
+def test_pet_pool_removes_in_place():
+    pool = PetPool()
+    for pet_id in (1, 2, 3):
+        pool.add(pet_id)
+    pool.remove(1)
+    assert sorted(pool.ids) == [2, 3]
+    assert 1 not in pool.versions
+
+
+def test_parse_mix_rejects_unknown_operation():
+    assert parse_mix("get=3,list") == {"get": 3.0, "list": 1.0}
+    with pytest.raises(ValueError):
+        parse_mix("get=1,explode=1")
+
+
+def test_operations_without_a_pet_are_skipped_not_sent():
+    sent = []
+
+    def service(request):
+        sent.append(request)
+        return httpx.Response(200, json={"id": 1, "version": 2})
+
+    runner = LoadRunner(client=None, mix={"get": 1, "patch": 1, "delete": 1}, rps=1, duration=0)
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(service), base_url="http://svc") as http:
+            runner.http = http
+            queue = asyncio.Queue()
+            for _ in range(30):
+                queue.put_nowait(time.perf_counter())
+            queue.put_nowait(None)
+            await runner._worker(queue)
+
+    asyncio.run(run())
+
+    report = runner.report(elapsed=1.0)
+    assert sent == []
+    assert report["requests"] == 0 and report["errors"] == 0
+    assert sum(endpoint["skipped"] for endpoint in report["endpoints"].values()) == 30
+    assert all(set(endpoint["statuses"]) <= {NO_TARGET} for endpoint in report["endpoints"].values())
@@ -1,19 +1,23 @@
 from __future__ import annotations
 
 from fastapi import FastAPI, HTTPException, Depends, Header, status, Query
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel, Field
 from enum import Enum
-from typing import Optional, List, Dict
+from typing import Optional, List
 from datetime import datetime
-import itertools
-import time
+import asyncio
 import json
 
+from api_pet_service.idempotency import IdempotencyCache, LRUIdempotencyCache, body_hash
+from api_pet_service.sqlite_storage import open_stores as open_sqlite_stores
+from api_pet_service.storage import BasePetStore, PetStore
+from core.config import Config
+
 """
 Run the service:
 pip install "fastapi[standard]" uvicorn
-uvicorn main:app --reload --port 8001
+uvicorn api_pet_service.main:app --reload --port 8001  # from the repo root
 
 Swagger docs:
 http://127.0.0.1:8001/docs#/
@@ -36,7 +40,7 @@ class LoginResponse(BaseModel):
     token_type: str = "Bearer"
 
 
-def get_current_user(authorization: str = Header(default="")) -> str:
+async def get_current_user(authorization: str = Header(default="")) -> str:
     """Expect Authorization: Bearer <token>"""
     if authorization.startswith("Bearer "):
         token = authorization.split(" ", 1)[1]
@@ -48,7 +52,7 @@ def get_current_user(authorization: str = Header(default="")) -> str:
 
 
 @app.post("/auth/login", response_model=LoginResponse, tags=["auth"])
-def login(req: LoginRequest):
+async def login(req: LoginRequest):
     if req.username == TEST_USER["username"] and req.password == TEST_USER["password"]:
         token = "test-token"
         VALID_TOKENS.add(token)
@@ -94,11 +98,20 @@ class Pet(PetBase):
     version: int = 1
 
 
-# In-memory DB
-_id_counter = itertools.count(1)
-PETS: Dict[int, Pet] = {}
-# Idempotency store: key -> {"body": str, "pet_id": int}
-IDEMP_STORE: Dict[str, Dict[str, str | int]] = {}
+# Storage, selected by Config.PET_STORE_BACKEND. Handlers are async and run on the event
+# loop; PETS.lock guards read-check-write sequences (idempotency, If-Match) against
+# concurrent writers.
+def _create_stores(path: Optional[str] = None) -> tuple[BasePetStore[Pet], IdempotencyCache]:
+    """path: sqlite file instead of Config.PET_STORE_PATH (ignored by the memory backend)"""
+    if Config.PET_STORE_BACKEND == "memory":
+        return PetStore(), LRUIdempotencyCache(max_size=Config.IDEMPOTENCY_MAX_SIZE, ttl=Config.IDEMPOTENCY_TTL)
+    if Config.PET_STORE_BACKEND == "sqlite":
+        return open_sqlite_stores(path or Config.PET_STORE_PATH, model=Pet, max_size=Config.IDEMPOTENCY_MAX_SIZE,
+                                  ttl=Config.IDEMPOTENCY_TTL)
+    raise ValueError(f"Unknown PET_STORE_BACKEND: {Config.PET_STORE_BACKEND}")
+
+
+PETS, IDEMP_STORE = _create_stores()
 
 
 def _canonical_body(model: BaseModel) -> str:
@@ -106,138 +119,257 @@ def _canonical_body(model: BaseModel) -> str:
     return json.dumps(model.model_dump(), sort_keys=True, separators=(",", ":"))
 
 
-def _pet_to_response(pet: Pet) -> JSONResponse:
-    # Attach ETag (weak) as version
-    headers = {"ETag": f'W/"{pet.version}"'}
-    return JSONResponse(content=pet.model_dump(), headers=headers)
+def _check_if_match(if_match: Optional[str], pet: Pet) -> None:
+    # Optimistic concurrency via If-Match: expect version number
+    if if_match is None:
+        return
+    try:
+        expected = int(if_match.strip('W/"'))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid If-Match header")
+    if expected != pet.version:
+        raise HTTPException(status_code=412, detail="Version mismatch")
+
+
+def _etag(pet: Pet) -> str:
+    # Weak ETag is the version
+    return f'W/"{pet.version}"'
+
+
+def _etag_matches(if_none_match: Optional[str], pet: Pet) -> bool:
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # weak comparison: W/"2" and "2" are the same tag
+    version = str(pet.version)
+    return any(tag.strip().removeprefix("W/").strip('"') == version for tag in if_none_match.split(","))
+
+
+def _pet_to_response(pet: Pet, status_code: int = 200) -> Response:
+    # Encoded body is cached per pet version by the store
+    return Response(content=PETS.encoded(pet), status_code=status_code, media_type="application/json",
+                    headers={"ETag": _etag(pet)})
 
 
 @app.get("/health", tags=["meta"])
-def health():
+async def health():
     return {"status": "ok", "time": datetime.utcnow().isoformat()}
 
 
-@app.post("/pets", response_model=Pet, status_code=201, tags=["pets"])
-def create_pet(req: PetCreate,
-               idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key"),
-               user: str = Depends(get_current_user)):
-    # Handle idempotency
-    if idempotency_key:
-        entry = IDEMP_STORE.get(idempotency_key)
-        body = _canonical_body(req)
-        if entry:
-            if entry["body"] == body:
-                # Return existing resource (200 OK) with replay header
-                pet = PETS.get(int(entry["pet_id"]))
-                if not pet:
+def _create(req: PetCreate, idempotency_key: Optional[str]) -> tuple[Pet, bool]:
+    """Create a pet, returns (pet, replayed)"""
+    with PETS.lock:
+        # Handle idempotency
+        body = body_hash(_canonical_body(req)) if idempotency_key else None
+        if idempotency_key:
+            entry = IDEMP_STORE.get(idempotency_key)
+            if entry:
+                if entry.body_hash == body:
+                    # Return existing resource with replay flag
+                    pet = PETS.get(entry.pet_id)
+                    if pet:
+                        return pet, True
                     # stale entry, treat as new
-                    pass
                 else:
-                    resp = _pet_to_response(pet)
-                    resp.status_code = 200
-                    resp.headers["Idempotency-Replayed"] = "true"
-                    return resp
-            else:
-                raise HTTPException(status_code=409, detail="Idempotency-Key already used with different body")
+                    raise HTTPException(status_code=409, detail="Idempotency-Key already used with different body")
 
-    pet_id = next(_id_counter)
-    pet = Pet(id=pet_id, created_at=datetime.utcnow(), **req.model_dump())
-    PETS[pet_id] = pet
+        pet_id = PETS.next_id()
+        pet = Pet(id=pet_id, created_at=datetime.utcnow(), **req.model_dump())
+        PETS.put(pet)
 
-    if idempotency_key:
-        IDEMP_STORE[idempotency_key] = {"body": _canonical_body(req), "pet_id": pet_id}
+        if idempotency_key:
+            IDEMP_STORE.put(idempotency_key, body, pet_id)
+    return pet, False
 
-    return _pet_to_response(pet)
+
+def _update(pet_id: int, req: PetUpdate, if_match: Optional[str]) -> Pet:
+    with PETS.lock:
+        pet = PETS.get(pet_id)
+        if not pet:
+            raise HTTPException(status_code=404, detail="Pet not found")
+        _check_if_match(if_match, pet)
+
+        data = pet.model_dump()
+        patch = req.model_dump(exclude_unset=True)
+        data.update(patch)
+        data["version"] = pet.version + 1
+        pet = Pet(**data)
+        PETS.put(pet)
+    return pet
+
+
+def _delete(pet_id: int) -> None:
+    if PETS.delete(pet_id) is None:
+        raise HTTPException(status_code=404, detail="Pet not found")
+
+
+@app.post("/pets", response_model=Pet, status_code=201, tags=["pets"])
+async def create_pet(req: PetCreate,
+                     idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key"),
+                     user: str = Depends(get_current_user)):
+    pet, replayed = _create(req, idempotency_key)
+    if replayed:
+        # Return existing resource (200 OK) with replay header
+        resp = _pet_to_response(pet)
+        resp.headers["Idempotency-Replayed"] = "true"
+        return resp
+    return _pet_to_response(pet, status_code=201)
+
+
+# Registered before /pets/{pet_id} so "export" is not parsed as an id
+@app.get("/pets/export", tags=["pets"])
+async def export_pets(status: Optional[PetStatus] = Query(default=None),
+                      since_id: Optional[int] = Query(default=None, description="Export items with id > since_id")):
+    # NDJSON: one pet per line, streamed page by page from the store
+    def lines():
+        for pet in PETS.scan(status=status, cursor=since_id):
+            yield PETS.encoded(pet) + b"\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
 
 
 @app.get("/pets/{pet_id}", response_model=Pet, tags=["pets"])
-def get_pet(pet_id: int):
+async def get_pet(pet_id: int,
+                  if_none_match: Optional[str] = Header(default=None, alias="If-None-Match")):
     pet = PETS.get(pet_id)
     if not pet:
         raise HTTPException(status_code=404, detail="Pet not found")
+    if _etag_matches(if_none_match, pet):
+        return Response(status_code=304, headers={"ETag": _etag(pet)})
     return _pet_to_response(pet)
 
 
 @app.get("/pets", tags=["pets"])
-def list_pets(status: Optional[PetStatus] = Query(default=None),
-              limit: int = Query(default=10, ge=1, le=100),
-              cursor: Optional[int] = Query(default=None, description="Return items with id > cursor")):
-    items = [p for p in PETS.values() if status is None or p.status == status]
-    items.sort(key=lambda p: p.id)
-    if cursor:
-        items = [p for p in items if p.id > cursor]
-    page = items[:limit]
+async def list_pets(status: Optional[PetStatus] = Query(default=None),
+                    limit: int = Query(default=10, ge=1, le=100),
+                    cursor: Optional[int] = Query(default=None, description="Return items with id > cursor")):
+    page = PETS.page(status=status, cursor=cursor, limit=limit)
     next_cursor = page[-1].id if len(page) == limit else None
-    return {
-        "data": [p.model_dump() for p in page],
-        "next": next_cursor
-    }
+    # {"data": [...], "next": ...} assembled from the cached per-pet JSON
+    data = b",".join(PETS.encoded(p) for p in page)
+    body = b'{"data":[' + data + b'],"next":' + json.dumps(next_cursor).encode() + b"}"
+    return Response(content=body, media_type="application/json")
 
 
 @app.put("/pets/{pet_id}", response_model=Pet, tags=["pets"])
-def replace_pet(pet_id: int,
-                req: PetCreate,
-                if_match: Optional[str] = Header(default=None, alias="If-Match"),
-                user: str = Depends(get_current_user)):
-    pet = PETS.get(pet_id)
-    if not pet:
-        raise HTTPException(status_code=404, detail="Pet not found")
-
-    # Optimistic concurrency via If-Match: expect version number
-    if if_match is not None:
-        try:
-            expected = int(if_match.strip('W/"'))
-        except Exception:
-            raise HTTPException(status_code=400, detail="Invalid If-Match header")
-        if expected != pet.version:
-            raise HTTPException(status_code=412, detail="Version mismatch")
-
-    pet = Pet(id=pet_id, created_at=pet.created_at, version=pet.version + 1, **req.model_dump())
-    PETS[pet_id] = pet
+async def replace_pet(pet_id: int,
+                      req: PetCreate,
+                      if_match: Optional[str] = Header(default=None, alias="If-Match"),
+                      user: str = Depends(get_current_user)):
+    with PETS.lock:
+        pet = PETS.get(pet_id)
+        if not pet:
+            raise HTTPException(status_code=404, detail="Pet not found")
+        _check_if_match(if_match, pet)
+
+        pet = Pet(id=pet_id, created_at=pet.created_at, version=pet.version + 1, **req.model_dump())
+        PETS.put(pet)
     return _pet_to_response(pet)
 
 
 @app.patch("/pets/{pet_id}", response_model=Pet, tags=["pets"])
-def update_pet(pet_id: int,
-               req: PetUpdate,
-               if_match: Optional[str] = Header(default=None, alias="If-Match"),
-               user: str = Depends(get_current_user)):
-    pet = PETS.get(pet_id)
-    if not pet:
-        raise HTTPException(status_code=404, detail="Pet not found")
-
-    if if_match is not None:
-        try:
-            expected = int(if_match.strip('W/"'))
-        except Exception:
-            raise HTTPException(status_code=400, detail="Invalid If-Match header")
-        if expected != pet.version:
-            raise HTTPException(status_code=412, detail="Version mismatch")
-
-    data = pet.model_dump()
-    patch = req.model_dump(exclude_unset=True)
-    data.update(patch)
-    pet = Pet(**data, version=pet.version + 1)
-    PETS[pet_id] = pet
-    return _pet_to_response(pet)
+async def update_pet(pet_id: int,
+                     req: PetUpdate,
+                     if_match: Optional[str] = Header(default=None, alias="If-Match"),
+                     user: str = Depends(get_current_user)):
+    return _pet_to_response(_update(pet_id, req, if_match))
 
 
 @app.delete("/pets/{pet_id}", status_code=204, tags=["pets"])
-def delete_pet(pet_id: int, user: str = Depends(get_current_user)):
-    if pet_id not in PETS:
-        raise HTTPException(status_code=404, detail="Pet not found")
-    PETS.pop(pet_id)
+async def delete_pet(pet_id: int, user: str = Depends(get_current_user)):
+    _delete(pet_id)
     return JSONResponse(status_code=204, content=None)
 
 
+# -----------------------
+# Batch operations: one request, one auth check, one validation pass.
+# Every item gets its own status (and Idempotency-Key / If-Match).
+# -----------------------
+MAX_BATCH_SIZE = 1000
+
+
+class BatchCreateItem(BaseModel):
+    pet: PetCreate
+    idempotency_key: Optional[str] = None
+
+class BatchUpdateItem(BaseModel):
+    id: int
+    patch: PetUpdate
+    if_match: Optional[str] = None
+
+class BatchCreateRequest(BaseModel):
+    items: List[BatchCreateItem] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+class BatchUpdateRequest(BaseModel):
+    items: List[BatchUpdateItem] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+class BatchDeleteRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+def _batch_response(results: List[tuple[int, Optional[int], Optional[Pet], Optional[str]]]) -> Response:
+    # results: (status, id, pet, error); pet JSON comes from the store cache
+    items = []
+    for status_code, pet_id, pet, error in results:
+        item = b'{"status":%d,"id":%s' % (status_code, json.dumps(pet_id).encode())
+        if pet is not None:
+            item += b',"data":' + PETS.encoded(pet)
+        if error is not None:
+            item += b',"error":' + json.dumps(error).encode()
+        items.append(item + b"}")
+    return Response(content=b'{"results":[' + b",".join(items) + b"]}", media_type="application/json")
+
+
+@app.post("/pets:batchCreate", tags=["pets"])
+async def batch_create_pets(req: BatchCreateRequest, user: str = Depends(get_current_user)):
+    results = []
+    for item in req.items:
+        try:
+            pet, replayed = _create(item.pet, item.idempotency_key)
+            results.append((200 if replayed else 201, pet.id, pet, None))
+        except HTTPException as e:
+            results.append((e.status_code, None, None, e.detail))
+    return _batch_response(results)
+
+
+@app.post("/pets:batchUpdate", tags=["pets"])
+async def batch_update_pets(req: BatchUpdateRequest, user: str = Depends(get_current_user)):
+    results = []
+    for item in req.items:
+        try:
+            pet = _update(item.id, item.patch, item.if_match)
+            results.append((200, pet.id, pet, None))
+        except HTTPException as e:
+            results.append((e.status_code, item.id, None, e.detail))
+    return _batch_response(results)
+
+
+@app.post("/pets:batchDelete", tags=["pets"])
+async def batch_delete_pets(req: BatchDeleteRequest, user: str = Depends(get_current_user)):
+    results = []
+    for pet_id in req.ids:
+        try:
+            _delete(pet_id)
+            results.append((204, pet_id, None, None))
+        except HTTPException as e:
+            results.append((e.status_code, pet_id, None, e.detail))
+    return _batch_response(results)
+
+
+@app.get("/metrics/idempotency", tags=["meta"])
+async def idempotency_metrics():
+    return {"size": len(IDEMP_STORE), **IDEMP_STORE.stats.as_dict()}
+
+
 # Utilities for testing timeouts
 @app.get("/slow", tags=["meta"])
-def slow(delay: float = Query(1.0, ge=0.0, le=10.0)):
-    time.sleep(delay)
+async def slow(delay: float = Query(1.0, ge=0.0, le=10.0)):
+    await asyncio.sleep(delay)
     return {"slept": delay}
 
 
 # Root doc
 @app.get("/", tags=["meta"])
-def root():
+async def root():
     return {"message": "Mini API for testing. See /docs for Swagger UI."}
@@ -0,0 +1,108 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api_pet_service import main
+from api_pet_service.idempotency import LRUIdempotencyCache
+from api_pet_service.storage import PetStore
+
+"""
+In-process tests for api_pet_service: no uvicorn, no network.
+"""
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(main, "PETS", PetStore())
+    monkeypatch.setattr(main, "IDEMP_STORE", LRUIdempotencyCache(max_size=100))
+    client = TestClient(main.app)
+    token = client.post("/auth/login", json={"username": "test", "password": "test"}).json()["access_token"]
+    client.headers.update({"Authorization": f"Bearer {token}"})
+    return client
+
+
+@pytest.fixture
+def pet(client):
+    response = client.post("/pets", json={"name": "kitty", "status": "available"})
+    assert response.status_code == 201
+    return response.json()
+
+
+def test_parallel_if_match_updates_have_single_winner(client, pet):
+    def patch(i):
+        return client.patch(f"/pets/{pet['id']}", json={"name": f"kitty_{i}"}, headers={"If-Match": 'W/"1"'})
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        statuses = [r.status_code for r in pool.map(patch, range(50))]
+
+    assert statuses.count(200) == 1
+    assert statuses.count(412) == 49
+    assert client.get(f"/pets/{pet['id']}").json()["version"] == 2
+
+
+def test_parallel_creates_get_unique_ids(client):
+    def create(i):
+        return client.post("/pets", json={"name": f"kitty_{i}"}).json()["id"]
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        ids = list(pool.map(create, range(100)))
+
+    assert len(set(ids)) == 100
+
+
+def test_idempotent_create_is_replayed(client):
+    headers = {"Idempotency-Key": "key-1"}
+    first = client.post("/pets", json={"name": "kitty"}, headers=headers)
+    replay = client.post("/pets", json={"name": "kitty"}, headers=headers)
+    conflict = client.post("/pets", json={"name": "doggy"}, headers=headers)
+
+    assert first.status_code == 201
+    assert replay.status_code == 200
+    assert replay.headers["Idempotency-Replayed"] == "true"
+    assert replay.json()["id"] == first.json()["id"]
+    assert conflict.status_code == 409
+    assert client.get("/metrics/idempotency").json()["hits"] == 2
+
+
+def test_get_pet_honors_if_none_match(client, pet):
+    response = client.get(f"/pets/{pet['id']}")
+    etag = response.headers["ETag"]
+
+    not_modified = client.get(f"/pets/{pet['id']}", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+    client.patch(f"/pets/{pet['id']}", json={"status": "sold"})
+    modified = client.get(f"/pets/{pet['id']}", headers={"If-None-Match": etag})
+    assert modified.status_code == 200
+    assert modified.json()["status"] == "sold"
+
+
+def test_batch_operations_report_status_per_item(client, pet):
+    created = client.post("/pets:batchCreate", json={"items": [
+        {"pet": {"name": "a"}, "idempotency_key": "batch-1"},
+        {"pet": {"name": "b"}},
+        {"pet": {"name": "c"}, "idempotency_key": "batch-1"},
+    ]}).json()["results"]
+    assert [r["status"] for r in created] == [201, 201, 409]
+
+    updated = client.post("/pets:batchUpdate", json={"items": [
+        {"id": pet["id"], "patch": {"status": "sold"}, "if_match": 'W/"1"'},
+        {"id": created[1]["id"], "patch": {"status": "sold"}, "if_match": 'W/"5"'},
+    ]}).json()["results"]
+    assert [r["status"] for r in updated] == [200, 412]
+    assert updated[0]["data"]["status"] == "sold"
+
+    deleted = client.post("/pets:batchDelete", json={"ids": [pet["id"], pet["id"]]}).json()["results"]
+    assert [r["status"] for r in deleted] == [204, 404]
+
+
+def test_export_streams_ndjson(client):
+    for i, status in enumerate(["available", "sold", "available", "sold"]):
+        client.post("/pets", json={"name": f"kitty_{i}", "status": status})
+
+    response = client.get("/pets/export", params={"status": "sold", "since_id": 2})
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert [json.loads(line)["id"] for line in response.text.splitlines()] == [4]
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Iterable, List, Optional, Tuple, Type
+
+from api_pet_service.idempotency import IdempotencyCache, IdempotencyEntry, IdempotencyStats
+from api_pet_service.storage import BasePetStore, P
+
+"""
+SQLite storage mode for the pet service (PET_STORE_BACKEND=sqlite).
+
+Pets and idempotency entries survive restarts and the data set may exceed RAM:
+rows hold the pet JSON, the `id` primary key and a (status, id) index serve
+cursor pages. Startup only reads MAX(id).
+
+Pets and idempotency entries live in one file behind one connection:
+open_stores() gives the idempotency cache the pet store's connection and lock,
+so every statement on the file runs under that lock.
+"""
+
+
+def _status_key(status: object) -> str:
+    return getattr(status, "value", status)
+
+
+def connect(path: str) -> sqlite3.Connection:
+    # autocommit; WAL lets readers run next to the single writer
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class SqlitePetStore(BasePetStore[P]):
+
+    def __init__(self, path: str, model: Type[P], cache_size: int = 10_000,
+                 conn: Optional[sqlite3.Connection] = None):
+        self.lock = threading.RLock()
+        self._model = model
+        self._conn = conn or connect(path)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS pets "
+                           "(id INTEGER PRIMARY KEY, status TEXT NOT NULL, body BLOB NOT NULL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS pets_status_id ON pets (status, id)")
+        self._last_id = self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM pets").fetchone()[0]
+        # recently read/written pets with their stored JSON, so encoded() needs no second query
+        self._cache: OrderedDict[int, Tuple[P, bytes]] = OrderedDict()
+        self._cache_size = cache_size
+
+    def __len__(self) -> int:
+        return self._query("SELECT COUNT(*) FROM pets")[0][0]
+
+    def get(self, pet_id: int) -> Optional[P]:
+        cached = self._cache.get(pet_id)
+        if cached is not None:
+            return cached[0]
+        rows = self._query("SELECT body FROM pets WHERE id = ?", (pet_id,))
+        return self._load(rows[0][0]) if rows else None
+
+    def encoded(self, pet: P) -> bytes:
+        cached = self._cache.get(pet.id)
+        if cached is not None and cached[0] is pet:
+            return cached[1]
+        return pet.model_dump_json().encode()
+
+    def next_id(self) -> int:
+        with self.lock:
+            self._last_id += 1
+            return self._last_id
+
+    def put(self, pet: P) -> None:
+        body = pet.model_dump_json().encode()
+        with self.lock:
+            self._conn.execute("INSERT OR REPLACE INTO pets (id, status, body) VALUES (?, ?, ?)",
+                               (pet.id, _status_key(pet.status), body))
+            self._last_id = max(self._last_id, pet.id)
+            self._remember(pet, body)
+
+    def put_many(self, pets: Iterable[P]) -> None:
+        with self.lock:
+            def rows():
+                for pet in pets:
+                    self._last_id = max(self._last_id, pet.id)
+                    self._cache.pop(pet.id, None)
+                    yield pet.id, _status_key(pet.status), pet.model_dump_json().encode()
+
+            # one transaction instead of one per row
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany("INSERT OR REPLACE INTO pets (id, status, body) VALUES (?, ?, ?)", rows())
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def close(self) -> None:
+        """Closes the connection, shared with the idempotency cache of open_stores()"""
+        with self.lock:
+            self._cache.clear()
+            self._conn.close()
+
+    def delete(self, pet_id: int) -> Optional[P]:
+        with self.lock:
+            pet = self.get(pet_id)
+            if pet is not None:
+                self._conn.execute("DELETE FROM pets WHERE id = ?", (pet_id,))
+                self._cache.pop(pet_id, None)
+            return pet
+
+    def page(self, status: Optional[object] = None, cursor: Optional[int] = None, limit: int = 10) -> List[P]:
+        if status is None:
+            rows = self._query("SELECT body FROM pets WHERE id > ? ORDER BY id LIMIT ?", (cursor or 0, limit))
+        else:
+            rows = self._query("SELECT body FROM pets WHERE status = ? AND id > ? ORDER BY id LIMIT ?",
+                               (_status_key(status), cursor or 0, limit))
+        return [self._load(body) for body, in rows]
+
+    def _query(self, sql: str, params: Iterable = ()) -> list:
+        with self.lock:
+            return self._conn.execute(sql, tuple(params)).fetchall()
+
+    def _load(self, body: bytes) -> P:
+        pet = self._model.model_validate_json(body)
+        self._remember(pet, bytes(body))
+        return pet
+
+    def _remember(self, pet: P, body: bytes) -> None:
+        with self.lock:
+            self._cache[pet.id] = (pet, body)
+            self._cache.move_to_end(pet.id)
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+
+
+class SqliteIdempotencyCache(IdempotencyCache):
+    """Persistent idempotency store: LRU by last use, TTL by wall clock (survives restarts)"""
+
+    def __init__(self, path: str, max_size: int = 10_000, ttl: float = 3600.0,
+                 clock: Callable[[], float] = time.time, conn: Optional[sqlite3.Connection] = None,
+                 lock: Optional[threading.RLock] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.stats = IdempotencyStats()
+        self._clock = clock
+        self._lock = lock or threading.Lock()
+        self._conn = conn or connect(path)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS idempotency (key TEXT PRIMARY KEY, body_hash TEXT NOT NULL, "
+                           "pet_id INTEGER NOT NULL, expires_at REAL NOT NULL, last_used REAL NOT NULL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idempotency_last_used ON idempotency (last_used)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idempotency_expires_at ON idempotency (expires_at)")
+        self._size = self._conn.execute("SELECT COUNT(*) FROM idempotency").fetchone()[0]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def get(self, key: str) -> Optional[IdempotencyEntry]:
+        with self._lock:
+            now = self._clock()
+            row = self._conn.execute("SELECT body_hash, pet_id, expires_at FROM idempotency WHERE key = ?",
+                                     (key,)).fetchone()
+            if row is not None and row[2] <= now:
+                self._conn.execute("DELETE FROM idempotency WHERE key = ?", (key,))
+                self._size -= 1
+                self.stats.expirations += 1
+                row = None
+            if row is None:
+                self.stats.misses += 1
+                return None
+            self._conn.execute("UPDATE idempotency SET last_used = ? WHERE key = ?", (now, key))
+            self.stats.hits += 1
+            return IdempotencyEntry(body_hash=row[0], pet_id=row[1], expires_at=row[2])
+
+    def put(self, key: str, body_hash: str, pet_id: int) -> None:
+        with self._lock:
+            now = self._clock()
+            if self._conn.execute("SELECT 1 FROM idempotency WHERE key = ?", (key,)).fetchone() is None:
+                self._size += 1
+            self._conn.execute("INSERT OR REPLACE INTO idempotency (key, body_hash, pet_id, expires_at, last_used) "
+                               "VALUES (?, ?, ?, ?, ?)", (key, body_hash, pet_id, now + self.ttl, now))
+            expired = self._conn.execute("DELETE FROM idempotency WHERE expires_at <= ?", (now,)).rowcount
+            self._size -= expired
+            self.stats.expirations += expired
+            excess = self._size - self.max_size
+            if excess > 0:
+                evicted = self._conn.execute("DELETE FROM idempotency WHERE key IN "
+                                             "(SELECT key FROM idempotency ORDER BY last_used LIMIT ?)",
+                                             (excess,)).rowcount
+                self._size -= evicted
+                self.stats.evictions += evicted
+
+
+def open_stores(path: str, model: Type[P], max_size: int = 10_000,
+                ttl: float = 3600.0) -> Tuple[SqlitePetStore[P], SqliteIdempotencyCache]:
+    """Pet store and idempotency cache of one file, sharing its connection and lock"""
+    pets = SqlitePetStore(path, model=model)
+    return pets, SqliteIdempotencyCache(path, max_size=max_size, ttl=ttl, conn=pets._conn, lock=pets.lock)
@@ -0,0 +1,66 @@
+import pytest
+from pydantic import BaseModel
+
+from api_pet_service.sqlite_storage import SqliteIdempotencyCache, SqlitePetStore, open_stores
+
+
+class FakePet(BaseModel):
+    id: int
+    status: str = "available"
+    version: int = 1
+
+
+def test_pets_survive_reopen(tmp_path):
+    path = str(tmp_path / "pets.sqlite3")
+    store = SqlitePetStore(path, model=FakePet)
+    for i in range(1, 7):
+        store.put(FakePet(id=store.next_id(), status="sold" if i % 3 == 0 else "available"))
+    store.delete(3)
+
+    reopened = SqlitePetStore(path, model=FakePet)
+    assert len(reopened) == 5
+    assert reopened.next_id() == 7
+    assert [p.id for p in reopened.page(status="sold")] == [6]
+    assert [p.id for p in reopened.page(cursor=2, limit=2)] == [4, 5]
+
+
+def test_idempotency_entries_survive_reopen(tmp_path):
+    path = str(tmp_path / "pets.sqlite3")
+    SqliteIdempotencyCache(path).put("key", "hash", pet_id=1)
+
+    entry = SqliteIdempotencyCache(path).get("key")
+    assert entry.pet_id == 1
+    assert entry.body_hash == "hash"
+
+
+def test_open_stores_share_one_connection_and_lock(tmp_path):
+    pets, idempotency = open_stores(str(tmp_path / "pets.sqlite3"), model=FakePet)
+    pet = FakePet(id=pets.next_id())
+
+    with pets.lock:  # create_pet's read-check-write sequence, re-entered by the cache
+        pets.put(pet)
+        idempotency.put("key", "hash", pet_id=pet.id)
+
+    assert idempotency._conn is pets._conn and idempotency._lock is pets.lock
+    assert idempotency.get("key").pet_id == pets.get(pet.id).id
+
+
+def test_put_many_writes_one_transaction_and_rolls_back_on_error(tmp_path):
+    path = str(tmp_path / "pets.sqlite3")
+    store = SqlitePetStore(path, model=FakePet)
+    statements = []
+    store._conn.set_trace_callback(statements.append)
+
+    store.put_many(FakePet(id=store.next_id()) for _ in range(100))
+
+    assert statements.count("BEGIN") == 1 and statements.count("COMMIT") == 1
+    assert len(store) == 100 and store.next_id() == 101
+
+    def failing():
+        yield FakePet(id=200)
+        raise ValueError("broken source")
+
+    with pytest.raises(ValueError):
+        store.put_many(failing())
+    assert store.get(200) is None
+    store.close()
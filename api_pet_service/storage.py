@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import bisect
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Generic, Iterable, Iterator, List, Optional, Protocol, Tuple, TypeVar
+
+"""
+Storage layer for the pet service.
+
+BasePetStore is the interface main.py works against; PetStore is the in-memory
+implementation, SqlitePetStore (sqlite_storage.py) the persistent one.
+
+In memory, pets are kept in a dict by id plus a sorted list of ids, and one sorted id list
+per status (secondary index). A cursor page is a bisect seek plus `limit` steps
+instead of a full scan + sort of the whole collection.
+
+Encoded JSON of every pet version is cached until the next write of that pet.
+
+Single operations are atomic. Read-check-write sequences (If-Match, idempotency)
+must hold `store.lock` for the whole sequence.
+"""
+
+
+class StoredPet(Protocol):
+    id: int
+    status: object
+    version: int
+
+
+P = TypeVar("P", bound=StoredPet)
+
+
+def _model_json(pet) -> bytes:
+    return pet.model_dump_json().encode()
+
+
+class BasePetStore(ABC, Generic[P]):
+    """Interface for pet stores, ids are ordered ascending everywhere"""
+
+    lock: threading.RLock
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    def __contains__(self, pet_id: int) -> bool:
+        return self.get(pet_id) is not None
+
+    @abstractmethod
+    def get(self, pet_id: int) -> Optional[P]:
+        ...
+
+    @abstractmethod
+    def encoded(self, pet: P) -> bytes:
+        ...
+
+    @abstractmethod
+    def next_id(self) -> int:
+        ...
+
+    @abstractmethod
+    def put(self, pet: P) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, pet_id: int) -> Optional[P]:
+        ...
+
+    @abstractmethod
+    def page(self, status: Optional[object] = None, cursor: Optional[int] = None, limit: int = 10) -> List[P]:
+        ...
+
+    def put_many(self, pets: Iterable[P]) -> None:
+        """Bulk load (seeding); backends with transactions write them in one"""
+        for pet in pets:
+            self.put(pet)
+
+    def close(self) -> None:
+        """Release files / connections, the store is not used afterwards"""
+
+    def scan(self, status: Optional[object] = None, cursor: Optional[int] = None,
+             batch_size: int = 1000) -> Iterator[P]:
+        """Iterate pets with id > cursor ordered by id, one page seek per batch (constant memory)"""
+        while True:
+            page = self.page(status=status, cursor=cursor, limit=batch_size)
+            yield from page
+            if len(page) < batch_size:
+                return
+            cursor = page[-1].id
+
+
+class PetStore(BasePetStore[P]):
+
+    def __init__(self, encoder: Callable[[P], bytes] = _model_json):
+        self.lock = threading.RLock()
+        self._encoder = encoder
+        self._pets: Dict[int, P] = {}
+        self._encoded: Dict[int, Tuple[P, bytes]] = {}
+        self._ids: List[int] = []
+        self._by_status: Dict[object, List[int]] = {}
+        self._last_id = 0
+
+    def __len__(self) -> int:
+        return len(self._pets)
+
+    def __contains__(self, pet_id: int) -> bool:
+        return pet_id in self._pets
+
+    def get(self, pet_id: int) -> Optional[P]:
+        return self._pets.get(pet_id)
+
+    def encoded(self, pet: P) -> bytes:
+        """Encoded JSON of this pet version, computed once per write"""
+        cached = self._encoded.get(pet.id)
+        if cached is not None and cached[0] is pet:
+            return cached[1]
+        body = self._encoder(pet)
+        with self.lock:
+            if self._pets.get(pet.id) is pet:
+                self._encoded[pet.id] = (pet, body)
+        return body
+
+    def next_id(self) -> int:
+        with self.lock:
+            self._last_id += 1
+            return self._last_id
+
+    def put(self, pet: P) -> None:
+        with self.lock:
+            old = self._pets.get(pet.id)
+            self._pets[pet.id] = pet
+            self._encoded.pop(pet.id, None)
+            self._last_id = max(self._last_id, pet.id)
+            if old is None:
+                _insert(self._ids, pet.id)
+                _insert(self._by_status.setdefault(pet.status, []), pet.id)
+            elif old.status != pet.status:
+                _remove(self._by_status[old.status], pet.id)
+                _insert(self._by_status.setdefault(pet.status, []), pet.id)
+
+    def delete(self, pet_id: int) -> Optional[P]:
+        with self.lock:
+            pet = self._pets.pop(pet_id, None)
+            self._encoded.pop(pet_id, None)
+            if pet is not None:
+                _remove(self._ids, pet_id)
+                _remove(self._by_status[pet.status], pet_id)
+            return pet
+
+    def page(self, status: Optional[object] = None, cursor: Optional[int] = None, limit: int = 10) -> List[P]:
+        """Return up to `limit` pets with id > cursor, ordered by id"""
+        with self.lock:
+            ids = self._index(status)
+            start = bisect.bisect_right(ids, cursor) if cursor else 0
+            return [self._pets[pet_id] for pet_id in ids[start:start + limit]]
+
+    def _index(self, status: Optional[object]) -> List[int]:
+        if status is None:
+            return self._ids
+        return self._by_status.get(status, [])
+
+
+def _insert(ids: List[int], pet_id: int) -> None:
+    # ids are issued by a counter, so appending is the common case
+    if not ids or ids[-1] < pet_id:
+        ids.append(pet_id)
+    else:
+        bisect.insort(ids, pet_id)
+
+
+def _remove(ids: List[int], pet_id: int) -> None:
+    i = bisect.bisect_left(ids, pet_id)
+    if i < len(ids) and ids[i] == pet_id:
+        del ids[i]
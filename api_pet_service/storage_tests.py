@@ -0,0 +1,79 @@
+from dataclasses import dataclass
+
+import pytest
+
+from api_pet_service.storage import BasePetStore, PetStore
+
+
+@dataclass
+class FakePet:
+    id: int
+    status: str = "available"
+
+
+@pytest.fixture
+def store():
+    store = PetStore()
+    for pet_id in range(1, 11):
+        store.put(FakePet(id=pet_id, status="sold" if pet_id % 3 == 0 else "available"))
+    return store
+
+
+def test_page_is_ordered_by_id(store):
+    page = store.page(limit=4)
+    assert [p.id for p in page] == [1, 2, 3, 4]
+
+
+def test_page_seeks_by_cursor(store):
+    page = store.page(cursor=7, limit=10)
+    assert [p.id for p in page] == [8, 9, 10]
+
+
+def test_page_filters_by_status(store):
+    page = store.page(status="sold", cursor=3, limit=10)
+    assert [p.id for p in page] == [6, 9]
+
+
+def test_status_change_moves_pet_between_indexes(store):
+    store.put(FakePet(id=6, status="pending"))
+    assert [p.id for p in store.page(status="sold")] == [3, 9]
+    assert [p.id for p in store.page(status="pending")] == [6]
+
+
+def test_scan_walks_pages_in_batches(store):
+    assert [p.id for p in store.scan(batch_size=3)] == list(range(1, 11))
+    assert [p.id for p in store.scan(status="sold", cursor=3, batch_size=1)] == [6, 9]
+
+
+def test_delete_removes_pet_from_indexes(store):
+    store.delete(3)
+    assert 3 not in store
+    assert [p.id for p in store.page(limit=3)] == [1, 2, 4]
+    assert [p.id for p in store.page(status="sold")] == [6, 9]
+
+
+def test_encoded_body_is_cached_until_next_write():
+    calls = []
+    store = PetStore(encoder=lambda pet: calls.append(pet) or f"{pet.id}:{pet.status}".encode())
+    pet = FakePet(id=1)
+    store.put(pet)
+    assert store.encoded(pet) == b"1:available"
+    assert store.encoded(pet) == b"1:available"
+    assert len(calls) == 1
+
+    sold = FakePet(id=1, status="sold")
+    store.put(sold)
+    assert store.encoded(sold) == b"1:sold"
+    assert len(calls) == 2
+
+
+def test_incomplete_store_fails_on_instantiation():
+    class ReadOnly(BasePetStore):
+        def __len__(self):
+            return 0
+
+        def get(self, pet_id):
+            return None
+
+    with pytest.raises(TypeError, match="put"):
+        ReadOnly()
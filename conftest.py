@@ -0,0 +1,30 @@
+import sys
+
+
+def pytest_sessionfinish(session, exitstatus):
+    # JSONL trace with HTTP_TRACE_FILE, one file per xdist worker
+    instrumentation = sys.modules.get("core.api.instrumentation")
+    if instrumentation:
+        path = instrumentation.trace_path()
+        if path and instrumentation.RECORDER.records:
+            instrumentation.RECORDER.write_trace(path)
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    # one flush per session, only when API clients were used: per-endpoint latency summary
+    # and retry / breaker counters, printed whatever the log level (under xdist the
+    # requests run in the workers and only the trace files have them)
+    instrumentation = sys.modules.get("core.api.instrumentation")
+    lines = instrumentation.RECORDER.summary_table() if instrumentation else []
+    if lines:
+        terminalreporter.write_sep("-", "HTTP requests by endpoint")
+        for line in lines:
+            terminalreporter.write_line(line)
+    transport = sys.modules.get("core.api.transport")
+    if transport:
+        wasted = {host: stats for host, stats in transport.METRICS.as_dict().items()
+                  if stats["retries"] or stats["rejected"]}
+        if wasted:
+            terminalreporter.write_sep("-", "HTTP retries and breaker rejections by host")
+            for host, stats in wasted.items():
+                terminalreporter.write_line(f"{host}: {stats}")
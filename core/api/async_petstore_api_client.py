@@ -0,0 +1,122 @@
+import asyncio
+import logging
+from typing import Awaitable, List, Optional, TypeVar
+
+import httpx
+
+from core.api.data_models import Pet, User
+from core.api.instrumentation import httpx_event_hooks
+from core.api.petstore_api_client import log_request
+from core.api.transport import ResilientAsyncTransport, async_timeout
+from core.config import Config
+
+"""
+Async siblings of PetAPI / UserAPI / StoreAPI.
+
+All clients share one AsyncApiPool: a single httpx.AsyncClient (keep-alive
+connection pool) plus a semaphore that limits in-flight requests. Use it for
+fan-out sweeps over many ids:
+
+    async with AsyncApiPool() as pool:
+        pet_api = AsyncPetAPI(pool, user=Users.BASIC_USER)
+        responses = await gather(*(pet_api.get_pet_by_id(i) for i in pet_ids))
+"""
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class AsyncApiPool:
+
+    def __init__(self,
+                 max_connections: int = Config.HTTP_POOL_SIZE,
+                 concurrency: int = Config.HTTP_CONCURRENCY,
+                 timeout: Optional[float] = None,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        # retries, backoff and circuit breakers: the transport policy shared with the sync clients
+        # (`transport` replaces it, e.g. httpx.MockTransport in tests)
+        self.client = httpx.AsyncClient(transport=transport or ResilientAsyncTransport(limits=limits),
+                                        timeout=timeout if timeout is not None else async_timeout(),
+                                        event_hooks=httpx_event_hooks(),
+                                        headers={"Content-Type": "application/json"})
+        self.semaphore = asyncio.Semaphore(concurrency)
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        async with self.semaphore:
+            response = await self.client.request(method, url, **kwargs)
+        log_request(response)
+        return response
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+
+async def gather(*aws: Awaitable[T], return_exceptions: bool = False) -> List[T]:
+    """asyncio.gather for client calls, the pool semaphore bounds concurrency"""
+    return list(await asyncio.gather(*aws, return_exceptions=return_exceptions))
+
+
+async def auth(pool: AsyncApiPool, user: User) -> Optional[str]:
+    if user is None:
+        return None
+    response = await pool.request("POST", f"{Config.BASE_PET_STORE_URL}/user/login", content=user.model_dump_json())
+    return response.headers.get("JWT-TOKEN")
+
+
+class AsyncPetAPI:
+
+    def __init__(self, pool: AsyncApiPool, user: User = None):
+        self.base_url = f"{Config.BASE_PET_STORE_URL}/pet"
+        self.pool = pool
+        self.user = user
+        self._headers: Optional[dict] = None
+        self._auth_lock = asyncio.Lock()
+
+    async def add_new_pet(self, new_pet: Pet) -> httpx.Response:
+        return await self._request("POST", self.base_url, content=new_pet.model_dump_json())
+
+    async def get_pet_by_id(self, pet_id: int) -> httpx.Response:
+        return await self._request("GET", f"{self.base_url}/{pet_id}")
+
+    async def update_pet(self, pet: Pet) -> httpx.Response:
+        return await self._request("PUT", f"{self.base_url}/{pet.id}", content=pet.model_dump_json())
+
+    async def delete_pet(self, pet_id: int) -> httpx.Response:
+        return await self._request("DELETE", f"{self.base_url}/{pet_id}")
+
+    async def find_pets_by_status(self, status: list[str]) -> httpx.Response:
+        return await self._request("GET", f"{self.base_url}/findByStatus", params={"status": status})
+
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        return await self.pool.request(method, url, headers=await self._auth_headers(), **kwargs)
+
+    async def _auth_headers(self) -> dict:
+        # login once per client, on first use
+        if self._headers is None:
+            async with self._auth_lock:
+                if self._headers is None:
+                    token = await auth(self.pool, self.user)
+                    self._headers = {"Authorization": f"Bearer {token}"}
+        return self._headers
+
+
+class AsyncUserAPI:
+
+    def __init__(self, pool: AsyncApiPool):
+        self.base_url = f"{Config.BASE_PET_STORE_URL}/user"
+        self.pool = pool
+
+
+class AsyncStoreAPI:
+
+    def __init__(self, pool: AsyncApiPool):
+        self.base_url = f"{Config.BASE_PET_STORE_URL}/store"
+        self.pool = pool
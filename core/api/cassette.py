@@ -0,0 +1,377 @@
+import atexit
+import glob
+import hashlib
+import json
+import logging
+import mmap
+import os
+import re
+import struct
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from requests import PreparedRequest, Response, Session
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.exceptions import ConnectionError
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from core.api.instrumentation import instrument
+from core.api.transport import resilient_session
+from core.config import Config
+from core.file_lock import write_atomic
+
+"""
+Record/replay of HTTP traffic for requests.Session based clients.
+
+CassetteAdapter is mounted on a session in front of the real adapter:
+  record  - requests go out, each (request, response) pair is appended to the cassette
+  replay  - responses come from the cassette, nothing goes out
+  drift   - requests go out and responses are compared with the recorded ones
+            (status + JSON shape), differences are collected in Cassette.drifts
+
+A cassette is two files: <name>.data (records back to back) and <name>.idx
+(fixed-size entries sorted by key, binary searched through mmap, so opening a big
+cassette costs nothing). The key is the normalized request - method, path (no
+host, so a cassette recorded against the live service replays against the
+stand-in), sorted query and, with match_body, the canonical JSON body - plus the
+occurrence number of that request in the run, so GET-after-DELETE replays the
+second answer. Past the recorded occurrences the last one is served.
+
+Under xdist every worker records its own shard, <name>.gwN.data/.idx, and replay
+(and drift) looks a request up in all shards of the name. A single-process
+recording removes the shards of the name; when re-recording with fewer workers,
+remove the cassette files first so no stale shard is left.
+
+Values a test generates (uuid names...) come back in the recorded responses, so
+they are kept with the cassette too: recorded_value(name, generate) generates and
+stores the value when recording (<shard>.values.json) and returns the recorded one
+on replay and drift, so assertions against the request data hold.
+"""
+
+logger = logging.getLogger(__name__)
+
+MODES = ("off", "record", "replay", "drift")
+
+# digest(16) occurrence(4) offset(8) length(4)
+_ENTRY = struct.Struct(">16sIQI")
+_META_LENGTH = struct.Struct(">I")
+
+
+class CassetteMiss(ConnectionError):
+    """Replay mode and the request is not in the cassette"""
+
+
+@dataclass
+class Drift:
+    request: str
+    recorded: str
+    live: str
+
+
+class Cassette:
+
+    def __init__(self, path: str, match_body: bool = False, worker: Optional[str] = None):
+        self.path = path
+        self.match_body = match_body
+        self.worker = worker if worker is not None else os.getenv("PYTEST_XDIST_WORKER", "")
+        self.drifts: List[Drift] = []
+        self._lock = threading.Lock()
+        self._occurrences: Dict[bytes, int] = {}
+        self._pending: List[Tuple[bytes, int, int, int]] = []
+        self._writer = None
+        self._shards: Optional[List[Tuple[mmap.mmap, mmap.mmap]]] = None
+        self._values: Dict[str, Any] = {}
+        self._recorded_values: Optional[List[Dict[str, Any]]] = None
+        self._records_values = False
+
+    @property
+    def shard(self) -> str:
+        """Path (without extension) this process records to"""
+        return f"{self.path}.{self.worker}" if self.worker else self.path
+
+    @property
+    def data_path(self) -> str:
+        return f"{self.shard}.data"
+
+    @property
+    def index_path(self) -> str:
+        return f"{self.shard}.idx"
+
+    @property
+    def values_path(self) -> str:
+        return f"{self.shard}.values.json"
+
+    def shards(self) -> List[str]:
+        """Every recorded shard of the name: the single-process one and one per xdist worker"""
+        workers = sorted(path[:-len(".idx")] for path in glob.glob(f"{glob.escape(self.path)}.gw*.idx"))
+        return [self.path] + workers
+
+    def key(self, request: PreparedRequest) -> Tuple[bytes, int, str]:
+        """(digest, occurrence, readable key); every call counts as one more occurrence"""
+        readable = normalize(request, self.match_body)
+        digest = hashlib.blake2b(readable.encode(), digest_size=16).digest()
+        with self._lock:
+            occurrence = self._occurrences.get(digest, 0)
+            self._occurrences[digest] = occurrence + 1
+        return digest, occurrence, readable
+
+    def value(self, name: str, generate: Callable[[], Any], mode: str) -> Any:
+        """
+        The value of `name` for this run, one per name: record (and off) generates it,
+        replay serves the recorded one and drift does when there is one
+        """
+        with self._lock:
+            if name in self._values:
+                return self._values[name]
+            if mode in ("replay", "drift"):
+                found = [values[name] for values in self._load_values() if name in values]
+                if found:
+                    self._values[name] = found[0]
+                    return found[0]
+                if mode == "replay":
+                    raise CassetteMiss(f"No value {name} in cassette {self.path}")
+            value = self._values[name] = generate()
+            self._records_values = self._records_values or mode == "record"
+            return value
+
+    def _load_values(self) -> List[Dict[str, Any]]:
+        # this process's shard first: under xdist a worker replays what it recorded
+        if self._recorded_values is None:
+            paths = [self.values_path] + [f"{shard}.values.json" for shard in self.shards() if shard != self.shard]
+            self._recorded_values = [_read_values(path) for path in paths]
+        return self._recorded_values
+
+    def record(self, digest: bytes, occurrence: int, readable: str, response: Response) -> None:
+        meta = json.dumps({"request": readable,
+                           "url": response.url,
+                           "status": response.status_code,
+                           "reason": response.reason,
+                           "headers": dict(response.headers)}, separators=(",", ":")).encode()
+        record = _META_LENGTH.pack(len(meta)) + meta + response.content
+        with self._lock:
+            if self._writer is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                if not self.worker:
+                    # the only writer: shards of an earlier xdist recording are stale
+                    for shard in self.shards()[1:]:
+                        for stale in (f"{shard}.idx", f"{shard}.data", f"{shard}.values.json"):
+                            if os.path.exists(stale):
+                                os.remove(stale)
+                # record mode rewrites this process's shard
+                self._writer = open(self.data_path, "wb")
+            offset = self._writer.tell()
+            self._writer.write(record)
+            self._pending.append((digest, occurrence, offset, len(record)))
+
+    def lookup(self, digest: bytes, occurrence: int) -> Optional[dict]:
+        """Recorded {status, reason, headers, url, body}, or None"""
+        with self._lock:
+            if self._shards is None:
+                mapped = ((_map(f"{shard}.idx"), _map(f"{shard}.data")) for shard in self.shards())
+                self._shards = [(index, data) for index, data in mapped if index is not None and data is not None]
+        # the exact occurrence, else the latest recorded one before it, whichever shard has it
+        found = [(entry, data) for entry, data in ((_search(index, digest, occurrence), data)
+                                                   for index, data in self._shards) if entry is not None]
+        if not found:
+            return None
+        (_, offset, length), data = max(found, key=lambda item: item[0][0])
+        record = data[offset:offset + length]
+        (meta_length,) = _META_LENGTH.unpack_from(record)
+        recorded = json.loads(record[_META_LENGTH.size:_META_LENGTH.size + meta_length])
+        recorded["body"] = record[_META_LENGTH.size + meta_length:]
+        return recorded
+
+    def flush(self) -> None:
+        """Write the index of everything recorded so far"""
+        with self._lock:
+            if self._writer is None and not self._records_values:
+                return
+            # a recording rewrites the values of its shard, even with none generated
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            write_atomic(self.values_path, json.dumps(self._values if self._records_values else {}))
+            if self._writer is None:
+                return
+            self._writer.flush()
+            entries = sorted(self._pending)
+            write_atomic(self.index_path, b"".join(_ENTRY.pack(*entry) for entry in entries))
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+            for index, data in self._shards or ():
+                index.close()
+                data.close()
+            self._shards = None
+        for drift in self.drifts:
+            logger.warning("Drift %s: recorded %s, live %s", drift.request, drift.recorded, drift.live)
+
+
+class CassetteAdapter(BaseAdapter):
+
+    def __init__(self, cassette: Cassette, mode: str, inner: Optional[BaseAdapter] = None):
+        super().__init__()
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode: {mode}, expected one of {MODES}")
+        self.cassette = cassette
+        self.mode = mode
+        self.inner = inner or HTTPAdapter()
+
+    def send(self, request: PreparedRequest, **kwargs) -> Response:
+        if self.mode == "off":
+            return self.inner.send(request, **kwargs)
+        digest, occurrence, readable = self.cassette.key(request)
+        if self.mode == "replay":
+            recorded = self.cassette.lookup(digest, occurrence)
+            if recorded is None:
+                raise CassetteMiss(f"Not in cassette {self.cassette.path}: {readable}", request=request)
+            return self._build_response(request, recorded)
+        response = self.inner.send(request, **kwargs)
+        if self.mode == "record":
+            self.cassette.record(digest, occurrence, readable, response)
+        else:
+            self._check_drift(digest, occurrence, readable, response)
+        return response
+
+    def close(self) -> None:
+        self.inner.close()
+
+    def _check_drift(self, digest: bytes, occurrence: int, readable: str, response: Response) -> None:
+        recorded = self.cassette.lookup(digest, occurrence)
+        if recorded is None:
+            self.cassette.drifts.append(Drift(readable, "<not recorded>", str(response.status_code)))
+            return
+        expected = f"{recorded['status']} {_shape(recorded['body'])}"
+        actual = f"{response.status_code} {_shape(response.content)}"
+        if expected != actual:
+            self.cassette.drifts.append(Drift(readable, expected, actual))
+
+    def _build_response(self, request: PreparedRequest, recorded: dict) -> Response:
+        response = Response()
+        response.status_code = recorded["status"]
+        response.reason = recorded["reason"]
+        response.headers = CaseInsensitiveDict(recorded["headers"])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        # body is already complete: iter_content / iter_lines read from it
+        response._content = recorded["body"]
+        response._content_consumed = True
+        return response
+
+
+def normalize(request: PreparedRequest, match_body: bool = False) -> str:
+    parts = urlsplit(request.url)
+    path = re.sub(r"/{2,}", "/", parts.path).rstrip("/") or "/"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    key = f"{request.method} {path}" + (f"?{query}" if query else "")
+    if match_body and request.body:
+        key += f" {_canonical(request.body)}"
+    return key
+
+
+def _canonical(body) -> str:
+    raw = body.encode() if isinstance(body, str) else body
+    try:
+        return json.dumps(json.loads(raw), sort_keys=True, separators=(",", ":"))
+    except (ValueError, TypeError):
+        return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+def _shape(body: bytes) -> str:
+    """Structure of a JSON body (keys and value types), values left out"""
+    def shape(value):
+        if isinstance(value, dict):
+            return {k: shape(v) for k, v in sorted(value.items())}
+        if isinstance(value, list):
+            return [shape(value[0])] if value else []
+        return type(value).__name__
+    try:
+        return json.dumps(shape(json.loads(body)), separators=(",", ":"))
+    except ValueError:
+        return f"<{len(body)} bytes>"
+
+
+def _map(path: str) -> Optional[mmap.mmap]:
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return None
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except FileNotFoundError:
+        return None
+
+
+def _read_values(path: str) -> Dict[str, Any]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _search(index: mmap.mmap, digest: bytes, occurrence: int) -> Optional[Tuple[int, int, int]]:
+    """(occurrence, offset, length) of (digest, occurrence), or of the last recorded occurrence before it"""
+    count = len(index) // _ENTRY.size
+    # first entry > (digest, occurrence)
+    lo, hi = 0, count
+    while lo < hi:
+        mid = (lo + hi) // 2
+        entry_digest, entry_occurrence, _, _ = _ENTRY.unpack_from(index, mid * _ENTRY.size)
+        if (entry_digest, entry_occurrence) <= (digest, occurrence):
+            lo = mid + 1
+        else:
+            hi = mid
+    if lo == 0:
+        return None
+    entry_digest, entry_occurrence, offset, length = _ENTRY.unpack_from(index, (lo - 1) * _ENTRY.size)
+    return (entry_occurrence, offset, length) if entry_digest == digest else None
+
+
+_CASSETTE: Optional[Cassette] = None
+_CASSETTE_LOCK = threading.Lock()
+
+
+def configured_cassette() -> Optional[Cassette]:
+    """Process-wide cassette from Config (HTTP_CASSETTE_*), None when the mode is off"""
+    global _CASSETTE
+    if Config.HTTP_CASSETTE_MODE == "off":
+        return None
+    with _CASSETTE_LOCK:
+        if _CASSETTE is None:
+            _CASSETTE = Cassette(os.path.join(Config.HTTP_CASSETTE_DIR, Config.HTTP_CASSETTE_NAME),
+                                 match_body=Config.HTTP_CASSETTE_MATCH_BODY)
+            atexit.register(_CASSETTE.close)
+        return _CASSETTE
+
+
+def recorded_value(name: str, generate: Callable[[], Any]) -> Any:
+    """Cassette.value of the configured cassette, a fresh value when there is none"""
+    cassette = configured_cassette()
+    if cassette is None:
+        return generate()
+    return cassette.value(name, generate, Config.HTTP_CASSETTE_MODE)
+
+
+def mount(session: Session, cassette: Optional[Cassette] = None, mode: Optional[str] = None) -> Session:
+    """Put the cassette in front of the session's adapters (no-op when the mode is off)"""
+    cassette = cassette or configured_cassette()
+    mode = mode or Config.HTTP_CASSETTE_MODE
+    if cassette is None or mode == "off":
+        return session
+    for prefix in ("https://", "http://"):
+        inner = session.get_adapter(prefix)
+        if not isinstance(inner, CassetteAdapter):
+            session.mount(prefix, CassetteAdapter(cassette, mode, inner=inner))
+    return session
+
+
+def cassette_session() -> Session:
+    """Instrumented session with the transport policy, behind the cassette when one is configured"""
+    return instrument(mount(resilient_session()))
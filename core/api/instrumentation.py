@@ -0,0 +1,162 @@
+"""
+Request instrumentation for the API clients, instead of an INFO line per call.
+
+A response hook on every client session records method, templated route
+(/pet/123 -> /pet/{id}), status, duration and request/response sizes: the
+record goes into a ring buffer (the last HTTP_TRACE_BUFFER requests) and the
+duration into a per-endpoint LatencyHistogram, so memory stays bounded however
+long the session runs. Nothing is formatted while tests run; the
+root conftest flushes once per session: a per-endpoint latency summary in the
+terminal summary and, with HTTP_TRACE_FILE, the buffer as JSONL.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from core.config import Config
+from core.latency import LatencyHistogram
+
+if TYPE_CHECKING:  # hooks only touch attributes, so the module imports without the HTTP stack
+    import httpx
+    import requests
+
+
+_ID_SEGMENT = re.compile(r"^(\d+|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+                         r"|[0-9a-fA-F]{24,})$")
+
+
+@dataclass(frozen=True)
+class RequestRecord:
+    started: float
+    method: str
+    host: str
+    route: str
+    status: int
+    duration: float
+    request_bytes: int
+    response_bytes: int
+
+
+@lru_cache(maxsize=4096)
+def route_template(path: str) -> str:
+    """Ids (numbers, uuids, long hex) in the path become {id}"""
+    return "/".join("{id}" if _ID_SEGMENT.match(segment) else segment for segment in path.split("/")) or "/"
+
+
+class RequestRecorder:
+
+    def __init__(self, capacity: int = Config.HTTP_TRACE_BUFFER):
+        self.records: Deque[RequestRecord] = deque(maxlen=capacity)
+        self._latencies: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self._errors: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, method: str, url: str, status: int, duration: float, request_bytes: int,
+               response_bytes: int) -> None:
+        parts = urlsplit(url)
+        route = route_template(parts.path)
+        self.records.append(RequestRecord(time.time() - duration, method, parts.netloc, route, status, duration,
+                                          request_bytes, response_bytes))
+        endpoint = (method, route)
+        with self._lock:
+            latency = self._latencies.get(endpoint)
+            if latency is None:
+                latency = self._latencies[endpoint] = LatencyHistogram()
+            latency.record(duration)
+            if status >= 400:
+                self._errors[endpoint] = self._errors.get(endpoint, 0) + 1
+
+    def summary(self) -> List[dict]:
+        """Per endpoint: count, errors, total / p50 / p95 / max seconds; slowest in total first"""
+        with self._lock:
+            rows = [{"method": method, "route": route, "count": latency.total,
+                     "errors": self._errors.get((method, route), 0), "total": latency.sum_us / 1_000_000,
+                     "p50": latency.percentile(50) / 1000, "p95": latency.percentile(95) / 1000,
+                     "max": latency.max_us / 1_000_000}
+                    for (method, route), latency in self._latencies.items()]
+        return sorted(rows, key=lambda row: row["total"], reverse=True)
+
+    def write_trace(self, path: str) -> None:
+        with open(path, "w") as f:
+            for record in list(self.records):
+                f.write(json.dumps(asdict(record), separators=(",", ":")) + "\n")
+
+    def summary_table(self) -> List[str]:
+        """summary() as fixed-width lines for the terminal, empty when nothing was recorded"""
+        rows = self.summary()
+        if not rows:
+            return []
+        lines = [f"{'endpoint':<48}{'count':>8}{'errors':>8}{'total, s':>10}{'p50, ms':>10}{'p95, ms':>10}"
+                 f"{'max, ms':>10}"]
+        lines += [f"{row['method'] + ' ' + row['route']:<48}{row['count']:>8}{row['errors']:>8}"
+                  f"{row['total']:>10.2f}{row['p50'] * 1000:>10.1f}{row['p95'] * 1000:>10.1f}"
+                  f"{row['max'] * 1000:>10.1f}" for row in rows]
+        return lines
+
+    def clear(self) -> None:
+        with self._lock:
+            self.records.clear()
+            self._latencies.clear()
+            self._errors.clear()
+
+
+RECORDER = RequestRecorder()
+
+
+def _content_length(headers) -> int:
+    try:
+        return int(headers.get("Content-Length", 0))
+    except ValueError:
+        return 0
+
+
+def _body_length(body) -> int:
+    return len(body) if isinstance(body, (bytes, str)) else 0
+
+
+def record_response(response: "requests.Response", *args, **kwargs) -> None:
+    """requests response hook; streamed bodies are counted by Content-Length, never read here"""
+    request = response.request
+    response_bytes = len(response._content) if response._content else _content_length(response.headers)
+    RECORDER.record(request.method, request.url, response.status_code, response.elapsed.total_seconds(),
+                    _body_length(request.body), response_bytes)
+
+
+def instrument(session: "requests.Session") -> "requests.Session":
+    if record_response not in session.hooks["response"]:
+        session.hooks["response"].append(record_response)
+    return session
+
+
+async def _mark_start(request: "httpx.Request") -> None:
+    request.extensions["instrumentation_started"] = time.perf_counter()
+
+
+async def _record_httpx(response: "httpx.Response") -> None:
+    request = response.request
+    started = request.extensions.get("instrumentation_started", time.perf_counter())
+    RECORDER.record(request.method, str(request.url), response.status_code, time.perf_counter() - started,
+                    _content_length(request.headers), _content_length(response.headers))
+
+
+def httpx_event_hooks() -> dict:
+    """event_hooks for httpx.AsyncClient: duration is time to response headers"""
+    return {"request": [_mark_start], "response": [_record_httpx]}
+
+
+def trace_path(worker: Optional[str] = None) -> Optional[str]:
+    """HTTP_TRACE_FILE, one file per xdist worker"""
+    path = Config.HTTP_TRACE_FILE
+    worker = worker or os.getenv("PYTEST_XDIST_WORKER")
+    if not path or not worker:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}.{worker}{ext}"
@@ -1,11 +1,12 @@
 import logging
-import requests
 
 from core.config import Config
-from requests import Session, Response
+from requests import Response
 
 
+from core.api.cassette import cassette_session
 from core.api.data_models import Pet, User
+from core.api.session_cache import SESSIONS
 
 """
 Every client should have base_url and api attributes.
@@ -14,22 +15,24 @@ Base url should be the base url of the api and api should be a requests session.
 
 logger = logging.getLogger(__name__)
 
+# login calls go through the cassette too (HTTP_CASSETTE_MODE), replay runs never touch the network
+_LOGIN = cassette_session()
+
 
 def auth(user: User):
     # data = {"username": user.username, "password": user.password}
     if user is None:
         return None
-    request = requests.post(f"{Config.BASE_PET_STORE_URL}/user/login", user.model_dump_json())
+    request = _LOGIN.post(f"{Config.BASE_PET_STORE_URL}/user/login", user.model_dump_json())
     return request.headers.get("JWT-TOKEN")
 
 class PetAPI:
 
     def __init__(self, user: User = None):
         self.base_url = f"{Config.BASE_PET_STORE_URL}/pet"
-        self.api = Session()
-        token = auth(user)
-        self.api.headers.update({"Content-Type": "application/json", "Authorization": f"Bearer {token}"})
-        logger.info(f"{self.base_url}")
+        # shared per user: one login and one connection pool for all PetAPI instances
+        self.api = SESSIONS.session(f"{Config.BASE_PET_STORE_URL}/user/login", user, auth)
+        logger.debug("%s", self.base_url)
 
     def add_new_pet(self, new_pet: Pet):
         response = self.api.post(url=self.base_url, data=new_pet.model_dump_json())
@@ -61,7 +64,7 @@ class UserAPI:
 
     def __init__(self):
         self.base_url = f"{Config.BASE_PET_STORE_URL}/user"
-        self.api = Session()
+        self.api = cassette_session()
         self.api.headers.update({"Content-Type": "application/json"})
 
 
@@ -70,9 +73,10 @@ class StoreAPI:
 
     def __init__(self):
         self.base_url = f"{Config.BASE_PET_STORE_URL}/store"
-        self.api = Session()
+        self.api = cassette_session()
         self.api.headers.update({"Content-Type": "application/json"})
 
 
 def log_request(response: Response):
-    logger.info(f"{response.request.method} {response.request.url} - {response.status_code}")
\ No newline at end of file
+    # timings and sizes are recorded by core.api.instrumentation, this is only a debug trail
+    logger.debug("%s %s - %s", response.request.method, response.request.url, response.status_code)
\ No newline at end of file
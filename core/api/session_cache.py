@@ -0,0 +1,122 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+from requests import Response, Session
+
+from core.api.cassette import cassette_session
+from core.api.data_models import User
+from core.config import Config
+from core.file_lock import file_lock, write_atomic
+
+"""
+Process-wide cache of authenticated sessions, keyed by (login url, User).
+
+Clients built for the same user reuse the token and the warm connection pool of
+one requests.Session instead of logging in again. A 401 response re-logins once
+and replays the request. With AUTH_TOKEN_CACHE_FILE set, tokens are also shared
+between xdist workers through a file guarded by a file lock.
+"""
+
+logger = logging.getLogger(__name__)
+
+_AUTH_RETRIED = "auth_retried"
+
+Login = Callable[[User], Optional[str]]
+
+
+@dataclass
+class CachedSession:
+    session: Session
+    token: Optional[str]
+    expires_at: float
+
+
+class SessionCache:
+
+    def __init__(self, ttl: float = Config.AUTH_TOKEN_TTL, token_file: Optional[str] = Config.AUTH_TOKEN_CACHE_FILE):
+        self.ttl = ttl
+        self.token_file = token_file
+        self._entries: Dict[str, CachedSession] = {}
+        self._lock = threading.RLock()
+
+    def session(self, login_url: str, user: Optional[User], login: Login) -> Session:
+        key = cache_key(login_url, user)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                session = cassette_session()
+                session.hooks["response"].append(self._refresh_on_401(key, user, login))
+                entry = CachedSession(session=session, token=None, expires_at=0)
+                self._entries[key] = entry
+            if entry.expires_at <= time.time():
+                self._authorize(key, entry, user, login)
+            return entry.session
+
+    def clear(self) -> None:
+        with self._lock:
+            for entry in self._entries.values():
+                entry.session.close()
+            self._entries.clear()
+
+    def _authorize(self, key: str, entry: CachedSession, user: Optional[User], login: Login,
+                   force: bool = False) -> None:
+        with self._shared_tokens() as tokens:
+            shared = tokens.get(key)
+            if not force and shared and shared["expires_at"] > time.time():
+                entry.token, entry.expires_at = shared["token"], shared["expires_at"]
+            else:
+                logger.debug("Login for %s", key)
+                entry.token, entry.expires_at = login(user), time.time() + self.ttl
+                tokens[key] = {"token": entry.token, "expires_at": entry.expires_at}
+        entry.session.headers.update({"Content-Type": "application/json", "Authorization": f"Bearer {entry.token}"})
+
+    def _refresh_on_401(self, key: str, user: Optional[User], login: Login):
+        def hook(response: Response, *args, **kwargs) -> Optional[Response]:
+            if response.status_code != 401 or user is None or getattr(response.request, _AUTH_RETRIED, False):
+                return None
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is None:
+                    return None
+                self._authorize(key, entry, user, login, force=True)
+            request = response.request.copy()
+            request.headers["Authorization"] = entry.session.headers["Authorization"]
+            # marks the replay on the request object only, nothing extra goes on the wire
+            setattr(request, _AUTH_RETRIED, True)
+            response.content  # release the connection before resending
+            return entry.session.send(request, **kwargs)
+        return hook
+
+    @contextmanager
+    def _shared_tokens(self):
+        """Tokens shared between processes; a plain dict when no token file is configured"""
+        if not self.token_file:
+            yield {}
+            return
+        with file_lock(f"{self.token_file}.lock"):
+            tokens = {}
+            if os.path.exists(self.token_file):
+                with open(self.token_file) as f:
+                    tokens = json.load(f)
+            before = dict(tokens)
+            yield tokens
+            if tokens != before:
+                write_atomic(self.token_file, json.dumps(tokens))
+
+
+def cache_key(login_url: str, user: Optional[User]) -> str:
+    """Key of a user's cached session, the password only as a short hash"""
+    if user is None:
+        return f"{login_url}|anonymous"
+    secret = hashlib.sha256(user.password.encode()).hexdigest()[:16]
+    return f"{login_url}|{user.username}|{secret}"
+
+
+SESSIONS = SessionCache()
@@ -0,0 +1,360 @@
+import asyncio
+import email.utils
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Mapping, Optional
+from urllib.parse import urlsplit
+
+import httpx
+from requests import PreparedRequest, Response, Session
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError, ConnectTimeout, Timeout
+from urllib3.exceptions import NewConnectionError
+
+from core.config import Config
+
+"""
+Shared transport policy for the API clients (requests and httpx).
+
+Every request gets connect/read timeouts unless the caller passes its own. Failed
+attempts are retried with exponential backoff + full jitter, honouring
+Retry-After (429/503), as long as the retry budget allows it: each request
+deposits `budget_ratio` of a retry, so retries stay a fraction of the traffic
+when a service is down instead of multiplying it. Non-idempotent requests (POST
+without an Idempotency-Key) are retried only when they never reached the server.
+
+A circuit breaker per host opens after `breaker_threshold` consecutive failures
+(retry statuses, timeouts, connection errors - other 5xx are answers the tests may
+expect) and fails fast for `breaker_reset` seconds, then lets one trial request
+through.
+
+METRICS counts attempts, retries, breaker rejections, latency and the time
+spent on failed attempts and backoff ("wasted") per host.
+"""
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+class CircuitOpenError(ConnectionError):
+    """The host's circuit breaker is open, the request was not sent"""
+
+
+@dataclass(frozen=True)
+class TransportPolicy:
+    connect_timeout: float = Config.HTTP_CONNECT_TIMEOUT
+    read_timeout: float = Config.HTTP_TIMEOUT
+    retries: int = Config.HTTP_RETRIES
+    backoff_base: float = Config.HTTP_BACKOFF_BASE
+    backoff_max: float = Config.HTTP_BACKOFF_MAX
+    max_retry_after: float = 30.0
+    retry_statuses: FrozenSet[int] = frozenset({429, 502, 503, 504})
+    budget_ratio: float = Config.HTTP_RETRY_BUDGET
+    budget_min: float = 10.0
+    breaker_threshold: int = Config.HTTP_BREAKER_THRESHOLD
+    breaker_reset: float = Config.HTTP_BREAKER_RESET
+
+    def may_retry(self, method: str, headers: Mapping[str, str], sent: bool) -> bool:
+        """sent=False: the attempt failed before the request reached the server"""
+        return not sent or method.upper() in IDEMPOTENT_METHODS or "Idempotency-Key" in headers
+
+    def delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        parsed = _parse_retry_after(retry_after)
+        if parsed is not None:
+            return min(parsed, self.max_retry_after)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+
+class RetryBudget:
+    """Token bucket: requests deposit budget_ratio, retries withdraw 1"""
+
+    def __init__(self, ratio: float, minimum: float):
+        self.ratio = ratio
+        self.cap = max(minimum, 1.0)
+        self._tokens = self.cap
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._tokens = min(self.cap, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class CircuitBreaker:
+
+    def __init__(self, threshold: int, reset_timeout: float, clock=time.monotonic):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "half_open" if self.clock() - self._opened_at >= self.reset_timeout else "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self.clock() - self._opened_at < self.reset_timeout or self._trial:
+                return False
+            # half open: one trial request decides
+            self._trial = True
+            return True
+
+    def record(self, success: bool) -> None:
+        with self._lock:
+            self._trial = False
+            if success:
+                self._failures = 0
+                self._opened_at = None
+                return
+            self._failures += 1
+            if self._failures >= self.threshold or self._opened_at is not None:
+                if self._opened_at is None:
+                    logger.warning("Circuit opened after %d failures", self._failures)
+                self._opened_at = self.clock()
+
+    def release(self) -> None:
+        """The attempt ended without saying anything about the host (bad URL, interrupt...)"""
+        with self._lock:
+            self._trial = False
+
+
+@dataclass
+class HostStats:
+    requests: int = 0
+    attempts: int = 0
+    retries: int = 0
+    failures: int = 0
+    rejected: int = 0
+    budget_exhausted: int = 0
+    latency_total: float = 0.0
+    latency_max: float = 0.0
+    wasted: float = 0.0
+
+    def as_dict(self) -> dict:
+        return {"requests": self.requests, "attempts": self.attempts, "retries": self.retries,
+                "failures": self.failures, "rejected": self.rejected, "budget_exhausted": self.budget_exhausted,
+                "avg_latency": round(self.latency_total / self.attempts, 4) if self.attempts else 0.0,
+                "max_latency": round(self.latency_max, 4), "wasted_seconds": round(self.wasted, 4)}
+
+
+@dataclass
+class TransportMetrics:
+    hosts: Dict[str, HostStats] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def update(self, host: str, **deltas: float) -> None:
+        with self._lock:
+            stats = self.hosts.setdefault(host, HostStats())
+            for name, value in deltas.items():
+                setattr(stats, name, getattr(stats, name) + value)
+
+    def attempt(self, host: str, seconds: float, failed: bool) -> None:
+        with self._lock:
+            stats = self.hosts.setdefault(host, HostStats())
+            stats.attempts += 1
+            stats.latency_total += seconds
+            stats.latency_max = max(stats.latency_max, seconds)
+            if failed:
+                stats.failures += 1
+                stats.wasted += seconds
+
+    def as_dict(self) -> Dict[str, dict]:
+        with self._lock:
+            return {host: stats.as_dict() for host, stats in sorted(self.hosts.items())}
+
+    def reset(self) -> None:
+        with self._lock:
+            self.hosts.clear()
+
+
+METRICS = TransportMetrics()
+
+
+class _Resilience:
+    """Policy + shared per-host breakers and budgets, used by both transports"""
+
+    def __init__(self, policy: TransportPolicy, metrics: TransportMetrics):
+        self.policy = policy
+        self.metrics = metrics
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._budgets: Dict[str, RetryBudget] = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        with self._lock:
+            if host not in self._breakers:
+                self._breakers[host] = CircuitBreaker(self.policy.breaker_threshold, self.policy.breaker_reset)
+            return self._breakers[host]
+
+    def budget(self, host: str) -> RetryBudget:
+        with self._lock:
+            if host not in self._budgets:
+                self._budgets[host] = RetryBudget(self.policy.budget_ratio, self.policy.budget_min)
+            return self._budgets[host]
+
+    def admit(self, host: str) -> None:
+        if not self.breaker(host).allow():
+            self.metrics.update(host, rejected=1)
+            raise CircuitOpenError(f"Circuit open for {host}")
+
+    def next_delay(self, host: str, attempt: int, retryable: bool, retry_after: Optional[str]) -> Optional[float]:
+        """Seconds to wait before the next attempt, None when the failure is final"""
+        if not retryable or attempt >= self.policy.retries:
+            return None
+        if not self.budget(host).withdraw():
+            self.metrics.update(host, budget_exhausted=1)
+            return None
+        delay = self.policy.delay(attempt, retry_after)
+        self.metrics.update(host, retries=1, wasted=delay)
+        return delay
+
+
+_SHARED = _Resilience(TransportPolicy(), METRICS)
+
+
+class ResilientAdapter(HTTPAdapter):
+    """requests adapter applying the transport policy"""
+
+    def __init__(self, policy: Optional[TransportPolicy] = None, metrics: TransportMetrics = METRICS, **kwargs):
+        # the default policy shares breakers and budgets with every other client of the process
+        self.resilience = _SHARED if policy is None else _Resilience(policy, metrics)
+        super().__init__(**kwargs)
+
+    def send(self, request: PreparedRequest, timeout=None, **kwargs) -> Response:
+        policy = self.resilience.policy
+        host = urlsplit(request.url).netloc
+        timeout = timeout if timeout is not None else (policy.connect_timeout, policy.read_timeout)
+        self.resilience.budget(host).deposit()
+        self.resilience.metrics.update(host, requests=1)
+        attempt = 0
+        while True:
+            self.resilience.admit(host)
+            started = time.perf_counter()
+            try:
+                response = super().send(request, timeout=timeout, **kwargs)
+            except (ConnectionError, Timeout) as error:
+                self._finish(host, started, failed=True)
+                sent = not _never_sent(error)
+                delay = self.resilience.next_delay(host, attempt,
+                                                   policy.may_retry(request.method, request.headers, sent), None)
+                if delay is None:
+                    raise
+            except BaseException:
+                self.resilience.breaker(host).release()
+                raise
+            else:
+                failed = response.status_code in policy.retry_statuses
+                self._finish(host, started, failed)
+                retryable = response.status_code in policy.retry_statuses and \
+                    policy.may_retry(request.method, request.headers, sent=True)
+                delay = self.resilience.next_delay(host, attempt, retryable, response.headers.get("Retry-After"))
+                if delay is None:
+                    return response
+                response.close()
+            logger.debug("Retry %d for %s %s in %.2fs", attempt + 1, request.method, request.url, delay)
+            time.sleep(delay)
+            attempt += 1
+
+    def _finish(self, host: str, started: float, failed: bool) -> None:
+        self.resilience.metrics.attempt(host, time.perf_counter() - started, failed)
+        self.resilience.breaker(host).record(success=not failed)
+
+
+class ResilientAsyncTransport(httpx.AsyncHTTPTransport):
+    """httpx transport applying the same policy (breakers and budgets shared with the sync adapter)"""
+
+    def __init__(self, policy: Optional[TransportPolicy] = None, metrics: TransportMetrics = METRICS, **kwargs):
+        # the default policy shares breakers and budgets with every other client of the process
+        self.resilience = _SHARED if policy is None else _Resilience(policy, metrics)
+        super().__init__(**kwargs)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        policy = self.resilience.policy
+        host = request.url.netloc.decode()
+        self.resilience.budget(host).deposit()
+        self.resilience.metrics.update(host, requests=1)
+        attempt = 0
+        while True:
+            self.resilience.admit(host)
+            started = time.perf_counter()
+            try:
+                response = await super().handle_async_request(request)
+            except httpx.TransportError as error:
+                self._finish(host, started, failed=True)
+                sent = not isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout))
+                delay = self.resilience.next_delay(host, attempt,
+                                                   policy.may_retry(request.method, request.headers, sent), None)
+                if delay is None:
+                    raise
+            except BaseException:
+                self.resilience.breaker(host).release()
+                raise
+            else:
+                failed = response.status_code in policy.retry_statuses
+                self._finish(host, started, failed)
+                retryable = response.status_code in policy.retry_statuses and \
+                    policy.may_retry(request.method, request.headers, sent=True)
+                delay = self.resilience.next_delay(host, attempt, retryable, response.headers.get("Retry-After"))
+                if delay is None:
+                    return response
+                await response.aclose()
+            logger.debug("Retry %d for %s %s in %.2fs", attempt + 1, request.method, request.url, delay)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _finish(self, host: str, started: float, failed: bool) -> None:
+        self.resilience.metrics.attempt(host, time.perf_counter() - started, failed)
+        self.resilience.breaker(host).record(success=not failed)
+
+
+def _never_sent(error: Exception) -> bool:
+    if isinstance(error, ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+def resilient_session() -> Session:
+    session = Session()
+    adapter = ResilientAdapter(pool_maxsize=Config.HTTP_POOL_SIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def async_timeout(policy: Optional[TransportPolicy] = None) -> httpx.Timeout:
+    policy = policy or _SHARED.policy
+    return httpx.Timeout(policy.read_timeout, connect=policy.connect_timeout)
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        moment = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, moment.timestamp() - time.time())
@@ -0,0 +1,13 @@
+"""
+Accounts of the services under test, for clients, tools and tests alike.
+"""
+
+import os
+
+from core.api.data_models import User
+
+
+class Users:
+    BASIC_USER = User(username=os.getenv("BASIC_USER_NAME"), password=os.getenv("BASIC_USER_PASSWORD"))
+
+    FASTAPI_USER = User(username="test", password="test")
@@ -0,0 +1,102 @@
+import json
+from functools import lru_cache
+from typing import Annotated, Any, Dict, Generic, Iterable, Iterator, List, Type, TypeVar, Union
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from requests import Response
+
+"""
+Fast contract validation for core.api.data_models.
+
+Pet(**response.json()) parses the body into dicts and then validates them in
+Python, item by item for lists. Here the raw bytes go straight to pydantic-core
+(model_validate_json / TypeAdapter.validate_json), so a page of thousands of pets
+is one call: validate(response, list[Pet]). TypeAdapters are built once per type.
+
+lazy() parses the JSON only and validates a field the first time a test reads it:
+the cheap option when a test checks a couple of fields of a big page.
+"""
+
+T = TypeVar("T")
+M = TypeVar("M", bound=BaseModel)
+
+Body = Union[Response, bytes, str]
+
+
+@lru_cache(maxsize=None)
+def adapter(tp: Any) -> TypeAdapter:
+    """One TypeAdapter per type (list[Pet], dict[str, int], ...): building it is the expensive part"""
+    return TypeAdapter(tp)
+
+
+def validate(body: Body, tp: Type[T]) -> T:
+    """Validate raw JSON into tp: a model, list[Model] or any type a TypeAdapter accepts"""
+    raw = _raw(body)
+    if isinstance(tp, type) and issubclass(tp, BaseModel):
+        return tp.model_validate_json(raw)
+    return adapter(tp).validate_json(raw)
+
+
+def validate_many(bodies: Iterable[Body], tp: Type[T]) -> Iterator[T]:
+    """Validate pages one by one (e.g. a paginated crawl), the adapter is shared"""
+    for body in bodies:
+        yield validate(body, tp)
+
+
+@lru_cache(maxsize=None)
+def _field_adapter(model: Type[BaseModel], name: str) -> TypeAdapter:
+    # keep the field constraints (ge=0, min_length...) along with the type
+    field = model.model_fields[name]
+    return TypeAdapter(Annotated[field.annotation, field])
+
+
+class LazyModel(Generic[M]):
+    """Parsed JSON object that validates each field of `model` on first access"""
+
+    def __init__(self, model: Type[M], data: Dict[str, Any]):
+        if not isinstance(data, dict):
+            raise _error(model, [{"type": "model_type", "loc": (), "input": data,
+                                  "ctx": {"class_name": model.__name__}}])
+        self._model = model
+        self._data = data
+        self._values: Dict[str, Any] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        fields = self._model.model_fields
+        if name not in fields:
+            raise AttributeError(f"{self._model.__name__} has no field {name}")
+        if name not in self._values:
+            field = fields[name]
+            key = field.alias or name
+            if key in self._data:
+                self._values[name] = _field_adapter(self._model, name).validate_python(self._data[key])
+            elif field.is_required():
+                raise _error(self._model, [{"type": "missing", "loc": (key,), "input": self._data}])
+            else:
+                self._values[name] = field.get_default(call_default_factory=True)
+        return self._values[name]
+
+    def full(self) -> M:
+        """Validate everything (e.g. when the test ends up reading most fields)"""
+        return self._model.model_validate(self._data)
+
+    def __repr__(self) -> str:
+        return f"Lazy{self._model.__name__}({self._data!r})"
+
+
+def lazy(body: Body, model: Type[M]) -> Union[LazyModel[M], List[LazyModel[M]]]:
+    """JSON object -> LazyModel, JSON array -> list of LazyModel"""
+    data = json.loads(_raw(body))
+    if isinstance(data, list):
+        return [LazyModel(model, item) for item in data]
+    return LazyModel(model, data)
+
+
+def _raw(body: Body) -> Union[bytes, str]:
+    return body.content if isinstance(body, Response) else body
+
+
+def _error(model: Type[BaseModel], errors: List[dict]) -> ValidationError:
+    return ValidationError.from_exception_data(model.__name__, errors)
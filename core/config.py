@@ -6,4 +6,57 @@ class Config:
 
     BASE_DEMO_URL = os.getenv("BASE_DEMO_URL")
     BASE_QA_DEMO_URL = os.getenv("BASE_QA_DEMO_URL")
-    BASE_PET_STORE_URL = os.getenv("BASE_PET_STORE_URL")
\ No newline at end of file
+    BASE_PET_STORE_URL = os.getenv("BASE_PET_STORE_URL")
+
+    # async API clients: shared connection pool size, max in-flight requests, timeout in seconds
+    HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "100"))
+    HTTP_CONCURRENCY = int(os.getenv("HTTP_CONCURRENCY", "50"))
+    HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "30"))
+    # transport policy of every API client (core/api/transport.py): connect timeout, retries with backoff,
+    # retry budget (retries per request), circuit breaker per host (failures in a row, seconds open)
+    HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+    HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "3"))
+    HTTP_BACKOFF_BASE = float(os.getenv("HTTP_BACKOFF_BASE", "0.1"))
+    HTTP_BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", "5"))
+    HTTP_RETRY_BUDGET = float(os.getenv("HTTP_RETRY_BUDGET", "0.2"))
+    HTTP_BREAKER_THRESHOLD = int(os.getenv("HTTP_BREAKER_THRESHOLD", "5"))
+    HTTP_BREAKER_RESET = float(os.getenv("HTTP_BREAKER_RESET", "30"))
+
+    # request instrumentation (core/api/instrumentation.py): last N requests kept for the JSONL trace,
+    # written at the end of the test session when HTTP_TRACE_FILE is set
+    HTTP_TRACE_BUFFER = int(os.getenv("HTTP_TRACE_BUFFER", "100000"))
+    HTTP_TRACE_FILE = os.getenv("HTTP_TRACE_FILE", "")
+
+    # record/replay of requests.Session traffic: off, record, replay or drift (see core/api/cassette.py)
+    HTTP_CASSETTE_MODE = os.getenv("HTTP_CASSETTE_MODE", "off")
+    HTTP_CASSETTE_DIR = os.getenv("HTTP_CASSETTE_DIR", "cassettes")
+    HTTP_CASSETTE_NAME = os.getenv("HTTP_CASSETTE_NAME", "default")
+    HTTP_CASSETTE_MATCH_BODY = os.getenv("HTTP_CASSETTE_MATCH_BODY", "false").lower() == "true"
+
+    # login tokens are reused for AUTH_TOKEN_TTL seconds; set the file to share them between xdist workers
+    AUTH_TOKEN_TTL = float(os.getenv("AUTH_TOKEN_TTL", "900"))
+    AUTH_TOKEN_CACHE_FILE = os.getenv("AUTH_TOKEN_CACHE_FILE")
+
+    # offline runs: tests start stand_in.server and point the BASE_* urls at it (port 0 = any free port)
+    STAND_IN = os.getenv("STAND_IN", "false").lower() == "true"
+    STAND_IN_PORT = int(os.getenv("STAND_IN_PORT", "0"))
+
+    # api_pet_service: "memory" or "sqlite" (persistent, PET_STORE_PATH)
+    PET_STORE_BACKEND = os.getenv("PET_STORE_BACKEND", "memory")
+    PET_STORE_PATH = os.getenv("PET_STORE_PATH", "pets.sqlite3")
+    IDEMPOTENCY_MAX_SIZE = int(os.getenv("IDEMPOTENCY_MAX_SIZE", "10000"))
+    IDEMPOTENCY_TTL = float(os.getenv("IDEMPOTENCY_TTL", "3600"))
+
+    # UI: browsers kept warm per pytest worker, recycled after UI_DRIVER_MAX_USES tests
+    UI_POOL_SIZE = int(os.getenv("UI_POOL_SIZE", "2"))
+    UI_DRIVER_MAX_USES = int(os.getenv("UI_DRIVER_MAX_USES", "50"))
+    UI_HEADLESS = os.getenv("UI_HEADLESS", "true").lower() == "true"
+    UI_DRIVER_CACHE_DIR = os.getenv("UI_DRIVER_CACHE_DIR", "~/.cache/python_automation_examples/drivers")
+    # UI: third-party resources blocked over CDP (categories: ads, analytics, fonts, images, media)
+    UI_BLOCK_CATEGORIES = os.getenv("UI_BLOCK_CATEGORIES", "ads,analytics,fonts")
+    UI_BLOCK_URLS = os.getenv("UI_BLOCK_URLS", "")
+    UI_BROWSER_CACHE = os.getenv("UI_BROWSER_CACHE", "true").lower() == "true"
+    # one extra unblocked load per page to report bytes / time saved
+    UI_MEASURE_SAVINGS = os.getenv("UI_MEASURE_SAVINGS", "false").lower() == "true"
+    # page metrics + Chrome performance log are collected only with a report file or UI_MEASURE_SAVINGS
+    UI_RESOURCE_REPORT = os.getenv("UI_RESOURCE_REPORT", "")
@@ -0,0 +1,35 @@
+import os
+from contextlib import contextmanager
+from typing import Union
+
+try:
+    import fcntl
+except ImportError:  # not POSIX: callers still work, just without cross-process exclusion
+    fcntl = None
+
+"""
+Cross-process lock (flock on a lock file) for caches shared between xdist workers.
+"""
+
+
+@contextmanager
+def file_lock(path: str):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def write_atomic(path: str, data: Union[str, bytes]) -> None:
+    """Readers never see a half-written file"""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb" if isinstance(data, bytes) else "w") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
@@ -0,0 +1,53 @@
+"""
+Fixed-size latency histogram, shared by the load runner and the request instrumentation.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+
+
+class LatencyHistogram:
+    """
+    HDR-style histogram: log-linear buckets over microseconds.
+    Every power of two is split into 2**sub_bucket_bits buckets, so the relative
+    error of a reported value stays below 2**-(sub_bucket_bits - 1) (~1.6% for 7 bits)
+    and memory doesn't depend on the number of samples.
+    """
+
+    def __init__(self, sub_bucket_bits: int = 7):
+        self.sub_bucket_bits = sub_bucket_bits
+        self.counts: Counter[int] = Counter()
+        self.total = 0
+        self.max_us = 0
+        self.sum_us = 0
+
+    def record(self, seconds: float) -> None:
+        us = max(1, int(seconds * 1_000_000))
+        shift = max(0, us.bit_length() - self.sub_bucket_bits)
+        self.counts[(shift << self.sub_bucket_bits) + (us >> shift)] += 1
+        self.total += 1
+        self.sum_us += us
+        self.max_us = max(self.max_us, us)
+
+    def percentile(self, p: float) -> float:
+        """Value at percentile p (0..100) in milliseconds, upper bound of its bucket"""
+        if not self.total:
+            return 0.0
+        rank = max(1, round(self.total * p / 100))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self._upper_bound(index), self.max_us) / 1000
+        return self.max_us / 1000
+
+    def merge(self, other: LatencyHistogram) -> None:
+        self.counts.update(other.counts)
+        self.total += other.total
+        self.sum_us += other.sum_us
+        self.max_us = max(self.max_us, other.max_us)
+
+    def _upper_bound(self, index: int) -> int:
+        shift, top = index >> self.sub_bucket_bits, index & ((1 << self.sub_bucket_bits) - 1)
+        return ((top + 1) << shift) - 1
@@ -0,0 +1,297 @@
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from array import array
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # the array backend covers everything, numpy only speeds up the reduce
+    np = None
+
+"""
+D) Дедуп событий по ключу и времени - потоковая версия examples.dedup
+
+dedup() keeps every winning event dict in a dict keyed by a 1-tuple and needs the
+whole list in memory. Here:
+  dedup_stream(events)    - one pass over any iterable, state is columnar:
+                            key -> slot dict + array('d') of ts + the winning events
+  dedup_file(path)        - two passes over NDJSON/CSV, no event objects kept at all:
+                            pass 1 keeps key -> slot, ts and row number columns
+                            (array or numpy), pass 2 re-reads the file and yields
+                            the winning rows in file order
+  dedup_windowed(events)  - latest event per key per tumbling time window, windows
+                            are emitted as soon as the stream moves past them
+
+Same semantics as dedup(): the latest ts wins, on equal ts the first event wins.
+
+Benchmark against examples.dedup:
+python -m examples.dedup_engine --rows 1000000 --keys 100000
+"""
+
+Event = Dict[str, Any]
+
+
+# -----------------------
+# Readers
+# -----------------------
+def read_ndjson(source) -> Iterator[Event]:
+    with _open(source) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_csv(source, ts_type: Callable[[str], Any] = float, ts: str = "ts") -> Iterator[Event]:
+    with _open(source) as f:
+        for row in csv.DictReader(f):
+            row[ts] = ts_type(row[ts])
+            yield row
+
+
+def read_events(path: str, fmt: Optional[str] = None, ts: str = "ts") -> Iterator[Event]:
+    fmt = fmt or ("csv" if path.endswith(".csv") else "ndjson")
+    if fmt == "csv":
+        return read_csv(path, ts=ts)
+    if fmt == "ndjson":
+        return read_ndjson(path)
+    raise ValueError(f"Unknown format: {fmt}")
+
+
+def _open(source):
+    return open(source, newline="") if isinstance(source, (str, os.PathLike)) else _borrowed(source)
+
+
+class _borrowed:
+    """File object owned by the caller: not closed on exit"""
+
+    def __init__(self, f):
+        self.f = f
+
+    def __enter__(self):
+        return self.f
+
+    def __exit__(self, *exc):
+        return False
+
+
+# -----------------------
+# Columnar state
+# -----------------------
+class LatestTs:
+    """Latest ts (and the row it came from) per key, kept in columns"""
+
+    def __init__(self):
+        self.slots: Dict[Hashable, int] = {}
+        self.ts = array("d")
+        self.rows = array("q")
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def add(self, key: Hashable, ts: float, row: int) -> bool:
+        """True when (ts, row) is the new latest for the key"""
+        slot = self.slots.get(key)
+        if slot is None:
+            self.slots[key] = len(self.ts)
+            self.ts.append(ts)
+            self.rows.append(row)
+            return True
+        if ts > self.ts[slot]:
+            self.ts[slot] = ts
+            self.rows[slot] = row
+            return True
+        return False
+
+    def winning_rows(self) -> Sequence[int]:
+        return array("q", sorted(self.rows))
+
+
+class NumpyLatestTs:
+    """Same columns as numpy arrays, updated a chunk of rows at a time (vectorized reduce)"""
+
+    def __init__(self, chunk_size: int = 65536):
+        if np is None:
+            raise RuntimeError("numpy is not installed, use the array backend")
+        self.slots: Dict[Hashable, int] = {}
+        self.ts = np.full(1024, -np.inf)
+        self.rows = np.full(1024, -1, dtype=np.int64)
+        self.chunk_size = chunk_size
+        self._codes = array("q")
+        self._chunk_ts = array("d")
+        self._chunk_rows = array("q")
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def add(self, key: Hashable, ts: float, row: int) -> None:
+        code = self.slots.setdefault(key, len(self.slots))
+        self._codes.append(code)
+        self._chunk_ts.append(ts)
+        self._chunk_rows.append(row)
+        if len(self._codes) >= self.chunk_size:
+            self._reduce()
+
+    def winning_rows(self) -> Sequence[int]:
+        self._reduce()
+        return np.sort(self.rows[:len(self.slots)])
+
+    def _reduce(self) -> None:
+        if not self._codes:
+            return
+        codes = np.frombuffer(self._codes, dtype=np.int64)
+        ts = np.frombuffer(self._chunk_ts, dtype=np.float64)
+        rows = np.frombuffer(self._chunk_rows, dtype=np.int64)
+        # per code: max ts, earliest row among equal ts -> last element of each group
+        order = np.lexsort((-rows, ts, codes))
+        last = np.append(codes[order][1:] != codes[order][:-1], True)
+        best = order[last]
+        if len(self.slots) > len(self.ts):
+            grow = max(len(self.slots), 2 * len(self.ts)) - len(self.ts)
+            self.ts = np.append(self.ts, np.full(grow, -np.inf))
+            self.rows = np.append(self.rows, np.full(grow, -1, dtype=np.int64))
+        newer = ts[best] > self.ts[codes[best]]
+        self.ts[codes[best][newer]] = ts[best][newer]
+        self.rows[codes[best][newer]] = rows[best][newer]
+        self._codes, self._chunk_ts, self._chunk_rows = array("q"), array("d"), array("q")
+
+
+# -----------------------
+# Engines
+# -----------------------
+def dedup_stream(events: Iterable[Event], key: str = "key", ts: str = "ts") -> Iterator[Event]:
+    """Latest event per key for any iterable (one pass), in first-seen key order"""
+    state = LatestTs()
+    winners: List[Event] = []
+    for row, event in enumerate(events):
+        if state.add(event[key], event[ts], row):
+            slot = state.slots[event[key]]
+            if slot == len(winners):
+                winners.append(event)
+            else:
+                winners[slot] = event
+    yield from winners
+
+
+def dedup_file(path: str, fmt: Optional[str] = None, key: str = "key", ts: str = "ts",
+               backend: str = "array") -> Iterator[Event]:
+    """Latest event per key of a file, two passes, rows yielded in file order"""
+    if backend == "auto":
+        backend = "numpy" if np is not None else "array"
+    state = NumpyLatestTs() if backend == "numpy" else LatestTs()
+    for row, event in enumerate(read_events(path, fmt, ts)):
+        state.add(event[key], event[ts], row)
+    winning = state.winning_rows()
+    state = None  # the row numbers are all pass 2 needs
+    if len(winning) == 0:  # array or numpy array: no truth value for the latter
+        return
+    position = 0
+    for row, event in enumerate(read_events(path, fmt, ts)):
+        if row == winning[position]:
+            yield event
+            position += 1
+            if position == len(winning):
+                return
+
+
+def dedup_windowed(events: Iterable[Event], window: float, key: str = "key", ts: str = "ts",
+                   lateness: float = 0.0) -> Iterator[Tuple[float, Event]]:
+    """
+    (window_start, event): latest event per key per tumbling window of `window` seconds.
+    A window is emitted once the stream is `lateness` past its end, so memory holds
+    only the open windows; events for an already emitted window are dropped.
+    """
+    open_windows: Dict[int, Dict[Hashable, Event]] = {}
+    first_open = float("-inf")
+    watermark = float("-inf")
+    for event in events:
+        index = int(event[ts] // window)
+        if index < first_open:
+            continue
+        latest = open_windows.setdefault(index, {})
+        current = latest.get(event[key])
+        if current is None or event[ts] > current[ts]:
+            latest[event[key]] = event
+        watermark = max(watermark, event[ts] - lateness)
+        for i in sorted(i for i in open_windows if (i + 1) * window <= watermark):
+            for winner in open_windows.pop(i).values():
+                yield i * window, winner
+            first_open = max(first_open, i + 1)
+    for i in sorted(open_windows):
+        for winner in open_windows[i].values():
+            yield i * window, winner
+
+
+# -----------------------
+# Benchmark
+# -----------------------
+def _generate(rows: int, keys: int, seed: int = 1) -> Iterator[Event]:
+    rnd = random.Random(seed)
+    for i in range(rows):
+        yield {"key": f"k{rnd.randrange(keys)}", "ts": float(rnd.randrange(rows)), "value": i}
+
+
+def _measure(name: str, run: Callable[[], Any]) -> Tuple[str, float, float, Any]:
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = run()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return name, elapsed, peak / 2 ** 20, result
+
+
+def benchmark(rows: int, keys: int) -> List[Tuple[str, float, float]]:
+    from examples.examples import dedup
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ndjson_path = os.path.join(tmp, "events.ndjson")
+        csv_path = os.path.join(tmp, "events.csv")
+        with open(ndjson_path, "w") as f:
+            f.writelines(json.dumps(event) + "\n" for event in _generate(rows, keys))
+        with open(csv_path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=["key", "ts", "value"])
+            writer.writeheader()
+            writer.writerows(_generate(rows, keys))
+
+        runs = [
+            ("examples.dedup (list in memory)", lambda: dedup(list(read_ndjson(ndjson_path)))),
+            ("dedup_stream", lambda: list(dedup_stream(read_ndjson(ndjson_path)))),
+            ("dedup_file ndjson / array", lambda: list(dedup_file(ndjson_path))),
+            ("dedup_file csv / array", lambda: list(dedup_file(csv_path))),
+        ]
+        if np is not None:
+            runs.append(("dedup_file ndjson / numpy", lambda: list(dedup_file(ndjson_path, backend="numpy"))))
+
+        results = [_measure(name, run) for name, run in runs]
+
+    expected = {event["key"]: (event["ts"], event["value"]) for event in results[0][3]}
+    for name, _, _, result in results[1:]:
+        actual = {event["key"]: (float(event["ts"]), int(event["value"])) for event in result}
+        if actual != expected:
+            raise AssertionError(f"{name} differs from examples.dedup")
+    return [(name, elapsed, peak) for name, elapsed, peak, _ in results]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="dedup_engine vs examples.dedup")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--keys", type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    out = io.StringIO()
+    out.write(f"{args.rows} rows, {args.keys} keys\n")
+    out.write(f"{'engine':<34}{'time, s':>10}{'peak, MiB':>12}\n")
+    for name, elapsed, peak in benchmark(args.rows, args.keys):
+        out.write(f"{name:<34}{elapsed:>10.2f}{peak:>12.1f}\n")
+    print(out.getvalue(), end="")
+
+
+if __name__ == "__main__":
+    main()
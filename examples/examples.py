@@ -30,14 +30,12 @@ def fetch(url, tries=3, base_delay=0.2):
     for i in range(tries):
         try:
             r = requests.get(url, timeout=5)
-            if r.status_code >= 500: raise RuntimeError
+            if r.status_code >= 500: raise RuntimeError(f"{r.status_code} from {url}")
             return r
         except Exception:
             if i == tries-1: raise
             time.sleep(delay + random.random()*0.2)
             delay *= 2
-            return None
-    return None
 
 
 """
@@ -0,0 +1,66 @@
+import random
+import time
+from typing import Callable, TypeVar
+
+from requests import Response
+
+"""
+Eventual consistency helpers for the API layer: instead of a fixed sleep, poll with
+exponential backoff + jitter (like `fetch` in examples/examples.py) under a total
+deadline and return as soon as the resource shows up.
+"""
+
+T = TypeVar("T")
+
+
+def wait_for(fetch: Callable[[], T],
+             until: Callable[[T], bool] = bool,
+             timeout: float = 10.0,
+             base_delay: float = 0.05,
+             max_delay: float = 1.0,
+             message: str = "Condition was not met",
+             clock: Callable[[], float] = time.monotonic,
+             sleep: Callable[[float], None] = time.sleep) -> T:
+    deadline = clock() + timeout
+    delay = base_delay
+    while True:
+        result = fetch()
+        if until(result):
+            return result
+        remaining = deadline - clock()
+        if remaining <= 0:
+            raise AssertionError(f"{message} in {timeout}s. Last result: {_describe(result)}")
+        # full jitter keeps parallel workers from polling in lockstep
+        sleep(min(remaining, random.uniform(0, delay)))
+        delay = min(delay * 2, max_delay)
+
+
+def wait_for_status(request: Callable[[], Response], status_code: int = 200, timeout: float = 10.0) -> Response:
+    return wait_for(request,
+                    until=lambda response: response.status_code == status_code,
+                    timeout=timeout,
+                    message=f"Expected status {status_code}")
+
+
+def wait_for_pet(pet_api, pet_id: int, timeout: float = 10.0) -> Response:
+    """Poll PetAPI.get_pet_by_id until the pet is readable"""
+    return wait_for_status(lambda: pet_api.get_pet_by_id(pet_id=pet_id), 200, timeout)
+
+
+def wait_for_pet_deleted(pet_api, pet_id: int, timeout: float = 10.0) -> Response:
+    return wait_for_status(lambda: pet_api.get_pet_by_id(pet_id=pet_id), 404, timeout)
+
+
+def wait_for_pets(client, until: Callable[[list], bool], timeout: float = 10.0) -> list:
+    """Poll FastApiClient.get_pets until `until(data)` holds for the returned page"""
+    response = wait_for(lambda: client.get_pets(),
+                        until=lambda r: r.status_code == 200 and until(r.json()["data"]),
+                        timeout=timeout,
+                        message="Pets page did not match")
+    return response.json()["data"]
+
+
+def _describe(result) -> str:
+    if isinstance(result, Response):
+        return f"{result.request.method} {result.request.url} - {result.status_code}"
+    return repr(result)
@@ -0,0 +1,250 @@
+import bisect
+import threading
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+"""
+Pagination consistency for cursor APIs (GET /pets?cursor=&limit=) - assert_no_overlap
+from examples/examples.py generalized to every page of a listing.
+
+One pass over the pages, O(1) work per item:
+  duplicates  - the id was already seen (IdBitmap)
+  order       - ids strictly increase across pages
+  next        - a full page points at its last id, a short page ends the listing
+  gaps        - ids expected (GET /pets/export, or given) but never listed, and ids
+                listed but not expected; computed container by container at the end
+
+IdBitmap is a roaring-style set: ids are split by their high bits into 65536-wide
+chunks, each a sorted array('H') while sparse and an 8 KiB bitmap once dense, so
+millions of ids take a few bytes each.
+"""
+
+_CHUNK_BITS = 16
+_LOW_MASK = (1 << _CHUNK_BITS) - 1
+# past this many ids an array('H') (2 bytes/id) is bigger than the 8 KiB bitmap
+_ARRAY_MAX = 4096
+
+Page = Tuple[List[int], Optional[int]]
+FetchPage = Callable[[Optional[int]], Page]
+
+
+class IdBitmap:
+
+    def __init__(self, ids: Iterable[int] = ()):
+        self._chunks: Dict[int, Union[array, bytearray]] = {}
+        self._size = 0
+        for pet_id in ids:
+            self.add(pet_id)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, pet_id: int) -> bool:
+        chunk = self._chunks.get(pet_id >> _CHUNK_BITS)
+        return chunk is not None and _has(chunk, pet_id & _LOW_MASK)
+
+    def add(self, pet_id: int) -> bool:
+        """False when the id was already there"""
+        if pet_id < 0:
+            raise ValueError(f"Negative id: {pet_id}")
+        high, low = pet_id >> _CHUNK_BITS, pet_id & _LOW_MASK
+        chunk = self._chunks.get(high)
+        if chunk is None:
+            self._chunks[high] = array("H", [low])
+        elif isinstance(chunk, bytearray):
+            byte, bit = low >> 3, 1 << (low & 7)
+            if chunk[byte] & bit:
+                return False
+            chunk[byte] |= bit
+        else:
+            # listings come in id order, so this is an append
+            if chunk[-1] < low:
+                chunk.append(low)
+            else:
+                i = bisect.bisect_left(chunk, low)
+                if i < len(chunk) and chunk[i] == low:
+                    return False
+                chunk.insert(i, low)
+            if len(chunk) > _ARRAY_MAX:
+                self._chunks[high] = _to_bitmap(chunk)
+        self._size += 1
+        return True
+
+    def __iter__(self) -> Iterator[int]:
+        for high in sorted(self._chunks):
+            base = high << _CHUNK_BITS
+            for low in _lows(self._chunks[high]):
+                yield base | low
+
+    def difference(self, other: "IdBitmap") -> Iterator[int]:
+        """Ids in self and not in other, chunks missing from other are taken whole"""
+        for high in sorted(self._chunks):
+            base = high << _CHUNK_BITS
+            theirs = other._chunks.get(high)
+            for low in _lows(self._chunks[high]):
+                if theirs is None or not _has(theirs, low):
+                    yield base | low
+
+    def update(self, other: "IdBitmap") -> List[int]:
+        """Add all ids of other, returns the ones that were already here"""
+        return [pet_id for pet_id in other if not self.add(pet_id)]
+
+
+def _to_bitmap(chunk: array) -> bytearray:
+    bitmap = bytearray(1 << (_CHUNK_BITS - 3))
+    for low in chunk:
+        bitmap[low >> 3] |= 1 << (low & 7)
+    return bitmap
+
+
+def _lows(chunk: Union[array, bytearray]) -> Iterator[int]:
+    if not isinstance(chunk, bytearray):
+        yield from chunk
+        return
+    for byte_index, byte in enumerate(chunk):
+        while byte:
+            bit = byte & -byte
+            yield (byte_index << 3) | (bit.bit_length() - 1)
+            byte ^= bit
+
+
+def _has(chunk: Union[array, bytearray], low: int) -> bool:
+    if isinstance(chunk, bytearray):
+        return bool(chunk[low >> 3] & (1 << (low & 7)))
+    i = bisect.bisect_left(chunk, low)
+    return i < len(chunk) and chunk[i] == low
+
+
+@dataclass
+class PaginationReport:
+    label: str = ""
+    pages: int = 0
+    items: int = 0
+    duplicates: List[int] = field(default_factory=list)
+    out_of_order: List[Tuple[int, int]] = field(default_factory=list)
+    bad_next: List[str] = field(default_factory=list)
+    missing: List[int] = field(default_factory=list)
+    unexpected: List[int] = field(default_factory=list)
+    seen: IdBitmap = field(default_factory=IdBitmap, repr=False)
+
+    @property
+    def ok(self) -> bool:
+        return not (self.duplicates or self.out_of_order or self.bad_next or self.missing or self.unexpected)
+
+    def assert_ok(self, sample: int = 10) -> None:
+        problems = {name: values[:sample] for name, values in (("duplicates", self.duplicates),
+                                                               ("out_of_order", self.out_of_order),
+                                                               ("bad_next", self.bad_next),
+                                                               ("missing", self.missing),
+                                                               ("unexpected", self.unexpected)) if values}
+        assert not problems, f"Pagination of {self.label or 'listing'} is inconsistent " \
+                             f"({self.pages} pages, {self.items} items): {problems}"
+
+
+class PaginationChecker:
+    """
+    Crawl a cursor listing: fetch(cursor) -> (ids, next).
+    limit=None: page size unknown, `next` is only checked for pointing at the last id.
+    monotonic=False: the API does not promise an order (e.g. petstore findByStatus).
+    """
+
+    def __init__(self, fetch: FetchPage, limit: Optional[int] = None, monotonic: bool = True,
+                 max_pages: int = 1_000_000, label: str = ""):
+        self.fetch = fetch
+        self.limit = limit
+        self.monotonic = monotonic
+        self.max_pages = max_pages
+        self.label = label
+
+    def crawl(self, expected: Optional[Union[IdBitmap, Iterable[int]]] = None) -> PaginationReport:
+        report = PaginationReport(label=self.label)
+        seen = report.seen
+        last = -1
+        cursor = None
+        while report.pages < self.max_pages:
+            ids, next_cursor = self.fetch(cursor)
+            report.pages += 1
+            for pet_id in ids:
+                report.items += 1
+                if not seen.add(pet_id):
+                    report.duplicates.append(pet_id)
+                if self.monotonic and pet_id <= last:
+                    report.out_of_order.append((last, pet_id))
+                last = max(last, pet_id)
+            self._check_next(report, cursor, ids, next_cursor)
+            if next_cursor is None or not ids:
+                break
+            cursor = next_cursor
+        else:
+            report.bad_next.append(f"still paging after {self.max_pages} pages")
+        if expected is not None:
+            expected = expected if isinstance(expected, IdBitmap) else IdBitmap(expected)
+            report.missing = list(expected.difference(seen))
+            report.unexpected = list(seen.difference(expected))
+        return report
+
+    def _check_next(self, report: PaginationReport, cursor: Optional[int], ids: List[int],
+                    next_cursor: Optional[int]) -> None:
+        where = f"page after cursor {cursor}"
+        if next_cursor is None:
+            if self.limit is not None and len(ids) == self.limit:
+                # the service links every full page, the page after it may be empty
+                report.bad_next.append(f"{where}: full page without next")
+            return
+        if not ids:
+            report.bad_next.append(f"{where}: empty page with next={next_cursor}")
+        elif self.limit is not None and len(ids) < self.limit:
+            report.bad_next.append(f"{where}: short page ({len(ids)}) with next={next_cursor}")
+        elif next_cursor != ids[-1]:
+            report.bad_next.append(f"{where}: next={next_cursor}, last id {ids[-1]}")
+
+
+# -----------------------
+# Adapters
+# -----------------------
+def fastapi_pages(client, status: Optional[str] = None, limit: int = 100) -> PaginationChecker:
+    """GET /pets of api_pet_service through FastApiClient"""
+    def fetch(cursor: Optional[int]) -> Page:
+        response = client.get_pets(status=status, limit=limit, cursor=cursor)
+        response.raise_for_status()
+        body = response.json()
+        return [pet["id"] for pet in body["data"]], body["next"]
+    return PaginationChecker(fetch, limit=limit, label=f"GET /pets status={status}")
+
+
+def fastapi_expected(client, status: Optional[str] = None) -> IdBitmap:
+    """Every id of the listing, from the NDJSON export (one streamed request)"""
+    return IdBitmap(pet["id"] for pet in client.iter_export_pets(status=status))
+
+
+def petstore_pages(pet_api, status: str) -> PaginationChecker:
+    """findByStatus of the swagger petstore: one unordered page"""
+    def fetch(cursor: Optional[int]) -> Page:
+        response = pet_api.find_pets_by_status([status])
+        response.raise_for_status()
+        return [pet["id"] for pet in response.json()], None
+    return PaginationChecker(fetch, monotonic=False, label=f"findByStatus status={status}")
+
+
+def check_statuses(checker_for: Callable[[str], PaginationChecker], statuses: Iterable[str],
+                   expected_for: Optional[Callable[[str], Iterable[int]]] = None,
+                   workers: int = 4) -> Dict[str, PaginationReport]:
+    """
+    Crawl several status filters in parallel. A pet has one status, so an id listed
+    under two statuses is reported as a duplicate of the later one.
+    """
+    statuses = list(statuses)
+    lock = threading.Lock()
+    union = IdBitmap()
+
+    def crawl(status: str) -> PaginationReport:
+        expected = expected_for(status) if expected_for else None
+        report = checker_for(status).crawl(expected)
+        with lock:
+            report.duplicates.extend(union.update(report.seen))
+        return report
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(statuses)) or 1) as pool:
+        return dict(zip(statuses, pool.map(crawl, statuses)))
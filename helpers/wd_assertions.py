@@ -1,15 +1,148 @@
+import time
+from typing import Optional
+
+from selenium.common.exceptions import (NoSuchFrameException, StaleElementReferenceException, TimeoutException,
+                                        WebDriverException)
 from selenium.webdriver.chrome.webdriver import WebDriver
-from selenium.webdriver.support import expected_conditions as ec
-from selenium.webdriver.support.wait import WebDriverWait
-
-
-def wait_until_text(driver: WebDriver, locator: (str, str), expected_text: str) -> None:
-    actual_text = None
-    try:
-        actual_text = driver.find_element(*locator).text
-    except:
-        pass
-    WebDriverWait(driver, 5).until(
-        ec.text_to_be_present_in_element(locator, expected_text),
-        message=f"\nExpected text: '{expected_text}' in element {locator}. Actual text: {actual_text}"
-    )
\ No newline at end of file
+
+from ui.base_page import FIND_ELEMENT_JS
+
+"""
+Event-driven waits.
+
+The condition is checked inside the page: a MutationObserver re-checks it on every
+DOM change (plus a short in-page timer for non-DOM changes like the url), and the
+async script returns as soon as it holds - no fixed 0.5s polling interval.
+When the script can't finish (navigation in progress, script timeout) the same
+check is polled from Python with short intervals first; any other WebDriver error
+(a JS error in the check, a dead session) is raised right away.
+"""
+
+# check(kind, by, value, arg1, arg2) -> [ok, actual]
+_CHECK_JS = FIND_ELEMENT_JS + """
+function isVisible(el) {
+    return !!(el && (el.offsetWidth || el.offsetHeight || el.getClientRects().length)
+              && getComputedStyle(el).visibility !== "hidden");
+}
+function check(kind, by, value, arg1, arg2) {
+    if (kind === "url_contains") { return [location.href.includes(arg1), location.href]; }
+    const el = find(by, value);
+    switch (kind) {
+        case "present": return [!!el, !!el];
+        case "visible": return [isVisible(el), isVisible(el)];
+        case "invisible": return [!isVisible(el), isVisible(el)];
+        case "text_contains": {
+            const text = el ? el.innerText : null;
+            return [text !== null && text.includes(arg1), text];
+        }
+        case "attribute_contains": {
+            const attribute = el ? el.getAttribute(arg1) : null;
+            return [attribute !== null && attribute.includes(arg2), attribute];
+        }
+        default: throw new Error("Unknown condition: " + kind);
+    }
+}
+"""
+
+_WAIT_JS = _CHECK_JS + """
+const [kind, by, value, arg1, arg2, timeoutMs] = arguments;
+const done = arguments[arguments.length - 1];
+let result = check(kind, by, value, arg1, arg2);
+if (result[0]) { done(result); return; }
+let finished = false;
+const observer = new MutationObserver(recheck);
+observer.observe(document, {subtree: true, childList: true, characterData: true, attributes: true});
+const ticker = setInterval(recheck, 50);
+const timer = setTimeout(() => finish(check(kind, by, value, arg1, arg2)), timeoutMs);
+function recheck() {
+    const result = check(kind, by, value, arg1, arg2);
+    if (result[0]) { finish(result); }
+}
+function finish(result) {
+    if (finished) { return; }
+    finished = true;
+    observer.disconnect();
+    clearInterval(ticker);
+    clearTimeout(timer);
+    done(result);
+}
+"""
+
+_POLL_JS = _CHECK_JS + """
+return check(...arguments);
+"""
+
+# below the default 30s script timeout, longer waits are split into slices
+_MAX_SLICE = 25.0
+_POLL_INTERVALS = (0.01, 0.02, 0.05, 0.1, 0.2)
+_MAX_POLL_INTERVAL = 0.25
+# selenium raises a script timeout as TimeoutException
+_TRANSIENT = (TimeoutException, StaleElementReferenceException, NoSuchFrameException)
+# chromedriver reports the page going away under a running script as a javascript / unknown error
+_NAVIGATION_MESSAGES = ("document unloaded", "execution context was destroyed", "cannot find context",
+                        "inspected target navigated or closed")
+
+
+def wait_until(driver: WebDriver, kind: str, locator: Optional[tuple] = None, arg1=None, arg2=None,
+               timeout: float = 5, message: str = ""):
+    """Wait for a condition (see check() kinds), returns the actual value when it holds"""
+    by, value = locator or (None, None)
+    deadline = time.monotonic() + timeout
+    actual = None
+    polling = False
+    polls = 0
+    while True:
+        remaining = deadline - time.monotonic()
+        try:
+            if not polling:
+                ok, actual = driver.execute_async_script(_WAIT_JS, kind, by, value, arg1, arg2,
+                                                         int(min(remaining, _MAX_SLICE) * 1000))
+            else:
+                ok, actual = driver.execute_script(_POLL_JS, kind, by, value, arg1, arg2)
+        except WebDriverException as error:
+            if not _transient(error):
+                raise
+            # page is navigating or the script timed out: adaptive polling from here
+            ok, polling = False, True
+        if ok:
+            return actual
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutException(f"{message} Actual: {actual}")
+        if polling:
+            interval = _POLL_INTERVALS[polls] if polls < len(_POLL_INTERVALS) else _MAX_POLL_INTERVAL
+            time.sleep(min(interval, remaining))
+            polls += 1
+
+
+def _transient(error: WebDriverException) -> bool:
+    message = (error.msg or "").lower()
+    return isinstance(error, _TRANSIENT) or any(part in message for part in _NAVIGATION_MESSAGES)
+
+
+def wait_until_text(driver: WebDriver, locator: (str, str), expected_text: str, timeout: float = 5) -> None:
+    wait_until(driver, "text_contains", locator, expected_text, timeout=timeout,
+               message=f"\nExpected text: '{expected_text}' in element {locator}.")
+
+
+def wait_until_present(driver: WebDriver, locator: (str, str), timeout: float = 5) -> None:
+    wait_until(driver, "present", locator, timeout=timeout, message=f"\nElement {locator} is not present.")
+
+
+def wait_until_visible(driver: WebDriver, locator: (str, str), timeout: float = 5) -> None:
+    wait_until(driver, "visible", locator, timeout=timeout, message=f"\nElement {locator} is not visible.")
+
+
+def wait_until_invisible(driver: WebDriver, locator: (str, str), timeout: float = 5) -> None:
+    wait_until(driver, "invisible", locator, timeout=timeout, message=f"\nElement {locator} is still visible.")
+
+
+def wait_until_attribute_contains(driver: WebDriver, locator: (str, str), attribute: str, expected: str,
+                                  timeout: float = 5) -> None:
+    wait_until(driver, "attribute_contains", locator, attribute, expected, timeout=timeout,
+               message=f"\nExpected '{expected}' in attribute '{attribute}' of element {locator}.")
+
+
+def wait_until_url_contains(driver: WebDriver, expected: str, timeout: float = 5) -> None:
+    wait_until(driver, "url_contains", arg1=expected, timeout=timeout,
+               message=f"\nExpected url to contain '{expected}'.")
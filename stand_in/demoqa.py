@@ -0,0 +1,47 @@
+import secrets
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+from pydantic import BaseModel
+
+"""
+demoqa.com pages used by ui/demo_pages.py, served from static snapshots.
+
+The snapshots keep the ids, markup and behaviour the page objects rely on (text-box
+output and email validation, the Book Store login / profile) without the site's
+bundles, ads and fonts. Account/v1/Login mirrors the Book Store API that
+ui.state_seeding uses to seed the logged-in cookies.
+"""
+
+router = APIRouter(tags=["demoqa"])
+
+SNAPSHOTS = Path(__file__).parent / "snapshots" / "demoqa"
+PAGES = ("text-box", "login", "profile")
+
+
+class LoginViewModel(BaseModel):
+    userName: str
+    password: str
+
+
+def _page(name: str):
+    async def page():
+        return FileResponse(SNAPSHOTS / f"{name}.html", media_type="text/html")
+    return page
+
+
+for _name in PAGES:
+    router.add_api_route(f"/{_name}", _page(_name), methods=["GET"], include_in_schema=False)
+
+
+@router.post("/Account/v1/Login")
+async def login(req: LoginViewModel):
+    if not req.userName or not req.password:
+        raise HTTPException(status_code=400, detail="UserName and Password required.")
+    expires = datetime.fromtimestamp(time.time() + 7 * 24 * 3600, tz=timezone.utc)
+    return {"userId": f"stand-in-{req.userName}", "username": req.userName, "password": req.password,
+            "token": secrets.token_hex(16), "expires": expires.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+            "created_date": datetime.now(tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z"), "isActive": False}
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import secrets
+import time
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Query, Response
+from fastapi.responses import JSONResponse
+
+from api_pet_service import main
+from api_pet_service.main import Pet, PetBase, PetStatus
+
+"""
+Swagger petstore (/v2) contract used by PetAPI, served from the api_pet_service store.
+
+Pets live in main.PETS next to the ones created through /pets, so both APIs see
+the same data. Responses follow petstore.swagger.io: the pet without the service's
+created_at / version, {"code", "type", "message"} bodies for errors and deletes,
+and client-supplied ids are kept.
+"""
+
+router = APIRouter(prefix="/v2", tags=["petstore"])
+
+_SWAGGER_FIELDS = {"id", "category", "name", "photoUrls", "tags", "status"}
+
+
+class SwaggerPet(PetBase):
+    id: Optional[int] = None
+
+
+def _body(pet: Pet) -> dict:
+    return pet.model_dump(mode="json", include=_SWAGGER_FIELDS)
+
+
+def _message(code: int, message: str, type_: str = "unknown") -> JSONResponse:
+    return JSONResponse({"code": code, "type": type_, "message": message}, status_code=code)
+
+
+def _parse_id(pet_id: str) -> Optional[int]:
+    # the real service answers 404 (not 400) for ids that are not numbers
+    try:
+        return int(pet_id)
+    except ValueError:
+        return None
+
+
+def _upsert(req: SwaggerPet) -> Pet:
+    with main.PETS.lock:
+        # 0 / missing id: the store assigns one, like the swagger server
+        pet_id = req.id or main.PETS.next_id()
+        old = main.PETS.get(pet_id)
+        pet = Pet(id=pet_id,
+                  created_at=old.created_at if old else datetime.utcnow(),
+                  version=old.version + 1 if old else 1,
+                  **req.model_dump(exclude={"id"}))
+        main.PETS.put(pet)
+    return pet
+
+
+@router.post("/pet")
+async def add_pet(req: SwaggerPet):
+    return _body(_upsert(req))
+
+
+@router.put("/pet")
+async def update_pet(req: SwaggerPet):
+    return _body(_upsert(req))
+
+
+@router.put("/pet/{pet_id}")
+async def update_pet_by_id(pet_id: str, req: SwaggerPet):
+    parsed = _parse_id(pet_id)
+    if parsed is None:
+        return _message(404, "Pet not found", "error")
+    return _body(_upsert(req.model_copy(update={"id": parsed})))
+
+
+@router.get("/pet/findByStatus")
+async def find_pets_by_status(status: List[PetStatus] = Query(...)):
+    # one index scan per status, like findByStatus?status=a&status=b on the real server
+    return [_body(pet) for value in dict.fromkeys(status) for pet in main.PETS.scan(status=value)]
+
+
+@router.get("/pet/{pet_id}")
+async def get_pet(pet_id: str):
+    parsed = _parse_id(pet_id)
+    pet = main.PETS.get(parsed) if parsed is not None else None
+    if pet is None:
+        return _message(404, "Pet not found", "error")
+    return _body(pet)
+
+
+@router.delete("/pet/{pet_id}")
+async def delete_pet(pet_id: str):
+    parsed = _parse_id(pet_id)
+    if parsed is None or main.PETS.delete(parsed) is None:
+        return Response(status_code=404)
+    return _message(200, str(parsed))
+
+
+@router.api_route("/user/login", methods=["GET", "POST"])
+async def login_user(username: Optional[str] = None, password: Optional[str] = None):
+    # any credentials are accepted, as on the public server; PetAPI reads the token header
+    session = secrets.token_hex(8)
+    response = _message(200, f"logged in user session:{session}")
+    response.headers["X-Expires-After"] = datetime.utcfromtimestamp(time.time() + 3600).strftime(
+        "%a %b %d %H:%M:%S UTC %Y")
+    response.headers["X-Rate-Limit"] = "5000"
+    response.headers["JWT-TOKEN"] = session
+    return response
+
+
+@router.get("/user/logout")
+async def logout_user():
+    return _message(200, "ok")
@@ -0,0 +1,81 @@
+import logging
+import socket
+import threading
+import time
+from typing import Optional
+
+import uvicorn
+from fastapi import FastAPI
+
+from api_pet_service import main
+from core.config import Config
+from stand_in import demoqa, petstore
+
+"""
+Local stand-in for the remote targets of the suites: one in-process server for
+  BASE_URL            - api_pet_service
+  BASE_PET_STORE_URL  - {base}/v2, the swagger petstore contract (same store)
+  BASE_QA_DEMO_URL    - demoqa snapshots
+
+Run it standalone:
+uvicorn stand_in.server:app --port 8010  # from the repo root
+
+or let the tests start it (STAND_IN=true, see .env.offline): StandInServer binds a
+free port in a background thread and points Config at it.
+"""
+
+logger = logging.getLogger(__name__)
+
+app = FastAPI(title="Offline stand-in")
+app.include_router(petstore.router)
+app.include_router(demoqa.router)
+# everything else is the pet service itself
+app.mount("/", main.app)
+
+
+class StandInServer:
+
+    def __init__(self, host: str = "127.0.0.1", port: int = Config.STAND_IN_PORT):
+        self.host = host
+        self.port = port
+        self._server: Optional[uvicorn.Server] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self, timeout: float = 10) -> "StandInServer":
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        # port 0: the OS picks a free one, so parallel workers don't collide
+        sock.bind((self.host, self.port))
+        self.port = sock.getsockname()[1]
+        self._server = uvicorn.Server(uvicorn.Config(app, log_level="warning", lifespan="off"))
+        self._thread = threading.Thread(target=self._server.run, kwargs={"sockets": [sock]},
+                                        name="stand-in", daemon=True)
+        self._thread.start()
+        deadline = time.monotonic() + timeout
+        while not self._server.started:
+            if not self._thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError(f"Stand-in server did not start on {self.base_url}")
+            time.sleep(0.01)
+        logger.info("Stand-in server on %s", self.base_url)
+        return self
+
+    def point_config(self) -> None:
+        """Send every client that reads Config to this server"""
+        Config.BASE_URL = self.base_url
+        Config.BASE_PET_STORE_URL = f"{self.base_url}/v2"
+        Config.BASE_QA_DEMO_URL = self.base_url
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.should_exit = True
+            self._thread.join(timeout=10)
+
+    def __enter__(self) -> "StandInServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
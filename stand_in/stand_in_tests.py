@@ -0,0 +1,74 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from api_pet_service import main
+from api_pet_service.storage import PetStore
+from stand_in import server
+
+"""
+In-process tests for the stand-in: swagger petstore contract and demoqa snapshots.
+"""
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(main, "PETS", PetStore())
+    return TestClient(server.app)
+
+
+def test_petstore_crud_with_client_id(client):
+    pet = {"id": 42, "name": "kitty", "photoUrls": ["photo_url"], "category": {"id": 1, "name": "home"},
+           "status": "available"}
+
+    created = client.post("/v2/pet", json=pet)
+    assert created.status_code == 200
+    assert created.json() == {**pet, "tags": None}
+    assert client.get("/v2/pet/42").json()["name"] == "kitty"
+
+    deleted = client.delete("/v2/pet/42")
+    assert deleted.json() == {"code": 200, "type": "unknown", "message": "42"}
+    assert client.get("/v2/pet/42").status_code == 404
+
+
+def test_petstore_assigns_ids_after_client_ids(client):
+    client.post("/v2/pet", json={"id": 100, "name": "a"})
+
+    assert client.post("/v2/pet", json={"name": "b"}).json()["id"] == 101
+
+
+@pytest.mark.parametrize("pet_id", ["tratata", "_", "12345_", "7"])
+def test_petstore_delete_unknown_id_is_404(client, pet_id):
+    response = client.delete(f"/v2/pet/{pet_id}")
+
+    assert response.status_code == 404
+    assert response.reason_phrase == "Not Found"
+
+
+def test_petstore_find_by_status_shares_the_service_store(client):
+    client.post("/v2/pet", json={"name": "a", "status": "sold"})
+    client.post("/v2/pet", json={"name": "b", "status": "pending"})
+    client.post("/v2/pet", json={"name": "c", "status": "sold"})
+
+    sold = client.get("/v2/pet/findByStatus", params={"status": "sold"}).json()
+
+    assert [pet["name"] for pet in sold] == ["a", "c"]
+    assert len(main.PETS) == 3
+
+
+def test_petstore_login_returns_token_header(client):
+    response = client.get("/v2/user/login", params={"username": "u", "password": "p"})
+
+    assert response.status_code == 200
+    assert response.headers["JWT-TOKEN"]
+
+
+@pytest.mark.parametrize("page", ["text-box", "login", "profile"])
+def test_demoqa_snapshots_are_served(client, page):
+    response = client.get(f"/{page}")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/html")
+
+
+def test_service_routes_are_mounted(client):
+    assert client.get("/health").json()["status"] == "ok"
@@ -0,0 +1,51 @@
+import pytest
+
+from helpers.api_polling import wait_for
+
+
+class FakeClock:
+    """monotonic clock that only moves when the poller sleeps"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def poll(clock, results, **kwargs):
+    results = iter(results)
+    return wait_for(lambda: next(results), clock=clock, sleep=clock.sleep, **kwargs)
+
+
+def test_returns_as_soon_as_the_condition_holds():
+    clock = FakeClock()
+
+    assert poll(clock, [None, None, "pet"], base_delay=0.1, max_delay=1.0) == "pet"
+    assert len(clock.sleeps) == 2
+    # full jitter: 0..0.1, then 0..0.2
+    assert 0 <= clock.sleeps[0] <= 0.1 and 0 <= clock.sleeps[1] <= 0.2
+
+
+def test_times_out_with_the_last_result():
+    clock = FakeClock()
+
+    with pytest.raises(AssertionError, match="Pet not found in 1.0s. Last result: 'missing'"):
+        poll(clock, ["missing"] * 1000, until=lambda pet: pet == "pet", timeout=1.0, base_delay=0.5, max_delay=0.5,
+             message="Pet not found")
+    assert clock.now == pytest.approx(1.0)
+
+
+def test_sleeps_never_run_past_the_deadline(monkeypatch):
+    monkeypatch.setattr("helpers.api_polling.random.uniform", lambda low, high: high)
+    clock = FakeClock()
+
+    with pytest.raises(AssertionError):
+        poll(clock, [None] * 100, timeout=1.0, base_delay=0.4, max_delay=10.0)
+    # 0.4, then 0.8 capped to the 0.6 left
+    assert clock.sleeps == [0.4, pytest.approx(0.6)]
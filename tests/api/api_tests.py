@@ -1,34 +1,39 @@
-from time import sleep
 from uuid import uuid4
 
 import pytest
 
+from core.api.cassette import recorded_value
 from core.api.data_models import Pet, Category
 from core.api.petstore_api_client import PetAPI
+from core.api.validation import validate
+from helpers.api_polling import wait_for_pet
 from tests.test_users import TestUsers
 
-new_pet_data = Pet(
-    category=Category(id=1, name="home"),
-    name=f"kitty_{uuid4().hex[:8]}",
-    photoUrls=["photo_url"],
-    status="available")
+@pytest.fixture(scope='module')
+def new_pet_data():
+    # the generated name is kept in the cassette (HTTP_CASSETTE_MODE), replay gets the recorded one
+    return Pet(
+        category=Category(id=1, name="home"),
+        name=recorded_value("api_tests.new_pet_name", lambda: f"kitty_{uuid4().hex[:8]}"),
+        photoUrls=["photo_url"],
+        status="available")
 
 @pytest.fixture(scope='module')
 def pet_api():
     return PetAPI(user=TestUsers.BASIC_USER)
 
 @pytest.fixture
-def new_pet(pet_api):
+def new_pet(pet_api, new_pet_data):
      response = pet_api.add_new_pet(new_pet=new_pet_data)
      response.raise_for_status()
-     pet_response = Pet(**response.json()) #** - deserialization
-     sleep(5)
+     pet_response = validate(response, Pet) # raw bytes -> model, no intermediate dict
+     wait_for_pet(pet_api, pet_response.id)
      yield pet_response #for shearing to every test
 
      pet_api.delete_pet(pet_response.id)
 
 
-def test_add_new_pet(pet_api, new_pet):
+def test_add_new_pet(pet_api, new_pet, new_pet_data):
     assert new_pet.id is not None
     assert new_pet.name == new_pet_data.name
     assert new_pet.category.id is not None
@@ -42,7 +47,7 @@ def test_update_existing_pet():
 def test_get_pet_by_id(pet_api, new_pet):
     response = pet_api.get_pet_by_id(pet_id=new_pet.id)
     assert response.status_code == 200
-    get_pet_response = Pet(**response.json())
+    get_pet_response = validate(response, Pet)
     assert get_pet_response.name == new_pet.name
     assert get_pet_response.category.id is not None
     assert get_pet_response.category.name == new_pet.category.name
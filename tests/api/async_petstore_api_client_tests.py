@@ -0,0 +1,74 @@
+import asyncio
+
+import httpx
+import pytest
+
+from core.api.async_petstore_api_client import AsyncApiPool, AsyncPetAPI, gather
+from core.api.data_models import User
+
+USER = User(username="user", password="secret")
+
+
+class FakePetStore:
+    """MockTransport handler: /pet/{id} answers after a delay, counts requests in flight"""
+
+    def __init__(self, delays=None, broken=()):
+        self.delays = delays or {}
+        self.broken = set(broken)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.logins = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/user/login"):
+            self.logins += 1
+            return httpx.Response(200, headers={"JWT-TOKEN": "token"})
+        pet_id = int(request.url.path.rsplit("/", 1)[-1])
+        if pet_id in self.broken:
+            raise httpx.ConnectError("connection refused", request=request)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delays.get(pet_id, 0.01))
+        finally:
+            self.in_flight -= 1
+        return httpx.Response(200, json={"id": pet_id, "auth": request.headers.get("Authorization")})
+
+
+def sweep(service, pet_ids, concurrency=10, return_exceptions=False):
+    async def run():
+        async with AsyncApiPool(concurrency=concurrency, transport=httpx.MockTransport(service)) as pool:
+            pet_api = AsyncPetAPI(pool, user=USER)
+            return await gather(*(pet_api.get_pet_by_id(i) for i in pet_ids), return_exceptions=return_exceptions)
+    return asyncio.run(run())
+
+
+def test_semaphore_bounds_requests_in_flight():
+    service = FakePetStore()
+
+    responses = sweep(service, range(20), concurrency=3)
+
+    assert len(responses) == 20
+    assert service.max_in_flight == 3
+    # one login for the whole sweep
+    assert service.logins == 1
+    assert {response.json()["auth"] for response in responses} == {"Bearer token"}
+
+
+def test_gather_keeps_call_order():
+    # later ids answer first
+    service = FakePetStore(delays={i: 0.05 - i * 0.005 for i in range(10)})
+
+    responses = sweep(service, range(10))
+
+    assert [response.json()["id"] for response in responses] == list(range(10))
+
+
+def test_errors_propagate_or_are_returned_in_place():
+    with pytest.raises(httpx.ConnectError):
+        sweep(FakePetStore(broken={3}), range(5))
+
+    results = sweep(FakePetStore(broken={3}), range(5), return_exceptions=True)
+
+    assert isinstance(results[3], httpx.ConnectError)
+    assert [result.json()["id"] for i, result in enumerate(results) if i != 3] == [0, 1, 2, 4]
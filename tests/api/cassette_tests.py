@@ -0,0 +1,136 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from requests import Response, Session
+from requests.adapters import BaseAdapter
+
+from core.api.cassette import Cassette, CassetteMiss, mount
+
+
+class FakeService(BaseAdapter):
+    """Answers with a counter so every live response is distinguishable"""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def send(self, request, **kwargs):
+        self.calls += 1
+        response = Response()
+        response.status_code = 404 if request.method == "DELETE" and self.calls > 2 else 200
+        response.reason = "OK"
+        response.headers["Content-Type"] = "application/json"
+        response._content = json.dumps({"call": self.calls, "path": request.path_url}).encode()
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def session_with(cassette, mode, service):
+    session = Session()
+    session.mount("http://", service)
+    return mount(session, cassette, mode)
+
+
+def test_replay_serves_recorded_responses_in_order(tmp_path):
+    path = str(tmp_path / "pets")
+    recorder = Cassette(path)
+    live = session_with(recorder, "record", FakeService())
+    live.get("http://live:8001/pet/1?b=2&a=1")
+    live.get("http://live:8001/pet/1?a=1&b=2")
+    recorder.close()
+
+    service = FakeService()
+    replay = session_with(Cassette(path), "replay", service)
+
+    # other host, same normalized request
+    assert replay.get("http://127.0.0.1:5555/pet/1?a=1&b=2").json()["call"] == 1
+    assert replay.get("http://127.0.0.1:5555/pet/1/?b=2&a=1").json()["call"] == 2
+    # past the recorded occurrences the last one is served
+    assert replay.get("http://127.0.0.1:5555/pet/1?a=1&b=2").json()["call"] == 2
+    assert service.calls == 0
+
+
+def test_replay_miss_raises(tmp_path):
+    replay = session_with(Cassette(str(tmp_path / "empty")), "replay", FakeService())
+
+    with pytest.raises(CassetteMiss):
+        replay.get("http://127.0.0.1/pet/1")
+
+
+def test_drift_reports_status_and_shape_changes(tmp_path):
+    path = str(tmp_path / "pets")
+    recorder = Cassette(path)
+    session_with(recorder, "record", FakeService()).delete("http://live/pet/1")
+    recorder.close()
+
+    cassette = Cassette(path)
+    service = FakeService()
+    service.calls = 5  # the live service now answers 404
+    session_with(cassette, "drift", service).delete("http://live/pet/1")
+
+    assert [drift.request for drift in cassette.drifts] == ["DELETE /pet/1"]
+
+
+def test_xdist_workers_record_shards_that_replay_together(tmp_path):
+    path = str(tmp_path / "pets")
+    gw0, gw1 = Cassette(path, worker="gw0"), Cassette(path, worker="gw1")
+    session_with(gw0, "record", FakeService()).get("http://live/pet/1")
+    later = FakeService()
+    later.calls = 10
+    session_with(gw1, "record", later).get("http://live/pet/2")
+    gw0.close()
+    gw1.close()
+
+    replay = session_with(Cassette(path, worker=""), "replay", FakeService())
+
+    # neither worker overwrote the other
+    assert replay.get("http://127.0.0.1/pet/1").json()["call"] == 1
+    assert replay.get("http://127.0.0.1/pet/2").json()["call"] == 11
+
+    # a single-process recording replaces the shards
+    single = Cassette(path, worker="")
+    session_with(single, "record", FakeService()).get("http://live/pet/3")
+    single.close()
+    assert [os.path.basename(shard) for shard in single.shards()] == ["pets"]
+
+
+def test_generated_values_are_recorded_and_replayed(tmp_path):
+    path = str(tmp_path / "pets")
+    recorder = Cassette(path)
+    names = iter(["kitty_1", "kitty_2"])
+    assert recorder.value("name", lambda: next(names), "record") == "kitty_1"
+    assert recorder.value("name", lambda: next(names), "record") == "kitty_1"
+    recorder.close()
+
+    replay = Cassette(path)
+    assert replay.value("name", lambda: "kitty_new", "replay") == "kitty_1"
+    with pytest.raises(CassetteMiss):
+        replay.value("other", lambda: "x", "replay")
+    assert Cassette(path).value("other", lambda: "fresh", "drift") == "fresh"
+
+
+def test_api_suite_records_against_the_stand_in_and_replays_offline(tmp_path):
+    pytest.importorskip("uvicorn")
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env = {key: value for key, value in os.environ.items() if not key.startswith("PYTEST_")}
+    env.update(HTTP_CASSETTE_DIR=str(tmp_path), HTTP_CASSETTE_NAME="api_tests", BASIC_USER_NAME="test",
+               BASIC_USER_PASSWORD="test", AUTH_TOKEN_CACHE_FILE="")
+
+    def run(**overrides):
+        return subprocess.run([sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", "-o", "log_cli=false",
+                               "tests/api/api_tests.py"],
+                              cwd=root, env={**env, **overrides}, capture_output=True, text=True, timeout=300)
+
+    recorded = run(HTTP_CASSETTE_MODE="record", STAND_IN="true")
+    assert recorded.returncode == 0, recorded.stdout + recorded.stderr
+
+    # nothing listens there: every answer, login included, comes from the cassette
+    replayed = run(HTTP_CASSETTE_MODE="replay", STAND_IN="false", BASE_PET_STORE_URL="http://127.0.0.1:9/v2")
+    assert replayed.returncode == 0, replayed.stdout + replayed.stderr
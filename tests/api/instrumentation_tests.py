@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+from core.api.instrumentation import RequestRecorder, route_template
+
+
+def test_route_template_buckets_ids():
+    assert route_template("/v2/pet/123") == "/v2/pet/{id}"
+    assert route_template("/pets/9f1c2e4a-1b2c-4d5e-8f90-123456789abc/photos") == "/pets/{id}/photos"
+    assert route_template("/v2/pet/findByStatus") == "/v2/pet/findByStatus"
+
+
+def test_summary_per_endpoint_and_bounded_trace(tmp_path):
+    recorder = RequestRecorder(capacity=3)
+    for pet_id, status, duration in [(1, 200, 0.01), (2, 200, 0.03), (3, 404, 0.02), (4, 200, 0.5)]:
+        recorder.record("GET", f"http://svc/v2/pet/{pet_id}", status, duration, 0, 100)
+    recorder.record("POST", "http://svc/v2/pet", 200, 0.1, 50, 120)
+
+    rows = {(row["method"], row["route"]): row for row in recorder.summary()}
+    get = rows[("GET", "/v2/pet/{id}")]
+    assert (get["count"], get["errors"], get["max"]) == (4, 1, 0.5)
+    assert get["p50"] == pytest.approx(0.02, rel=0.02)
+    assert get["total"] == pytest.approx(0.56)
+    assert rows[("POST", "/v2/pet")]["count"] == 1
+
+    path = tmp_path / "trace.jsonl"
+    recorder.write_trace(str(path))
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["route"] for line in lines] == ["/v2/pet/{id}", "/v2/pet/{id}", "/v2/pet"]
+
+
+def test_summary_table_lines():
+    recorder = RequestRecorder()
+    assert recorder.summary_table() == []
+    recorder.record("GET", "http://svc/v2/pet/1", 200, 0.25, 0, 100)
+    header, row = recorder.summary_table()
+    assert header.startswith("endpoint") and "p95, ms" in header
+    assert row.split() == ["GET", "/v2/pet/{id}", "1", "0", "0.25", "250.0", "250.0", "250.0"]
+
+
+def test_endpoint_latency_memory_does_not_grow_with_requests():
+    recorder = RequestRecorder(capacity=10)
+    for i in range(100_000):
+        recorder.record("GET", f"http://svc/v2/pet/{i}", 200, 0.01 + (i % 1000) / 10_000, 0, 100)
+
+    (row,) = recorder.summary()
+    assert row["count"] == 100_000
+    assert row["p95"] == pytest.approx(0.105, rel=0.02)
+    # a few hundred buckets, not one float per request
+    assert len(recorder._latencies[("GET", "/v2/pet/{id}")].counts) < 1000
@@ -0,0 +1,59 @@
+from helpers.pagination_checker import IdBitmap, PaginationChecker, check_statuses
+
+
+def cursor_api(ids, limit, skip_next=False):
+    """GET /pets semantics over a sorted id list: items with id > cursor, next = last id of a full page"""
+    def fetch(cursor):
+        page = [i for i in ids if cursor is None or i > cursor][:limit]
+        next_cursor = page[-1] if len(page) == limit and not skip_next else None
+        return page, next_cursor
+    return fetch
+
+
+def test_bitmap_switches_to_dense_chunks_and_keeps_membership():
+    ids = list(range(0, 200_000, 3)) + [5, 2 ** 40]
+    bitmap = IdBitmap(ids)
+
+    assert len(bitmap) == len(set(ids))
+    assert 2 ** 40 in bitmap and 3 in bitmap and 4 not in bitmap
+    assert not bitmap.add(6)
+    assert list(bitmap) == sorted(set(ids))
+    assert list(IdBitmap([1, 2, 3, 70_000]).difference(IdBitmap([2, 70_000]))) == [1, 3]
+
+
+def test_consistent_listing_passes_with_expected_ids():
+    ids = list(range(1, 1001))
+
+    report = PaginationChecker(cursor_api(ids, 100), limit=100).crawl(expected=ids)
+
+    report.assert_ok()
+    assert report.items == 1000
+    assert report.pages == 11  # the 10th page is full, so one more (empty) page
+
+
+def test_duplicates_order_and_gaps_are_reported():
+    pages = {None: ([1, 2, 3], 3), 3: ([3, 5, 4], 4), 4: ([6], None)}
+
+    report = PaginationChecker(lambda cursor: pages[cursor], limit=3).crawl(expected=range(1, 8))
+
+    assert report.duplicates == [3]
+    assert report.out_of_order == [(3, 3), (5, 4)]
+    assert report.missing == [7]
+    assert report.bad_next == []
+    assert not report.ok
+
+
+def test_missing_next_on_full_page_is_reported():
+    report = PaginationChecker(cursor_api(list(range(1, 11)), 5, skip_next=True), limit=5).crawl()
+
+    assert report.bad_next == ["page after cursor None: full page without next"]
+
+
+def test_statuses_are_crawled_in_parallel_and_cross_listed_ids_reported():
+    listings = {"available": [1, 2, 3], "pending": [4, 5], "sold": [5, 6]}
+
+    reports = check_statuses(lambda status: PaginationChecker(cursor_api(listings[status], 2), limit=2),
+                             listings, expected_for=lambda status: listings[status])
+
+    assert all(report.items == len(listings[status]) for status, report in reports.items())
+    assert sum(len(report.duplicates) for report in reports.values()) == 1
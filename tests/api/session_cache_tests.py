@@ -0,0 +1,86 @@
+from requests import Response
+from requests.adapters import BaseAdapter
+
+from core.api.data_models import User
+from core.api.session_cache import SessionCache
+
+LOGIN_URL = "http://localhost/login"
+
+
+def test_same_user_reuses_session_and_token():
+    logins = []
+    cache = SessionCache(ttl=60, token_file=None)
+
+    def login(user):
+        logins.append(user.username)
+        return f"token-{len(logins)}"
+
+    first = cache.session(LOGIN_URL, User(username="a", password="a"), login)
+    second = cache.session(LOGIN_URL, User(username="a", password="a"), login)
+    other = cache.session(LOGIN_URL, User(username="b", password="b"), login)
+
+    assert first is second
+    assert other is not first
+    assert logins == ["a", "b"]
+    assert first.headers["Authorization"] == "Bearer token-1"
+
+
+def test_token_is_shared_between_processes_through_file(tmp_path):
+    token_file = str(tmp_path / "tokens.json")
+    logins = []
+
+    def login(user):
+        logins.append(user.username)
+        return "shared-token"
+
+    user = User(username="a", password="a")
+    SessionCache(ttl=60, token_file=token_file).session(LOGIN_URL, user, login)
+    session = SessionCache(ttl=60, token_file=token_file).session(LOGIN_URL, user, login)
+
+    assert logins == ["a"]
+    assert session.headers["Authorization"] == "Bearer shared-token"
+
+
+class TokenCheckingService(BaseAdapter):
+    """401 unless the request carries the current token"""
+
+    def __init__(self):
+        super().__init__()
+        self.token = None
+        self.sent_headers = []
+
+    def send(self, request, **kwargs):
+        self.sent_headers.append(dict(request.headers))
+        response = Response()
+        response.status_code = 200 if request.headers.get("Authorization") == f"Bearer {self.token}" else 401
+        response._content = b"{}"
+        response.request = request
+        response.url = request.url
+        return response
+
+    def close(self):
+        pass
+
+
+def test_401_logs_in_again_and_replays_once_without_extra_headers():
+    service = TokenCheckingService()
+    logins = []
+
+    def login(user):
+        logins.append(user.username)
+        return f"token-{len(logins)}"
+
+    cache = SessionCache(ttl=60, token_file=None)
+    session = cache.session(LOGIN_URL, User(username="a", password="a"), login)
+    session.mount("http://", service)
+    service.token = "token-2"  # the cached token-1 was revoked
+
+    assert session.get("http://svc/pets").status_code == 200
+    assert logins == ["a", "a"]
+    assert [headers["Authorization"] for headers in service.sent_headers] == ["Bearer token-1", "Bearer token-2"]
+    assert not any("X-Auth-Retry" in headers for headers in service.sent_headers)
+
+    # a replay that is refused again is not retried in a loop
+    service.token = "other"
+    assert session.get("http://svc/pets").status_code == 401
+    assert len(service.sent_headers) == 4
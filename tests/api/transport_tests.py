@@ -0,0 +1,128 @@
+import pytest
+from requests import Response, Session
+from requests.adapters import HTTPAdapter
+from requests.exceptions import InvalidHeader
+
+from core.api.transport import (CircuitBreaker, CircuitOpenError, ResilientAdapter, RetryBudget, TransportMetrics,
+                                TransportPolicy, _parse_retry_after)
+
+FAST = TransportPolicy(backoff_base=0.001, backoff_max=0.001, retries=3, breaker_threshold=100)
+
+
+def scripted(monkeypatch, statuses, headers=None):
+    """HTTPAdapter.send answering with the given statuses in order"""
+    calls = []
+
+    def send(self, request, **kwargs):
+        calls.append(kwargs["timeout"])
+        response = Response()
+        response.status_code = statuses[len(calls) - 1]
+        response.headers.update(headers or {})
+        response.request = request
+        response.url = request.url
+        response._content = b"{}"
+        response._content_consumed = True
+        return response
+
+    monkeypatch.setattr(HTTPAdapter, "send", send)
+    return calls
+
+
+def session_with(policy, metrics):
+    session = Session()
+    session.mount("http://", ResilientAdapter(policy, metrics))
+    return session
+
+
+def test_idempotent_request_is_retried_until_success(monkeypatch):
+    calls = scripted(monkeypatch, [503, 502, 200])
+    metrics = TransportMetrics()
+
+    response = session_with(FAST, metrics).get("http://svc/pets")
+
+    assert response.status_code == 200
+    assert calls == [(FAST.connect_timeout, FAST.read_timeout)] * 3
+    assert metrics.as_dict()["svc"]["retries"] == 2
+
+
+def test_post_without_idempotency_key_is_not_retried(monkeypatch):
+    scripted(monkeypatch, [503, 200])
+
+    assert session_with(FAST, TransportMetrics()).post("http://svc/pets", json={}).status_code == 503
+
+
+def test_retry_budget_limits_retries(monkeypatch):
+    scripted(monkeypatch, [503] * 10)
+    policy = TransportPolicy(backoff_base=0.001, retries=5, budget_ratio=0.0, budget_min=2, breaker_threshold=100)
+    metrics = TransportMetrics()
+
+    assert session_with(policy, metrics).get("http://svc/pets").status_code == 503
+    assert metrics.as_dict()["svc"]["attempts"] == 3
+    assert metrics.as_dict()["svc"]["budget_exhausted"] == 1
+
+
+def test_breaker_opens_and_lets_one_trial_through():
+    now = [0.0]
+    breaker = CircuitBreaker(threshold=2, reset_timeout=10, clock=lambda: now[0])
+    breaker.record(success=False)
+    breaker.record(success=False)
+
+    assert breaker.state == "open" and not breaker.allow()
+    now[0] = 11
+    assert breaker.allow() and not breaker.allow()
+    breaker.record(success=True)
+    assert breaker.state == "closed"
+
+
+def test_open_breaker_fails_fast(monkeypatch):
+    scripted(monkeypatch, [503] * 10)
+    policy = TransportPolicy(retries=0, breaker_threshold=1)
+    session = session_with(policy, TransportMetrics())
+    session.get("http://svc/pets")
+
+    with pytest.raises(CircuitOpenError):
+        session.get("http://svc/pets")
+
+
+def test_expected_server_errors_do_not_open_the_breaker(monkeypatch):
+    scripted(monkeypatch, [500] * 10)
+    session = session_with(TransportPolicy(retries=0, breaker_threshold=1), TransportMetrics())
+
+    assert [session.get("http://svc/pets").status_code for _ in range(3)] == [500] * 3
+
+
+def test_exception_during_trial_releases_the_breaker(monkeypatch):
+    now = [0.0]
+    policy = TransportPolicy(retries=0, breaker_threshold=1, breaker_reset=10)
+    adapter = ResilientAdapter(policy, TransportMetrics())
+    session = Session()
+    session.mount("http://", adapter)
+    breaker = adapter.resilience.breaker("svc")
+    breaker.clock = lambda: now[0]
+    scripted(monkeypatch, [503])
+    session.get("http://svc/pets")
+    assert breaker.state == "open"
+
+    def broken(self, request, **kwargs):
+        raise InvalidHeader("bad header")
+
+    monkeypatch.setattr(HTTPAdapter, "send", broken)
+    now[0] = 11
+    with pytest.raises(InvalidHeader):
+        session.get("http://svc/pets")
+
+    # the trial is over, the next request is the new trial instead of CircuitOpenError forever
+    scripted(monkeypatch, [200])
+    assert session.get("http://svc/pets").status_code == 200
+    assert breaker.state == "closed"
+
+
+def test_retry_after_and_budget_helpers():
+    assert _parse_retry_after("2") == 2.0
+    assert _parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert TransportPolicy(max_retry_after=1).delay(0, "120") == 1
+    budget = RetryBudget(ratio=0.5, minimum=1)
+    assert budget.withdraw() and not budget.withdraw()
+    budget.deposit()
+    budget.deposit()
+    assert budget.withdraw()
@@ -0,0 +1,43 @@
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from core.api.data_models import Pet, PetStatus
+from core.api.validation import adapter, lazy, validate
+
+PETS = [{"id": i, "name": f"kitty_{i}", "photoUrls": [], "status": "available"} for i in range(1000)]
+
+
+def test_list_is_validated_in_one_call_with_a_cached_adapter():
+    pets = validate(json.dumps(PETS).encode(), list[Pet])
+
+    assert len(pets) == 1000
+    assert pets[-1].status is PetStatus.available
+    assert adapter(list[Pet]) is adapter(list[Pet])
+
+
+def test_model_errors_point_at_the_item():
+    broken = PETS[:2] + [{"id": -1, "name": "x", "photoUrls": []}]
+
+    with pytest.raises(ValidationError) as error:
+        validate(json.dumps(broken), list[Pet])
+
+    assert error.value.errors()[0]["loc"] == (2, "id")
+
+
+def test_lazy_validates_only_the_fields_read():
+    pet = lazy(json.dumps({"id": 1, "name": "kitty", "photoUrls": "not a list"}), Pet)
+
+    assert pet.name == "kitty"
+    assert pet.status is None
+    with pytest.raises(ValidationError):
+        pet.photoUrls
+
+
+def test_lazy_list_and_missing_required_field():
+    pets = lazy(json.dumps([{"id": 1, "photoUrls": []}]), Pet)
+
+    assert pets[0].id == 1
+    with pytest.raises(ValidationError):
+        pets[0].name
@@ -0,0 +1,21 @@
+import os
+
+import pytest
+
+from core.config import Config
+
+
+@pytest.fixture(scope="session", autouse=True)
+def stand_in():
+    # STAND_IN=true (pytest -o env_files=.env.offline): api, pet store and demoqa pages are served locally.
+    # Read here, not from Config: --envfile is applied at session start, after this module imported Config
+    if os.getenv("STAND_IN", str(Config.STAND_IN)).lower() != "true":
+        yield None
+        return
+    from stand_in.server import StandInServer
+
+    server = StandInServer(port=int(os.getenv("STAND_IN_PORT", Config.STAND_IN_PORT))).start()
+    server.point_config()
+    yield server
+
+    server.stop()
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from examples.dedup_engine import dedup_file, dedup_stream
+from examples.examples import dedup
+
+EVENTS = [
+    {"key": "a", "ts": 1.0, "value": 0},
+    {"key": "b", "ts": 5.0, "value": 1},
+    {"key": "a", "ts": 3.0, "value": 2},
+    # ties: the first event with the latest ts wins
+    {"key": "b", "ts": 5.0, "value": 3},
+    {"key": "a", "ts": 3.0, "value": 4},
+    {"key": "c", "ts": 2.0, "value": 5},
+    {"key": "a", "ts": 2.0, "value": 6},
+]
+
+CASES = {
+    "ties": EVENTS,
+    "empty": [],
+    "single_key": [{"key": "a", "ts": ts, "value": i} for i, ts in enumerate([4.0, 9.0, 1.0, 9.0, 7.0])],
+}
+
+
+def winners(events):
+    return sorted((event["key"], event["ts"], event["value"]) for event in events)
+
+
+def write_ndjson(tmp_path, events):
+    path = tmp_path / "events.ndjson"
+    path.write_text("".join(json.dumps(event) + "\n" for event in events))
+    return str(path)
+
+
+@pytest.mark.parametrize("events", CASES.values(), ids=CASES.keys())
+def test_stream_matches_examples_dedup(events):
+    assert winners(dedup_stream(events)) == winners(dedup(events))
+
+
+@pytest.mark.parametrize("events", CASES.values(), ids=CASES.keys())
+@pytest.mark.parametrize("backend", ["array", "numpy"])
+def test_file_backends_match_examples_dedup(tmp_path, events, backend):
+    if backend == "numpy":
+        pytest.importorskip("numpy")
+    path = write_ndjson(tmp_path, events)
+
+    assert winners(dedup_file(path, backend=backend)) == winners(dedup(events))
+
+
+def test_numpy_backend_reduces_across_chunks(tmp_path):
+    pytest.importorskip("numpy")
+    from examples.dedup_engine import NumpyLatestTs, read_ndjson
+
+    events = [{"key": f"k{i % 7}", "ts": float(i % 5), "value": i} for i in range(100)]
+    state = NumpyLatestTs(chunk_size=8)
+    for row, event in enumerate(read_ndjson(write_ndjson(tmp_path, events))):
+        state.add(event["key"], event["ts"], row)
+
+    expected = sorted(event["value"] for event in dedup(events))
+    assert list(state.winning_rows()) == expected
@@ -1,9 +1,5 @@
-import os
+from core.api.users import Users
 
-from core.api.data_models import User
 
-
-class TestUsers:
-    BASIC_USER = User(username=os.getenv("BASIC_USER_NAME"), password=os.getenv("BASIC_USER_PASSWORD"))
-
-    FASTAPI_USER = User(username="test", password="test")
+class TestUsers(Users):
+    """The accounts live in core.api.users, so non-test code (load_runner...) doesn't import tests"""
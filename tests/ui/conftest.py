@@ -1,26 +1,67 @@
 import logging
 
 import pytest
-from selenium import webdriver
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service as ChromeService
+from selenium.webdriver.support.event_firing_webdriver import EventFiringWebDriver
 
 from core.config import Config
+from ui.driver_pool import DriverPool, chrome_factory
+from ui.resource_policy import ResourceListener, ResourcePolicy, ResourceStats, report
 
 logger = logging.Logger(__name__)
 
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "block_resources(*categories, urls=()): extra resources blocked for the test")
+
+
+@pytest.fixture(scope="session")
+def resource_policy():
+    return ResourcePolicy.from_config(Config.UI_BLOCK_CATEGORIES, Config.UI_BLOCK_URLS, Config.UI_BROWSER_CACHE)
+
+
+@pytest.fixture(scope="session")
+def resource_stats():
+    stats = ResourceStats()
+    yield stats
+
+    report(stats, Config.UI_RESOURCE_REPORT, logging.getLogger("ui.resources"))
+
+
+def measure_resources() -> bool:
+    # page metrics and Chrome's performance log only when a resource report is asked for
+    return bool(Config.UI_RESOURCE_REPORT) or Config.UI_MEASURE_SAVINGS
+
+
 @pytest.fixture(scope="session")
-def driver():
-    options = webdriver.ChromeOptions()
-    caps = options.to_capabilities()
-    caps["pageLoadStrategy"] = "eager"
-
-    driver = webdriver.Chrome(service=ChromeService(ChromeDriverManager().install()), options=options)
-    driver.set_page_load_timeout(time_to_wait=10)
-    driver.maximize_window()
-    logger.info(f"Opening {Config.BASE_QA_DEMO_URL} page")
-    driver.get(Config.BASE_QA_DEMO_URL)
+def driver_pool(resource_policy):
+    # browsers are launched ahead of time and reused between tests (reset, not relaunched)
+    pool = DriverPool(factory=chrome_factory(headless=Config.UI_HEADLESS, policy=resource_policy,
+                                             performance_log=measure_resources()),
+                      size=Config.UI_POOL_SIZE,
+                      max_uses=Config.UI_DRIVER_MAX_USES).start()
+    yield pool
+
+    pool.close()
+
+
+@pytest.fixture
+def driver(request, driver_pool, resource_policy, resource_stats):
+    # leased per test and starts on about:blank, tests open their own pages
+    raw_driver = driver_pool.acquire()
+    policy = resource_policy
+    marker = request.node.get_closest_marker("block_resources")
+    if marker:
+        policy = ResourcePolicy(categories=resource_policy.categories + list(marker.args),
+                                extra_patterns=resource_policy.extra_patterns + list(marker.kwargs.get("urls", ())),
+                                cache_enabled=resource_policy.cache_enabled)
+        policy.apply(raw_driver)
     # add cookies, loca storage elems, headers
-    yield driver
+    if measure_resources():
+        yield EventFiringWebDriver(raw_driver, ResourceListener(policy, resource_stats, Config.UI_MEASURE_SAVINGS))
+    else:
+        yield raw_driver
+
+    if marker:
+        resource_policy.apply(raw_driver)
+    driver_pool.release(raw_driver)
 
-    driver.quit()
\ No newline at end of file
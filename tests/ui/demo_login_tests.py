@@ -0,0 +1,20 @@
+import pytest
+
+from core.config import Config
+from helpers.wd_assertions import wait_until_text
+from ui.demo_pages import LoginPage, ProfilePage
+from tests.test_users import TestUsers
+
+
+@pytest.fixture
+def login_page(driver):
+    return LoginPage(driver, Config.BASE_QA_DEMO_URL)
+
+
+def test_sign_in_via_api_opens_the_profile(login_page):
+    user = TestUsers.BASIC_USER
+
+    # no login form: the Book Store token goes straight into the browser cookies
+    login_page.sign_in_via_api(user)
+
+    wait_until_text(login_page.driver, ProfilePage.USER_NAME_VALUE, user.username)
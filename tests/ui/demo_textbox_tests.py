@@ -1,11 +1,7 @@
 import pytest
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.wait import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-
 
 from core.config import Config
-from helpers.wd_assertions import wait_until_text
+from ui.demo_pages import TextBoxPage
 
 """
 actions:
@@ -17,21 +13,20 @@ check it is filled
 """
 
 
-@pytest.fixture(autouse=True)
-def setup(driver):
-    driver.get(f"{Config.BASE_QA_DEMO_URL}/text-box")
+@pytest.fixture
+def text_box_page(driver):
+    return TextBoxPage(driver, Config.BASE_QA_DEMO_URL).open()
 
 
-def test_fill_form_correctly(driver):
+def test_fill_form_correctly(text_box_page):
     expected_name = "User name"
     expected_email = "testuser@gmailtest.com"
     expected_address = "Bcn city"
 
-    driver.find_element(By.ID, "userName").send_keys(expected_name)
-    driver.find_element(By.ID, "userEmail").send_keys(expected_email)
-    driver.find_element(By.ID, "currentAddress").send_keys(expected_address)
-    driver.find_element(By.CSS_SELECTOR, "#userForm #submit").click()
+    # form is filled and submitted in one round trip, output is read in another once every field is shown
+    output = text_box_page.submit_form(expected_name, expected_email, expected_address).read_output()
 
-    wait_until_text(driver, (By.CSS_SELECTOR, "#output #name"), expected_name)
-    wait_until_text(driver, (By.CSS_SELECTOR, "#output #email"), expected_email)
-    wait_until_text(driver, (By.CSS_SELECTOR, "#output #currentAddress"), "tataaaaaa")
\ No newline at end of file
+    assert expected_name in output["name"], f"Expected text: '{expected_name}'. Actual text: {output['name']}"
+    assert expected_email in output["email"], f"Expected text: '{expected_email}'. Actual text: {output['email']}"
+    assert "tataaaaaa" in output["current_address"], \
+        f"Expected text: 'tataaaaaa'. Actual text: {output['current_address']}"
@@ -0,0 +1,79 @@
+import os
+
+import pytest
+
+from ui import driver_cache
+from ui.driver_cache import LATEST, DriverCache
+
+
+@pytest.fixture
+def browser(tmp_path, monkeypatch):
+    """A fake Chrome binary; version detection is counted and answers `version`"""
+    binary = tmp_path / "chrome"
+    binary.write_bytes(b"chrome 120")
+    state = {"binary": str(binary), "version": "120.0", "detections": 0}
+
+    def detect():
+        state["detections"] += 1
+        return f"chrome-{state['version']}" if state["version"] else None
+
+    monkeypatch.setattr(driver_cache, "_chrome_binary", lambda: state["binary"])
+    monkeypatch.setattr(driver_cache, "_chrome_key", detect)
+    return state
+
+
+@pytest.fixture
+def downloads(tmp_path, monkeypatch):
+    """ChromeDriverManager().install() writes a new driver file per call"""
+    installed = []
+
+    class FakeManager:
+        def install(self):
+            path = tmp_path / f"download-{len(installed)}" / "chromedriver"
+            path.parent.mkdir()
+            path.write_bytes(b"driver for " + str(len(installed)).encode())
+            path.chmod(0o755)
+            installed.append(str(path))
+            return str(path)
+
+    monkeypatch.setattr(driver_cache, "ChromeDriverManager", FakeManager)
+    return installed
+
+
+def test_driver_is_resolved_once_per_browser_version(tmp_path, browser, downloads):
+    root = str(tmp_path / "cache")
+
+    first = DriverCache(root).chromedriver()
+    second = DriverCache(root).chromedriver()
+
+    assert first == second
+    assert len(downloads) == 1
+    assert first.startswith(os.path.join(root, "blobs")) and os.access(first, os.X_OK)
+
+
+def test_browser_version_is_detected_once_per_binary(tmp_path, browser, downloads):
+    root = str(tmp_path / "cache")
+    DriverCache(root).chromedriver()
+    DriverCache(root).chromedriver()
+    assert browser["detections"] == 1
+
+    # browser update: new binary content, new version, one new detection and driver
+    with open(browser["binary"], "wb") as f:
+        f.write(b"chrome 121, bigger")
+    browser["version"] = "121.0"
+
+    assert DriverCache(root).chrome_key() == "chrome-121.0"
+    DriverCache(root).chromedriver()
+    assert browser["detections"] == 2
+    assert len(downloads) == 2
+
+
+def test_last_driver_is_used_when_the_version_is_unknown(tmp_path, browser, downloads):
+    root = str(tmp_path / "cache")
+    resolved = DriverCache(root).chromedriver()
+    browser["binary"] = None
+    browser["version"] = None
+
+    assert DriverCache(root).chromedriver() == resolved
+    assert driver_cache._read_json(os.path.join(root, "index.json"))[LATEST] == resolved
+    assert len(downloads) == 1
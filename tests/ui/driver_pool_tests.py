@@ -0,0 +1,123 @@
+import threading
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from ui.driver_pool import DriverPool, DriverPoolError
+
+
+class FakeDriver:
+
+    def __init__(self, healthy=True):
+        self.healthy = healthy
+        self.quit_calls = 0
+        self.pages = []
+
+    def execute_script(self, script, *args):
+        if not self.healthy:
+            raise WebDriverException("browser is gone")
+        return 1
+
+    def execute_cdp_cmd(self, cmd, params):
+        return {}
+
+    def delete_all_cookies(self):
+        pass
+
+    def get(self, url):
+        self.pages.append(url)
+
+    def quit(self):
+        self.quit_calls += 1
+
+
+class Factory:
+    """Launches FakeDrivers, or raises the queued errors first"""
+
+    def __init__(self, errors=()):
+        self.errors = list(errors)
+        self.launched = []
+
+    def __call__(self):
+        if self.errors:
+            raise self.errors.pop(0)
+        driver = FakeDriver()
+        self.launched.append(driver)
+        return driver
+
+
+@pytest.fixture
+def pool_for():
+    pools = []
+
+    def create(factory, **kwargs):
+        pools.append(DriverPool(factory, **kwargs).start())
+        return pools[-1]
+    yield create
+
+    for pool in pools:
+        pool.close()
+
+
+def test_released_browser_is_reset_and_reused(pool_for):
+    factory = Factory()
+    pool = pool_for(factory, size=1)
+
+    driver = pool.acquire(timeout=5)
+    pool.release(driver)
+
+    assert pool.acquire(timeout=5) is driver
+    assert driver.pages == ["about:blank"]
+    assert len(factory.launched) == 1
+
+
+def test_browser_is_recycled_after_max_uses(pool_for):
+    factory = Factory()
+    pool = pool_for(factory, size=1, max_uses=1)
+
+    first = pool.acquire(timeout=5)
+    pool.release(first)
+
+    assert pool.acquire(timeout=5) is not first
+    assert first.quit_calls == 1
+
+
+def test_unhealthy_browser_is_replaced(pool_for):
+    factory = Factory()
+    pool = pool_for(factory, size=1)
+    driver = pool.acquire(timeout=5)
+    pool.release(driver)
+    driver.healthy = False
+
+    assert pool.acquire(timeout=5) is factory.launched[1]
+
+
+def test_launch_failure_is_raised_and_the_slot_relaunched(pool_for):
+    factory = Factory(errors=[FileNotFoundError("chromedriver")])
+    pool = pool_for(factory, size=1)
+
+    with pytest.raises(DriverPoolError, match="chromedriver") as error:
+        pool.acquire(timeout=5)
+    assert isinstance(error.value.__cause__, FileNotFoundError)
+
+    assert pool.acquire(timeout=5) is factory.launched[0]
+
+
+def test_timeout_names_the_last_launch_failure(pool_for):
+    started = threading.Event()
+    factory = Factory(errors=[WebDriverException("no chrome")])
+
+    def slow_relaunch():
+        if not factory.errors:
+            started.wait(5)
+        return factory()
+
+    pool = pool_for(slow_relaunch, size=1)
+    with pytest.raises(DriverPoolError):
+        pool.acquire(timeout=5)
+
+    try:
+        with pytest.raises(DriverPoolError, match="within 0.1s, last launch failed: .*no chrome"):
+            pool.acquire(timeout=0.1)
+    finally:
+        started.set()
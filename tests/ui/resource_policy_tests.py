@@ -0,0 +1,46 @@
+from ui.resource_policy import ResourceListener, ResourcePolicy, ResourceStats
+
+
+class MeteredDriver:
+    """Page loads cost less with URLs blocked and nothing with a warm cache"""
+
+    def __init__(self):
+        self.commands = []
+        self.blocked = False
+        self.warm = False
+        self.last_load = None
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.commands.append(cmd)
+        if cmd == "Network.setBlockedURLs":
+            self.blocked = bool(params["urls"])
+        if cmd == "Network.clearBrowserCache":
+            self.warm = False
+        return {}
+
+    def get(self, url):
+        self.commands.append("get")
+        transferred = 0 if self.warm else (1000 if self.blocked else 5000)
+        self.last_load = {"load_ms": transferred / 10, "bytes": transferred}
+        self.warm = True
+
+    def execute_script(self, script, *args):
+        return self.last_load
+
+    def get_log(self, kind):
+        return []
+
+
+def test_savings_compare_two_cold_loads():
+    driver = MeteredDriver()
+    policy = ResourcePolicy(categories=["ads"])
+    stats = ResourceStats()
+
+    ResourceListener(policy, stats, measure_savings=True).after_navigate_to("https://demoqa.com/books", driver)
+
+    assert [cmd for cmd in driver.commands if cmd in ("Network.clearBrowserCache", "get")] == \
+        ["Network.clearBrowserCache", "get", "Network.clearBrowserCache", "get"]
+    summary = stats.summary()["https://demoqa.com/books"]
+    assert summary["saved_bytes"] == 4000
+    assert summary["saved_ms"] == 400.0
+    assert driver.blocked
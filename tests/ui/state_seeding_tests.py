@@ -0,0 +1,128 @@
+import json
+from datetime import datetime, timezone
+
+import pytest
+from requests import Response, Session
+from requests.adapters import BaseAdapter
+from selenium.common.exceptions import WebDriverException
+
+from core.api.data_models import User
+from ui import state_seeding
+from ui.state_seeding import StateSeeder, StorageState, demoqa_state
+
+STATE = StorageState(origin="https://demoqa.com",
+                     cookies=[{"name": "token", "value": "abc", "path": "/"}],
+                     local_storage={"access_token": "abc"})
+
+
+class FakeDriver:
+    """Records what a test would do to the browser; cdp=False behaves like a remote / non-Chrome driver"""
+
+    def __init__(self, cdp=True):
+        self.cdp = cdp
+        self.calls = []
+
+    def execute_cdp_cmd(self, cmd, params):
+        if not self.cdp:
+            raise WebDriverException("CDP is not available")
+        self.calls.append((cmd, params))
+        return {"identifier": "1"} if cmd == "Page.addScriptToEvaluateOnNewDocument" else {}
+
+    def get(self, url):
+        self.calls.append(("get", url))
+
+    def add_cookie(self, cookie):
+        self.calls.append(("add_cookie", cookie))
+
+    def execute_script(self, script, *args):
+        self.calls.append(("execute_script", args))
+
+
+def test_cdp_seeding_sets_cookies_and_storage_before_the_only_page_load():
+    driver = FakeDriver()
+
+    StateSeeder().seed(driver, STATE, "https://demoqa.com/profile")
+
+    commands = [name for name, _ in driver.calls]
+    assert commands == ["Network.enable", "Network.setCookies", "Page.addScriptToEvaluateOnNewDocument", "get",
+                        "Page.removeScriptToEvaluateOnNewDocument"]
+    params = dict(driver.calls)
+    assert params["Network.setCookies"]["cookies"] == [{"url": "https://demoqa.com", "name": "token",
+                                                        "value": "abc", "path": "/"}]
+    source = params["Page.addScriptToEvaluateOnNewDocument"]["source"]
+    assert json.dumps("https://demoqa.com") in source and json.dumps({"access_token": "abc"}) in source
+    assert params["get"] == "https://demoqa.com/profile"
+
+
+def test_without_cdp_state_is_set_on_the_origin_first():
+    driver = FakeDriver(cdp=False)
+
+    StateSeeder().seed(driver, STATE, "https://demoqa.com/profile")
+
+    assert driver.calls == [("get", "https://demoqa.com"),
+                            ("add_cookie", {"name": "token", "value": "abc", "path": "/"}),
+                            ("execute_script", ({"access_token": "abc"},)),
+                            ("get", "https://demoqa.com/profile")]
+
+
+def test_state_is_built_once_per_origin_and_user_until_it_expires(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("ui.state_seeding.time.time", lambda: now[0])
+    builds = []
+
+    def build(user):
+        builds.append(user.username)
+        return StorageState(origin="https://demoqa.com", expires_at=now[0] + 60)
+
+    seeder = StateSeeder()
+    user = User(username="a", password="a")
+    first = seeder.state("https://demoqa.com/login", user, build)
+
+    assert seeder.state("https://demoqa.com/profile", user, build) is first
+    seeder.state("https://demoqa.com/profile", User(username="b", password="b"), build)
+    now[0] += 61
+    seeder.state("https://demoqa.com/profile", user, build)
+    assert builds == ["a", "b", "a"]
+
+
+@pytest.mark.parametrize("driver", [FakeDriver(), FakeDriver(cdp=False)], ids=["cdp", "page"])
+def test_open_seeds_the_cached_state(driver):
+    StateSeeder().open(driver, "https://demoqa.com/profile", User(username="a", password="a"), lambda user: STATE)
+
+    assert ("get", "https://demoqa.com/profile") in driver.calls
+
+
+class FakeBookStore(BaseAdapter):
+    """Account/v1/Login of demoqa, remembers the timeout it was called with"""
+
+    def __init__(self):
+        super().__init__()
+        self.timeouts = []
+
+    def send(self, request, timeout=None, **kwargs):
+        self.timeouts.append(timeout)
+        body = json.loads(request.body)
+        response = Response()
+        response.status_code = 200
+        response._content = json.dumps({"userId": "42", "username": body["userName"], "token": "abc",
+                                        "expires": "2030-01-02T03:04:05.000Z"}).encode()
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def test_demoqa_state_logs_in_through_the_client_session(monkeypatch):
+    book_store = FakeBookStore()
+    session = Session()
+    session.mount("https://", book_store)
+    monkeypatch.setattr(state_seeding, "_LOGIN", session)
+
+    state = demoqa_state(User(username="a", password="a"), "https://demoqa.com")
+
+    assert book_store.timeouts and book_store.timeouts[0] is not None
+    assert {cookie["name"]: cookie["value"] for cookie in state.cookies} == \
+        {"userID": "42", "userName": "a", "token": "abc", "expires": "2030-01-02T03:04:05.000Z"}
+    assert state.expires_at == datetime(2030, 1, 2, 3, 4, 5, tzinfo=timezone.utc).timestamp()
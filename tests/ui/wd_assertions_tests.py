@@ -0,0 +1,64 @@
+import pytest
+from selenium.common.exceptions import InvalidSessionIdException, JavascriptException, TimeoutException
+
+from helpers import wd_assertions
+from helpers.wd_assertions import wait_until, wait_until_text
+
+
+class NavigatingDriver:
+    """The async script is cut off by a navigation, execute_script answers the queued [ok, actual] results"""
+
+    def __init__(self, results):
+        self.results = list(results)
+        self.async_calls = 0
+        self.polls = 0
+
+    def execute_async_script(self, script, *args):
+        self.async_calls += 1
+        raise JavascriptException("javascript error: document unloaded while waiting for result")
+
+    def execute_script(self, script, *args):
+        self.polls += 1
+        return self.results.pop(0) if len(self.results) > 1 else self.results[0]
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(wd_assertions.time, "sleep", recorded.append)
+    return recorded
+
+
+def test_fallback_polls_with_growing_intervals(sleeps):
+    driver = NavigatingDriver([[False, ""]] * 7 + [[True, "Mary"]])
+
+    assert wait_until(driver, "text_contains", ("id", "name"), "Mary", timeout=60) == "Mary"
+    assert driver.async_calls == 1
+    assert driver.polls == 8
+    assert sleeps == [0.01, 0.02, 0.05, 0.1, 0.2, 0.25, 0.25, 0.25]
+
+
+def test_fallback_times_out_with_the_last_actual_value(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(wd_assertions.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(wd_assertions.time, "sleep", lambda seconds: now.__setitem__(0, now[0] + seconds))
+    driver = NavigatingDriver([[False, "Jane"]])
+
+    with pytest.raises(TimeoutException, match="Expected text: 'Mary'.*Actual: Jane"):
+        wait_until_text(driver, ("id", "name"), "Mary", timeout=1)
+    assert now[0] == pytest.approx(1.0)
+
+
+@pytest.mark.parametrize("error", [JavascriptException("javascript error: Unsupported locator strategy: foo"),
+                                   InvalidSessionIdException("invalid session id")])
+def test_other_driver_errors_are_raised_at_once(sleeps, error):
+    class BrokenDriver(NavigatingDriver):
+        def execute_async_script(self, script, *args):
+            self.async_calls += 1
+            raise error
+
+    driver = BrokenDriver([[True, "Mary"]])
+
+    with pytest.raises(type(error)):
+        wait_until(driver, "text_contains", ("foo", "name"), "Mary", timeout=60)
+    assert (driver.async_calls, driver.polls, sleeps) == (1, 0, [])
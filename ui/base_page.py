@@ -0,0 +1,85 @@
+from typing import Dict, Optional, Tuple
+
+from selenium.common.exceptions import NoSuchElementException
+
+Locator = Tuple[str, str]
+
+# Поиск элемента по селениумовскому локатору (By.*) внутри страницы
+FIND_ELEMENT_JS = """
+function find(by, value) {
+    switch (by) {
+        case "id": return document.getElementById(value);
+        case "css selector": return document.querySelector(value);
+        case "name": return document.getElementsByName(value)[0] || null;
+        case "class name": return document.getElementsByClassName(value)[0] || null;
+        case "tag name": return document.getElementsByTagName(value)[0] || null;
+        case "xpath": return document.evaluate(value, document, null,
+                                               XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        case "link text": return links().find(a => a.innerText.trim() === value) || null;
+        case "partial link text": return links().find(a => a.innerText.includes(value)) || null;
+        default: throw new Error("Unsupported locator strategy: " + by);
+    }
+}
+function links() {
+    return Array.from(document.getElementsByTagName("a"));
+}
+"""
+
+# Значение ставится через нативный setter + input/change, чтобы React увидел изменения
+_FILL_JS = FIND_ELEMENT_JS + """
+const [fields, submit] = arguments;
+const missing = [];
+for (const [by, value, text] of fields) {
+    const el = find(by, value);
+    if (!el) { missing.push([by, value]); continue; }
+    const setter = Object.getOwnPropertyDescriptor(Object.getPrototypeOf(el), "value").set;
+    el.focus();
+    setter.call(el, text);
+    el.dispatchEvent(new Event("input", {bubbles: true}));
+    el.dispatchEvent(new Event("change", {bubbles: true}));
+}
+if (!missing.length && submit) {
+    const button = find(submit[0], submit[1]);
+    if (button) { button.click(); } else { missing.push(submit); }
+}
+return missing;
+"""
+
+_READ_JS = FIND_ELEMENT_JS + """
+const result = {};
+for (const [name, by, value, attribute] of arguments[0]) {
+    const el = find(by, value);
+    result[name] = !el ? null : attribute ? el.getAttribute(attribute) : el.innerText.trim();
+}
+return result;
+"""
+
+
+class BasePage:
+    """
+    Базовый Page Object с пакетными операциями над DOM:
+    несколько полей заполняются / читаются за один execute_script (один round trip к драйверу)
+    """
+
+    def __init__(self, driver, base_url, timeout: int = 5):
+        self.driver = driver
+        self.base_url = base_url
+        self.timeout = timeout
+
+    def fill(self, values: Dict[Locator, str], submit: Optional[Locator] = None):
+        """Заполнить поля {локатор: значение} и (опционально) нажать submit"""
+        fields = [[by, value, text] for (by, value), text in values.items()]
+        missing = self.driver.execute_script(_FILL_JS, fields, list(submit) if submit else None)
+        if missing:
+            raise NoSuchElementException(f"Elements not found: {missing}")
+        return self
+
+    def read(self, texts: Optional[Dict[str, Locator]] = None,
+             attributes: Optional[Dict[str, Tuple[Locator, str]]] = None) -> Dict[str, Optional[str]]:
+        """
+        Прочитать текст {имя: локатор} и атрибуты {имя: (локатор, атрибут)}.
+        Возвращает {имя: значение}, None если элемент не найден
+        """
+        queries = [[name, by, value, None] for name, (by, value) in (texts or {}).items()]
+        queries += [[name, by, value, attribute] for name, ((by, value), attribute) in (attributes or {}).items()]
+        return self.driver.execute_script(_READ_JS, queries)
@@ -1,9 +1,14 @@
+from typing import Dict
+
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+
+from core.api.data_models import User
+from helpers.wd_assertions import wait_until_invisible, wait_until_visible
+from ui.base_page import BasePage
+from ui.state_seeding import STATES, demoqa_state
 
 
-class LoginPage:
+class LoginPage(BasePage):
     """Page Object для страницы логина"""
 
     # локаторы
@@ -11,25 +16,67 @@ class LoginPage:
     PASSWORD_INPUT = (By.ID, "password")
     LOGIN_BTN = (By.ID, "login")
 
-    def __init__(self, driver, base_url, timeout: int = 5):
-        self.driver = driver
-        self.base_url = base_url
-        self.wait = WebDriverWait(driver, timeout)
-
     def open(self):
         """Открыть страницу логина"""
         self.driver.get(f"{self.base_url}/login")
         # убедиться, что форма загрузилась
-        self.wait.until(EC.visibility_of_element_located(self.USERNAME_INPUT))
+        wait_until_visible(self.driver, self.USERNAME_INPUT, self.timeout)
         return self
 
     def sign_in(self, username: str, password: str):
         """Авторизоваться пользователем"""
-        self.driver.find_element(*self.USERNAME_INPUT).send_keys(username)
-        self.driver.find_element(*self.PASSWORD_INPUT).send_keys(password)
-        self.driver.find_element(*self.LOGIN_BTN).click()
+        # оба поля и клик по кнопке - один round trip
+        self.fill({self.USERNAME_INPUT: username, self.PASSWORD_INPUT: password}, submit=self.LOGIN_BTN)
         # ждём, пока исчезнет кнопка логина (или появится другой элемент)
-        self.wait.until(EC.invisibility_of_element_located(self.LOGIN_BTN))
+        wait_until_invisible(self.driver, self.LOGIN_BTN, self.timeout)
         # возвращаем новую страницу, например HomePage
         # return HomePage(self.driver, self.base_url)
         return self
+
+    def sign_in_via_api(self, user: User, path: str = "/profile"):
+        """Открыть страницу уже авторизованным: токен через API, cookies - напрямую в браузер"""
+        STATES.open(self.driver, f"{self.base_url}{path}", user, lambda u: demoqa_state(u, self.base_url))
+        wait_until_invisible(self.driver, self.LOGIN_BTN, self.timeout)
+        return self
+
+
+class ProfilePage(BasePage):
+    """Page Object для страницы профиля Book Store"""
+
+    USER_NAME_VALUE = (By.ID, "userName-value")
+    NOT_LOGGED_IN_LABEL = (By.ID, "notLoggin-label")
+
+
+class TextBoxPage(BasePage):
+    """Page Object для страницы text-box"""
+
+    NAME_INPUT = (By.ID, "userName")
+    EMAIL_INPUT = (By.ID, "userEmail")
+    CURRENT_ADDRESS_INPUT = (By.ID, "currentAddress")
+    SUBMIT_BTN = (By.CSS_SELECTOR, "#userForm #submit")
+
+    OUTPUT_NAME = (By.CSS_SELECTOR, "#output #name")
+    OUTPUT_EMAIL = (By.CSS_SELECTOR, "#output #email")
+    OUTPUT_CURRENT_ADDRESS = (By.CSS_SELECTOR, "#output #currentAddress")
+
+    def open(self):
+        """Открыть страницу text-box"""
+        self.driver.get(f"{self.base_url}/text-box")
+        wait_until_visible(self.driver, self.NAME_INPUT, self.timeout)
+        return self
+
+    def submit_form(self, name: str, email: str, current_address: str):
+        """Заполнить форму и отправить её"""
+        self.fill({self.NAME_INPUT: name,
+                   self.EMAIL_INPUT: email,
+                   self.CURRENT_ADDRESS_INPUT: current_address},
+                  submit=self.SUBMIT_BTN)
+        return self
+
+    def read_output(self) -> Dict[str, str]:
+        """Прочитать блок output одним запросом, когда каждое поле отрисовано"""
+        for locator in (self.OUTPUT_NAME, self.OUTPUT_EMAIL, self.OUTPUT_CURRENT_ADDRESS):
+            wait_until_visible(self.driver, locator, self.timeout)
+        return self.read({"name": self.OUTPUT_NAME,
+                          "email": self.OUTPUT_EMAIL,
+                          "current_address": self.OUTPUT_CURRENT_ADDRESS})
@@ -0,0 +1,143 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import stat
+import sys
+from typing import Optional
+
+from webdriver_manager.chrome import ChromeDriverManager
+from webdriver_manager.core.os_manager import ChromeType, OperationSystemManager
+
+from core.config import Config
+from core.file_lock import file_lock, write_atomic
+
+"""
+Machine-wide cache of chromedriver binaries.
+
+Binaries are stored content-addressed (blobs/<sha256>/<name>) and indexed by the
+installed browser version, so webdriver-manager resolution (network, version
+lookups) runs once per browser version per machine. Concurrent xdist workers
+serialize on a lock file; the fast path is a single index read. When the browser
+version can't be detected, the last resolved driver is used, so sessions start
+fully offline.
+
+Detecting the browser version spawns a process (`google-chrome --version`), so the
+result is memoized in browsers.json, per browser binary and its mtime and size:
+a browser update changes the binary and triggers one new detection.
+"""
+
+logger = logging.getLogger(__name__)
+
+LATEST = "latest"
+
+# where webdriver-manager looks for Chrome too; the first existing one is the installed browser
+_CHROME_BINARIES = {
+    "linux": ["google-chrome", "google-chrome-stable", "chromium", "chromium-browser"],
+    "darwin": ["/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"],
+    "win32": [r"%PROGRAMFILES%\Google\Chrome\Application\chrome.exe",
+              r"%PROGRAMFILES(X86)%\Google\Chrome\Application\chrome.exe",
+              r"%LOCALAPPDATA%\Google\Chrome\Application\chrome.exe"],
+}
+
+
+class DriverCache:
+
+    def __init__(self, root: str = Config.UI_DRIVER_CACHE_DIR):
+        self.root = os.path.expanduser(root)
+        self.index_path = os.path.join(self.root, "index.json")
+        self.browsers_path = os.path.join(self.root, "browsers.json")
+        self.lock_path = os.path.join(self.root, ".lock")
+
+    def chromedriver(self) -> str:
+        key = self.chrome_key()
+        path = self._lookup(key)
+        if path:
+            return path
+        with file_lock(self.lock_path):
+            # another worker may have resolved it while we waited
+            path = self._lookup(key)
+            if path:
+                return path
+            logger.info("Resolving chromedriver for %s", key)
+            return self._store(key, ChromeDriverManager().install())
+
+    def chrome_key(self) -> Optional[str]:
+        """chrome-<version>, detected once per browser binary (path, mtime, size)"""
+        binary = _chrome_binary()
+        if binary is None:
+            return _chrome_key()
+        info = os.stat(binary)
+        stamp = {"mtime_ns": info.st_mtime_ns, "size": info.st_size}
+        known = _read_json(self.browsers_path).get(binary)
+        if known and {name: known.get(name) for name in stamp} == stamp:
+            return known["key"]
+        key = _chrome_key()
+        if key:
+            with file_lock(self.lock_path):
+                browsers = _read_json(self.browsers_path)
+                browsers[binary] = {**stamp, "key": key}
+                write_atomic(self.browsers_path, json.dumps(browsers, indent=2))
+        return key
+
+    def _lookup(self, key: Optional[str]) -> Optional[str]:
+        index = _read_json(self.index_path)
+        path = index.get(key or LATEST)
+        if path and os.access(path, os.X_OK):
+            return path
+        return None
+
+    def _store(self, key: Optional[str], source: str) -> str:
+        digest = _sha256(source)
+        target_dir = os.path.join(self.root, "blobs", digest)
+        target = os.path.join(target_dir, os.path.basename(source))
+        if not os.path.exists(target):
+            os.makedirs(target_dir, exist_ok=True)
+            shutil.copy2(source, f"{target}.tmp")
+            os.chmod(f"{target}.tmp", os.stat(source).st_mode | stat.S_IXUSR)
+            os.replace(f"{target}.tmp", target)
+        index = _read_json(self.index_path)
+        if key:
+            index[key] = target
+        index[LATEST] = target
+        write_atomic(self.index_path, json.dumps(index, indent=2))
+        return target
+
+
+def _read_json(path: str) -> dict:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _chrome_binary() -> Optional[str]:
+    for candidate in _CHROME_BINARIES.get(sys.platform, _CHROME_BINARIES["linux"]):
+        path = shutil.which(os.path.expandvars(candidate))
+        if path:
+            # the real file, so an update behind a symlink is seen
+            return os.path.realpath(path)
+    return None
+
+
+def _chrome_key() -> Optional[str]:
+    try:
+        version = OperationSystemManager().get_browser_version_from_os(ChromeType.GOOGLE)
+    except Exception:
+        logger.warning("Chrome version detection failed, using the last resolved chromedriver")
+        return None
+    return f"chrome-{version}" if version else None
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cached_chromedriver() -> str:
+    return DriverCache().chromedriver()
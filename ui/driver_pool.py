@@ -0,0 +1,178 @@
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Union
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.service import Service as ChromeService
+from selenium.webdriver.chrome.webdriver import WebDriver
+
+from ui.driver_cache import cached_chromedriver
+from ui.resource_policy import ResourcePolicy
+
+"""
+Pool of pre-warmed browsers for UI tests.
+
+Browsers are launched ahead of time (in background threads) up to `size`.
+Between tests a browser is reset (cookies, storages, about:blank) instead of
+relaunched, and it is recycled after `max_uses` leases or when it stops
+responding. A failed launch gives its slot back: acquire() raises DriverPoolError
+with the launch error and launches a replacement for the next test.
+"""
+
+logger = logging.getLogger(__name__)
+
+DriverFactory = Callable[[], WebDriver]
+
+
+class DriverPoolError(RuntimeError):
+    """No browser could be leased"""
+
+
+def chrome_factory(headless: bool = True, driver_path: Optional[str] = None,
+                   policy: Optional[ResourcePolicy] = None, performance_log: bool = False) -> DriverFactory:
+    """
+    Chrome launcher; the driver binary comes from the machine-wide driver cache.
+    performance_log: CDP events for counting blocked requests, costs every test some overhead
+    """
+    path = driver_path or cached_chromedriver()
+
+    def launch() -> WebDriver:
+        options = webdriver.ChromeOptions()
+        options.page_load_strategy = "eager"
+        if headless:
+            options.add_argument("--headless=new")
+        options.add_argument("--window-size=1920,1080")
+        options.add_argument("--disable-extensions")
+        if policy and performance_log:
+            # blocked requests show up as Network.loadingFailed in the performance log
+            options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        driver = webdriver.Chrome(service=ChromeService(path), options=options)
+        driver.set_page_load_timeout(time_to_wait=10)
+        if policy:
+            policy.apply(driver)
+        return driver
+
+    return launch
+
+
+@dataclass
+class _Slot:
+    driver: WebDriver
+    uses: int = 0
+
+
+@dataclass
+class _LaunchFailure:
+    error: BaseException
+
+
+class DriverPool:
+
+    def __init__(self, factory: DriverFactory, size: int = 2, max_uses: int = 50):
+        self.factory = factory
+        self.size = size
+        self.max_uses = max_uses
+        self._idle: "queue.Queue[Union[_Slot, _LaunchFailure]]" = queue.Queue()
+        self._leased: Dict[int, _Slot] = {}
+        self._lock = threading.Lock()
+        self._launcher = ThreadPoolExecutor(max_workers=size, thread_name_prefix="driver-pool")
+        self._closed = False
+        self._last_failure: Optional[BaseException] = None
+
+    def start(self) -> "DriverPool":
+        """Launch `size` browsers in the background, acquire() blocks only until the first is ready"""
+        for _ in range(self.size):
+            self._launch_async()
+        return self
+
+    def acquire(self, timeout: float = 60) -> WebDriver:
+        while True:
+            try:
+                slot = self._idle.get(timeout=timeout)
+            except queue.Empty:
+                last = f", last launch failed: {_describe(self._last_failure)}" if self._last_failure else ""
+                raise DriverPoolError(f"No browser available within {timeout}s{last}") from self._last_failure
+            if isinstance(slot, _LaunchFailure):
+                # the slot is free again: retry in the background, fail this lease with the cause
+                self._launch_async()
+                raise DriverPoolError(f"Browser launch failed: {_describe(slot.error)}") from slot.error
+            if _is_healthy(slot.driver):
+                break
+            logger.info("Dropping unhealthy browser")
+            self._discard(slot)
+        with self._lock:
+            self._leased[id(slot.driver)] = slot
+        return slot.driver
+
+    def release(self, driver: WebDriver) -> None:
+        with self._lock:
+            slot = self._leased.pop(id(driver))
+        slot.uses += 1
+        if self._closed:
+            _quit(driver)
+        elif slot.uses >= self.max_uses or not _reset(driver):
+            logger.info("Recycling browser after %d uses", slot.uses)
+            self._discard(slot)
+        else:
+            self._idle.put(slot)
+
+    def close(self) -> None:
+        self._closed = True
+        self._launcher.shutdown(wait=True)
+        while not self._idle.empty():
+            slot = self._idle.get_nowait()
+            if isinstance(slot, _Slot):
+                _quit(slot.driver)
+
+    def _discard(self, slot: _Slot) -> None:
+        _quit(slot.driver)
+        if not self._closed:
+            self._launch_async()
+
+    def _launch_async(self) -> None:
+        def launch():
+            try:
+                self._idle.put(_Slot(driver=self.factory()))
+            except Exception as error:  # driver download, missing binary... not only WebDriverException
+                logger.exception("Browser launch failed")
+                self._last_failure = error
+                self._idle.put(_LaunchFailure(error))
+        if not self._closed:
+            self._launcher.submit(launch)
+
+
+def _reset(driver: WebDriver) -> bool:
+    """Clean state for the next test; False when the browser is unusable"""
+    try:
+        driver.execute_script("try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}")
+        try:
+            # all domains, not only the current one
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        except WebDriverException:
+            driver.delete_all_cookies()
+        driver.get("about:blank")
+        return True
+    except WebDriverException:
+        return False
+
+
+def _is_healthy(driver: WebDriver) -> bool:
+    try:
+        return driver.execute_script("return 1") == 1
+    except WebDriverException:
+        return False
+
+
+def _describe(error: BaseException) -> str:
+    return f"{type(error).__name__}: {str(error).strip()}"
+
+
+def _quit(driver: WebDriver) -> None:
+    try:
+        driver.quit()
+    except WebDriverException:
+        pass
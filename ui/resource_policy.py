@@ -0,0 +1,201 @@
+import json
+import logging
+import threading
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.support.abstract_event_listener import AbstractEventListener
+
+"""
+Network-level resource policy for UI runs (Chrome DevTools Protocol).
+
+Third-party ads, analytics, fonts etc. play no part in the assertions, so they are
+blocked with Network.setBlockedURLs by category, and the browser cache is kept on.
+ResourceListener measures every page load (navigation timing + transferred bytes +
+blocked requests) and, with measure_savings, loads each new page once without the
+policy to report the bytes and time it saved. Both of those loads start from a
+cleared browser cache, so the saving is the policy's and not the cache's.
+Measuring is opt-in (a report file or measure_savings): blocked requests come from
+Chrome's performance log, which is enabled only then.
+"""
+
+logger = logging.getLogger(__name__)
+
+# Network.setBlockedURLs patterns, "*" is a wildcard
+BLOCK_CATEGORIES: Dict[str, List[str]] = {
+    "ads": ["*doubleclick.net*", "*googlesyndication.com*", "*adservice.google.*", "*amazon-adsystem.com*",
+            "*adnxs.com*", "*pubmatic.com*", "*rubiconproject.com*", "*criteo.*", "*taboola.com*",
+            "*outbrain.com*", "*moatads.com*", "*ezoic*", "*/ads/*"],
+    "analytics": ["*google-analytics.com*", "*googletagmanager.com*", "*hotjar.com*", "*segment.io*",
+                  "*connect.facebook.net*", "*clarity.ms*", "*newrelic.com*", "*nr-data.net*"],
+    "fonts": ["*fonts.googleapis.com*", "*fonts.gstatic.com*", "*.woff", "*.woff2", "*.ttf", "*.otf"],
+    "images": ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico"],
+    "media": ["*.mp4", "*.webm", "*.mp3", "*.ogg"],
+}
+
+_PAGE_METRICS_JS = """
+const nav = performance.getEntriesByType("navigation")[0];
+const resources = performance.getEntriesByType("resource");
+return {
+    load_ms: nav ? (nav.loadEventEnd || nav.domContentLoadedEventEnd || nav.responseEnd) - nav.startTime : null,
+    bytes: (nav ? nav.transferSize : 0) + resources.reduce((sum, r) => sum + (r.transferSize || 0), 0),
+};
+"""
+
+
+@dataclass
+class ResourcePolicy:
+    categories: List[str] = field(default_factory=list)
+    extra_patterns: List[str] = field(default_factory=list)
+    cache_enabled: bool = True
+
+    @classmethod
+    def from_config(cls, categories: str, extra_patterns: str, cache_enabled: bool) -> "ResourcePolicy":
+        return cls(categories=_split(categories), extra_patterns=_split(extra_patterns), cache_enabled=cache_enabled)
+
+    @property
+    def patterns(self) -> List[str]:
+        unknown = set(self.categories) - BLOCK_CATEGORIES.keys()
+        if unknown:
+            raise ValueError(f"Unknown resource categories: {sorted(unknown)}")
+        return [p for category in self.categories for p in BLOCK_CATEGORIES[category]] + self.extra_patterns
+
+    def apply(self, driver) -> None:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.patterns})
+        driver.execute_cdp_cmd("Network.setCacheDisabled", {"cacheDisabled": not self.cache_enabled})
+
+    def lift(self, driver) -> None:
+        """No blocking, no cache: the reference load for measuring savings"""
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": []})
+        driver.execute_cdp_cmd("Network.setCacheDisabled", {"cacheDisabled": True})
+
+
+@dataclass
+class _PageStats:
+    loads: int = 0
+    load_ms: float = 0.0
+    bytes: int = 0
+    blocked: int = 0
+    reference_load_ms: Optional[float] = None
+    reference_bytes: Optional[int] = None
+    cold_load_ms: Optional[float] = None
+    cold_bytes: Optional[int] = None
+
+    def as_dict(self) -> dict:
+        avg_ms, avg_bytes = self.load_ms / self.loads, self.bytes / self.loads
+        result = {"loads": self.loads, "avg_load_ms": round(avg_ms, 1), "avg_bytes": int(avg_bytes),
+                  "blocked_requests": self.blocked}
+        if self.reference_bytes is not None:
+            result["saved_bytes"] = int(self.reference_bytes - self.cold_bytes)
+            result["saved_ms"] = round(self.reference_load_ms - self.cold_load_ms, 1)
+        return result
+
+
+class ResourceStats:
+    """Per page (url without query) load metrics for the whole run"""
+
+    def __init__(self):
+        self.pages: Dict[str, _PageStats] = defaultdict(_PageStats)
+        self._lock = threading.Lock()
+
+    def record(self, page: str, load_ms: float, transferred: int, blocked: int) -> None:
+        with self._lock:
+            stats = self.pages[page]
+            stats.loads += 1
+            stats.load_ms += load_ms
+            stats.bytes += transferred
+            stats.blocked += blocked
+
+    def record_reference(self, page: str, load_ms: float, transferred: int, cold_load_ms: float,
+                         cold_transferred: int) -> None:
+        """Cold loads of the page without (reference) and with the policy"""
+        with self._lock:
+            stats = self.pages[page]
+            stats.reference_load_ms, stats.reference_bytes = load_ms, transferred
+            stats.cold_load_ms, stats.cold_bytes = cold_load_ms, cold_transferred
+
+    def has_reference(self, page: str) -> bool:
+        return page in self.pages and self.pages[page].reference_bytes is not None
+
+    def summary(self) -> Dict[str, dict]:
+        with self._lock:
+            return {page: stats.as_dict() for page, stats in sorted(self.pages.items()) if stats.loads}
+
+    def write(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+
+
+class ResourceListener(AbstractEventListener):
+    """Measures each navigation of an EventFiringWebDriver"""
+
+    def __init__(self, policy: ResourcePolicy, stats: ResourceStats, measure_savings: bool = False):
+        self.policy = policy
+        self.stats = stats
+        self.measure_savings = measure_savings
+
+    def after_navigate_to(self, url, driver) -> None:
+        page = _page_key(url)
+        if not page:
+            return
+        try:
+            if self.measure_savings and not self.stats.has_reference(page):
+                self._measure_reference(page, url, driver)
+            metrics = driver.execute_script(_PAGE_METRICS_JS)
+            self.stats.record(page, metrics["load_ms"] or 0.0, metrics["bytes"], _blocked_requests(driver))
+        except WebDriverException:
+            logger.debug("Page metrics unavailable for %s", url, exc_info=True)
+
+    def _measure_reference(self, page: str, url: str, driver) -> None:
+        # load once without the policy, then again with it, so the recorded load is the policy one;
+        # the cache is cleared before each so the reference load doesn't warm the policy one
+        wrapped = getattr(driver, "wrapped_driver", driver)
+        self.policy.lift(wrapped)
+        try:
+            wrapped.execute_cdp_cmd("Network.clearBrowserCache", {})
+            wrapped.get(url)
+            reference = wrapped.execute_script(_PAGE_METRICS_JS)
+        finally:
+            self.policy.apply(wrapped)
+        _blocked_requests(wrapped)
+        wrapped.execute_cdp_cmd("Network.clearBrowserCache", {})
+        wrapped.get(url)
+        cold = wrapped.execute_script(_PAGE_METRICS_JS)
+        self.stats.record_reference(page, reference["load_ms"] or 0.0, reference["bytes"],
+                                    cold["load_ms"] or 0.0, cold["bytes"])
+
+
+def _blocked_requests(driver) -> int:
+    """Requests blocked by the policy since the last call (needs goog:loggingPrefs performance)"""
+    try:
+        entries = driver.get_log("performance")
+    except WebDriverException:
+        return 0
+    blocked = 0
+    for entry in entries:
+        message = json.loads(entry["message"])["message"]
+        if message.get("method") == "Network.loadingFailed" and message["params"].get("blockedReason"):
+            blocked += 1
+    return blocked
+
+
+def _page_key(url: str) -> Optional[str]:
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https"):
+        return None
+    return f"{parts.scheme}://{parts.netloc}{parts.path}"
+
+
+def _split(value: Optional[str]) -> List[str]:
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+
+def report(stats: ResourceStats, path: Optional[str] = None, log: logging.Logger = logger) -> None:
+    for page, summary in stats.summary().items():
+        log.info("%s %s", page, summary)
+    if path:
+        stats.write(path)
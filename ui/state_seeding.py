@@ -0,0 +1,166 @@
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from selenium.common.exceptions import WebDriverException
+
+from api_pet_service import api_client
+from core.api import petstore_api_client
+from core.api.cassette import cassette_session
+from core.api.data_models import User
+from core.api.session_cache import SESSIONS, Login, cache_key
+from core.config import Config
+
+"""
+API-seeded UI state: log in through the API and write the result straight into
+the browser (cookies + localStorage) instead of going through the login form.
+
+A StorageState is built once per (origin, user) and reused across tests until it
+expires; tokens come from the shared SESSIONS cache, so the UI and the API
+clients of a run log in once. Seeding costs one page load (the target page):
+cookies go in with Network.setCookies and localStorage is written by a script
+that runs before the page's own scripts.
+"""
+
+logger = logging.getLogger(__name__)
+
+# demoqa logins go through the transport policy, the cassette and the request instrumentation
+_LOGIN = cassette_session()
+
+# runs on every new document of the tab until removed; only touches the seeded origin
+_SEED_STORAGE_JS = """
+if (location.origin === %(origin)s) {
+    const items = %(items)s;
+    for (const [key, value] of Object.entries(items)) { localStorage.setItem(key, value); }
+}
+"""
+
+
+@dataclass(frozen=True)
+class StorageState:
+    origin: str
+    cookies: List[dict] = field(default_factory=list)
+    local_storage: Dict[str, str] = field(default_factory=dict)
+    expires_at: float = float("inf")
+
+
+StateBuilder = Callable[[User], StorageState]
+
+
+class StateSeeder:
+
+    def __init__(self):
+        self._states: Dict[str, StorageState] = {}
+        self._lock = threading.Lock()
+
+    def state(self, origin: str, user: User, build: StateBuilder) -> StorageState:
+        """Cached storage state for the user; built (one API login) when missing or expired"""
+        key = cache_key(_origin(origin), user)
+        with self._lock:
+            state = self._states.get(key)
+            if state is None or state.expires_at <= time.time():
+                logger.debug("Building storage state for %s", key)
+                state = build(user)
+                self._states[key] = state
+            return state
+
+    def seed(self, driver, state: StorageState, target_url: str) -> None:
+        """Open target_url already authenticated"""
+        try:
+            _seed_cdp(driver, state, target_url)
+        except WebDriverException:
+            # no CDP (remote / non-Chrome): set the state on the origin first, costs one extra load
+            logger.debug("CDP seeding unavailable, seeding through the page", exc_info=True)
+            _seed_page(driver, state, target_url)
+
+    def open(self, driver, url: str, user: User, build: StateBuilder) -> None:
+        """Cached state for the user + seed: the page opens logged in"""
+        self.seed(driver, self.state(url, user, build), url)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._states.clear()
+
+
+def _seed_cdp(driver, state: StorageState, target_url: str) -> None:
+    driver.execute_cdp_cmd("Network.enable", {})
+    if state.cookies:
+        driver.execute_cdp_cmd("Network.setCookies",
+                               {"cookies": [{"url": state.origin, **cookie} for cookie in state.cookies]})
+    script_id = None
+    if state.local_storage:
+        source = _SEED_STORAGE_JS % {"origin": json.dumps(state.origin), "items": json.dumps(state.local_storage)}
+        script_id = driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": source})["identifier"]
+    try:
+        driver.get(target_url)
+    finally:
+        if script_id:
+            # the values now live in the origin's localStorage, the page may change them from here on
+            driver.execute_cdp_cmd("Page.removeScriptToEvaluateOnNewDocument", {"identifier": script_id})
+
+
+def _seed_page(driver, state: StorageState, target_url: str) -> None:
+    driver.get(state.origin)
+    for cookie in state.cookies:
+        driver.add_cookie(cookie)
+    if state.local_storage:
+        driver.execute_script("for (const [k, v] of Object.entries(arguments[0])) { localStorage.setItem(k, v); }",
+                              state.local_storage)
+    driver.get(target_url)
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def bearer_state(origin_url: str, login_url: str, user: User, login: Login, storage_key: str = "token",
+                 cookie_name: Optional[str] = "token") -> StorageState:
+    """Token from the shared session cache (same login as the API client), stored under storage_key / cookie_name"""
+    session = SESSIONS.session(login_url, user, login)
+    token = session.headers["Authorization"].split(" ", 1)[1]
+    cookies = [{"name": cookie_name, "value": token, "path": "/"}] if cookie_name else []
+    return StorageState(origin=_origin(origin_url), cookies=cookies, local_storage={storage_key: token},
+                        expires_at=time.time() + Config.AUTH_TOKEN_TTL)
+
+
+def fastapi_state(user: User) -> StorageState:
+    """Storage state for the pet service, token shared with FastApiClient"""
+    return bearer_state(Config.BASE_URL, f"{Config.BASE_URL}/auth/login", user, api_client.auth,
+                        storage_key="access_token")
+
+
+def petstore_state(user: User) -> StorageState:
+    """Storage state for the pet store, token shared with PetAPI"""
+    return bearer_state(Config.BASE_PET_STORE_URL, f"{Config.BASE_PET_STORE_URL}/user/login", user,
+                        petstore_api_client.auth)
+
+
+def demoqa_state(user: User, base_url: Optional[str] = None) -> StorageState:
+    """demoqa Book Store login: the UI keeps the session in these four cookies"""
+    base_url = base_url or Config.BASE_QA_DEMO_URL
+    response = _LOGIN.post(f"{base_url}/Account/v1/Login",
+                           json={"userName": user.username, "password": user.password},
+                           timeout=(Config.HTTP_CONNECT_TIMEOUT, Config.HTTP_TIMEOUT))
+    response.raise_for_status()
+    body = response.json()
+    if not body.get("token"):
+        raise ValueError(f"Login failed for {user.username}: {body}")
+    values = {"userID": body["userId"], "userName": body["username"], "token": body["token"],
+              "expires": body["expires"]}
+    return StorageState(origin=_origin(base_url),
+                        cookies=[{"name": name, "value": value, "path": "/"} for name, value in values.items()],
+                        expires_at=_timestamp(body["expires"]))
+
+
+def _timestamp(iso: str) -> float:
+    # "2026-10-25T12:00:00.000Z"
+    return datetime.fromisoformat(iso.replace("Z", "+00:00")).timestamp()
+
+
+STATES = StateSeeder()